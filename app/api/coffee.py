@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_read_session, run_in_session
 from app.schemas.coffee import CoffeeResponse
-from app.services.coffee_service import get_all_coffees, get_menu_with_prices
+from app.services.coffee_service import CachedMenu, get_cached_menu
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara o If-None-Match com o ETag (comparação fraca, RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+def _menu_response(request: Request, cached: CachedMenu) -> Response:
+    """Responde 304 quando o cliente já tem a versão atual do menu"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
 @router.get("/", response_model=List[dict])
-async def get_menu(db: Session = Depends(get_db)):
+async def get_menu(request: Request, db: Session = Depends(get_read_session)):
     """
     Lista o menu com todos os cafés e seus respectivos preços.
     
@@ -46,11 +65,14 @@ async def get_menu(db: Session = Depends(get_db)):
       }
     ]
     ```
+    
+    **Cache:** a resposta inclui um `ETag` forte. Envie-o em `If-None-Match`
+    para receber `304 Not Modified` enquanto o menu não mudar.
     """
-    return get_menu_with_prices(db)
+    return _menu_response(request, await run_in_session(db, get_cached_menu, "menu"))
 
 @router.get("/all", response_model=List[CoffeeResponse])
-async def get_all_coffees_endpoint(db: Session = Depends(get_db)):
+async def get_all_coffees_endpoint(request: Request, db: Session = Depends(get_read_session)):
     """
     Lista todos os cafés (endpoint administrativo).
     
@@ -88,5 +110,8 @@ async def get_all_coffees_endpoint(db: Session = Depends(get_db)):
     ```
     
     **Note:** Preços retornados em centavos (200 = R$ 2,00)
+    
+    **Cache:** a resposta inclui um `ETag` forte. Envie-o em `If-None-Match`
+    para receber `304 Not Modified` enquanto o menu não mudar.
     """
-    return get_all_coffees(db)
+    return _menu_response(request, await run_in_session(db, get_cached_menu, "all"))
@@ -1,14 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas.order import OrderCreate, OrderResponse, OrderSummary
-from app.services.order_service import create_order, get_pending_orders, get_consumption_analysis
+from datetime import datetime
+from typing import List, Literal, Optional
+from app.config import settings
+from app.database import get_read_session, get_session, run_in_session
+from app.models.order import ORDER_STATUS_COMPLETED
+from app.read_routing import remember_write
+from app.serialization import FastJSONResponse
+from app.schemas.order import (
+    OrderBulkComplete,
+    OrderBulkCompleteResponse,
+    OrderBulkCreate,
+    OrderBulkResponse,
+    OrderCreate,
+    OrderResponse,
+    OrderStatusResponse,
+    OrderStatusUpdate,
+    OrderSummary
+)
+from app.services.forecast_service import get_consumption_forecast
+from app.services.idempotency import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    idempotency_store,
+    request_fingerprint
+)
+from app.services.order_events import order_events
+from app.services.order_service import (
+    create_order,
+    create_orders_bulk,
+    export_orders,
+    export_orders_async,
+    get_consumption_analysis,
+    get_order_by_id,
+    get_pending_orders_page,
+    get_sales_series,
+    order_export_range,
+    transition_orders
+)
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-@router.post("/", response_model=OrderResponse)
-async def create_new_order(order_data: OrderCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=OrderResponse, dependencies=[Depends(remember_write)])
+async def create_new_order(
+    order_data: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_session)
+):
     """
     Registra um novo pedido de café.
     
@@ -100,25 +142,128 @@ async def create_new_order(order_data: OrderCreate, db: Session = Depends(get_db
     - 13: Cappuccino (R$ 4,50)
     - 14: Flat White (R$ 5,50)
     - 15: Americano (R$ 3,50)
+    
+    **Idempotência:**
+    Envie o header `Idempotency-Key` (ex: um UUID gerado pelo POS) para que
+    novas tentativas da mesma requisição não dupliquem o pedido: a repetição
+    recebe a resposta original com o header `Idempotent-Replayed: true`.
+    Repetições simultâneas esperam a requisição original terminar.
+    - `409`: A requisição original ainda está em processamento
+    - `422`: A chave já foi usada com um pedido diferente
     """
+    if idempotency_key is None:
+        try:
+            return await run_in_session(db, create_order, order_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        return create_order(db, order_data)
+        replay = await idempotency_store.begin(db, idempotency_key, request_fingerprint(order_data))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if replay is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return replay
+    
+    try:
+        order = await run_in_session(db, create_order, order_data)
     except ValueError as e:
+        await idempotency_store.release(db, idempotency_key)
         raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        await idempotency_store.release(db, idempotency_key)
+        raise
+    await idempotency_store.complete(db, idempotency_key, order.model_dump(mode="json"))
+    return order
+
+@router.post("/bulk", response_model=OrderBulkResponse, dependencies=[Depends(remember_write)])
+async def create_orders_bulk_endpoint(bulk: OrderBulkCreate, db: Session = Depends(get_session)):
+    """
+    Registra um lote de pedidos (sincronização offline do POS).
+    
+    Usado quando um terminal volta a ficar online e precisa enviar os pedidos
+    acumulados. Todo o lote é validado de uma vez e os pedidos válidos são
+    gravados em uma única transação; pedidos inválidos são reportados
+    individualmente sem impedir a gravação dos demais. Até 5000 pedidos por lote.
+    
+    **Request URL:**
+    ```
+    POST http://localhost:8000/orders/bulk
+    ```
+    
+    **Request Body:**
+    ```json
+    {
+        "orders": [
+            {
+                "created_at": "2025-09-18T12:05:00Z",
+                "items": [{"coffee_id": 11, "quantity": 2}]
+            },
+            {
+                "created_at": "2025-09-18T12:07:30Z",
+                "items": [{"coffee_id": 999, "quantity": 1}]
+            }
+        ]
+    }
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -X POST "http://localhost:8000/orders/bulk" \
+      -H "Content-Type: application/json" \
+      -d '{"orders": [{"created_at": "2025-09-18T12:05:00Z", "items": [{"coffee_id": 11, "quantity": 2}]}]}'
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "created": 1,
+        "failed": 1,
+        "results": [
+            {"index": 0, "id": 42, "error": null},
+            {"index": 1, "id": null, "error": "Café com ID 999 não encontrado"}
+        ]
+    }
+    ```
+    
+    **Observações:**
+    - `created_at` é opcional; sem ele o pedido recebe a data/hora do servidor
+    - Datas com fuso horário são convertidas para UTC
+    """
+    results = await run_in_session(db, create_orders_bulk, bulk.orders)
+    created = sum(1 for result in results if result["error"] is None)
+    return OrderBulkResponse(created=created, failed=len(results) - created, results=results)
 
 @router.get("/pending", response_model=List[OrderSummary])
-async def get_pending_orders_endpoint(db: Session = Depends(get_db)):
+async def get_pending_orders_endpoint(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Quantidade máxima de pedidos na página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em X-Next-Cursor"),
+    since: Optional[datetime] = Query(None, description="Apenas pedidos criados a partir desta data/hora"),
+    coffee_id: Optional[int] = Query(None, description="Apenas pedidos que contenham este café"),
+    db: Session = Depends(get_read_session)
+):
     """
-    Lista todos os pedidos pendentes com informações detalhadas dos itens.
+    Lista os pedidos pendentes com informações detalhadas dos itens.
     
-    Retorna uma lista de todos os pedidos que ainda não foram processados,
-    incluindo informações completas sobre cada item do pedido.
+    Retorna os pedidos que ainda não foram processados, em ordem de chegada,
+    incluindo informações completas sobre cada item do pedido. A listagem é
+    paginada: quando há mais pedidos, o header `X-Next-Cursor` traz o cursor
+    da próxima página.
     
     **Request URL:**
     ```
-    GET http://localhost:8000/orders/pending
+    GET http://localhost:8000/orders/pending?limit={limit}&cursor={cursor}&since={since}&coffee_id={coffee_id}
     ```
     
+    **Query Parameters:**
+    - `limit` (int, optional): Tamanho da página, de 1 a 500 (padrão: 100)
+    - `cursor` (str, optional): Valor de `X-Next-Cursor` da página anterior
+    - `since` (datetime, optional): Apenas pedidos criados a partir desta data/hora
+    - `coffee_id` (int, optional): Apenas pedidos que contenham este café
+    
     **Headers:**
     ```
     accept: application/json
@@ -164,13 +309,142 @@ async def get_pending_orders_endpoint(db: Session = Depends(get_db)):
     - `quantity`: Quantidade pedida
     - `coffee_name`: Nome do café (ex: "Expresso", "Cappuccino")
     - `item_price`: Preço total do item (preço × quantidade)
+    
+    **Response Headers:**
+    - `X-Next-Cursor`: Cursor da próxima página (ausente na última página)
+    
+    Com `FAST_JSON_RESPONSES=true` a página é lida por colunas e serializada
+    diretamente (orjson, se instalado), com o mesmo formato de resposta.
     """
-    return get_pending_orders(db)
+    fast = settings.FAST_JSON_RESPONSES
+    try:
+        orders, next_cursor = await run_in_session(
+            db, get_pending_orders_page, limit, cursor, since, coffee_id, as_payload=fast
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fast:
+        # Dicts já no formato de OrderSummary: serializa direto, sem response_model
+        response = FastJSONResponse(orders)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response if fast else orders
+
+@router.get("/export")
+async def export_orders_endpoint(
+    start: datetime = Query(..., alias="from", description="Início do período (inclusivo)"),
+    end: datetime = Query(..., alias="to", description="Fim do período (exclusivo)"),
+    db: Session = Depends(get_read_session)
+):
+    """
+    Exporta os pedidos de um período em NDJSON (um pedido por linha).
+    
+    Destinado ao pipeline de BI: inclui pedidos de qualquer status, com seus
+    itens, em ordem de criação. A resposta é enviada em stream à medida que as
+    linhas são lidas do banco, então a memória do servidor não cresce com o
+    tamanho do período e os primeiros bytes chegam imediatamente.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/orders/export?from={from}&to={to}
+    ```
+    
+    **Query Parameters:**
+    - `from` (datetime, required): Início do período, inclusivo
+    - `to` (datetime, required): Fim do período, exclusivo
+    
+    **CURL Example:**
+    ```bash
+    curl -N "http://localhost:8000/orders/export?from=2025-09-01T00:00:00&to=2025-10-01T00:00:00" \
+      -o orders-2025-09.ndjson
+    ```
+    
+    **Response Example:**
+    ```
+    {"id":1,"created_at":"2025-09-18T17:39:33.186615","total_price":8.5,"status":"completed","items":[{"id":1,"coffee_id":11,"quantity":2,"coffee_name":"Expresso","item_price":4.0},{"id":2,"coffee_id":13,"quantity":1,"coffee_name":"Cappuccino","item_price":4.5}]}
+    {"id":2,"created_at":"2025-09-18T17:41:02.004711","total_price":3.5,"status":"pending","items":[{"id":3,"coffee_id":15,"quantity":1,"coffee_name":"Americano","item_price":3.5}]}
+    ```
+    
+    **Errors:**
+    - `400`: `to` não é posterior a `from`
+    """
+    try:
+        start, end = order_export_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if isinstance(db, AsyncSession):
+        body = export_orders_async(db, start, end)
+    else:
+        body = export_orders(db, start, end)
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+@router.get("/sales")
+async def get_sales_series_endpoint(
+    bucket: Literal["hour", "day"] = Query("day", description="Tamanho do bucket: hour ou day"),
+    start: datetime = Query(..., alias="from", description="Início do período (inclusivo)"),
+    end: datetime = Query(..., alias="to", description="Fim do período (exclusivo)"),
+    coffee_id: Optional[int] = Query(None, description="Apenas este café"),
+    db: Session = Depends(get_read_session)
+):
+    """
+    Série temporal de vendas por café, agregada por hora ou por dia.
+    
+    A agregação é feita no banco (GROUP BY na data truncada; horas completas
+    vêm do rollup horário) e a resposta vem orientada a colunas: `columns`
+    traz listas paralelas, com uma posição por par (bucket, café) que teve
+    vendas. Buckets sem vendas não aparecem.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/orders/sales?bucket={bucket}&from={from}&to={to}&coffee_id={coffee_id}
+    ```
+    
+    **Query Parameters:**
+    - `bucket` (str, optional): `hour` ou `day` (padrão: `day`)
+    - `from` (datetime, required): Início do período, inclusivo
+    - `to` (datetime, required): Fim do período, exclusivo
+    - `coffee_id` (int, optional): Apenas vendas deste café
+    
+    **CURL Example:**
+    ```bash
+    curl -X GET "http://localhost:8000/orders/sales?bucket=hour&from=2025-09-18T00:00:00&to=2025-09-19T00:00:00" \
+      -H "accept: application/json"
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "bucket": "hour",
+        "from": "2025-09-18T00:00:00",
+        "to": "2025-09-19T00:00:00",
+        "columns": {
+            "bucket_start": ["2025-09-18T08:00:00", "2025-09-18T08:00:00", "2025-09-18T09:00:00"],
+            "coffee_id": [11, 13, 11],
+            "cups": [12, 5, 9],
+            "revenue": [24.0, 22.5, 18.0]
+        }
+    }
+    ```
+    
+    **Response Fields:**
+    - `bucket_start`: Início do bucket (UTC)
+    - `coffee_id`: ID do café
+    - `cups`: Xícaras vendidas no bucket
+    - `revenue`: Receita em reais, pelo preço praticado em cada pedido
+    
+    **Errors:**
+    - `400`: `to` não é posterior a `from`
+    """
+    try:
+        series = await run_in_session(db, get_sales_series, bucket, start, end, coffee_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(series)
 
 @router.get("/consumption")
 async def get_consumption_analysis_endpoint(
     days: int = Query(1, description="Número de dias para análise (padrão: 1)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_session)
 ):
     """
     Análise de consumo de insumos para baristas.
@@ -225,4 +499,234 @@ async def get_consumption_analysis_endpoint(
     - `total_coffee_grounds_g`: Total de café moído consumido (g)
     - `daily_averages`: Médias diárias de consumo
     """
-    return get_consumption_analysis(db, days)
+    return await run_in_session(db, get_consumption_analysis, days)
+
+@router.get("/consumption/forecast")
+async def get_consumption_forecast_endpoint(
+    days: int = Query(1, ge=1, le=30, description="Dias a prever a partir de amanhã (UTC)"),
+    history_days: int = Query(28, ge=7, le=365, description="Dias de histórico considerados"),
+    db: Session = Depends(get_read_session)
+):
+    """
+    Projeção de consumo de insumos para os próximos dias.
+    
+    Usa o histórico horário de consumo para calcular o perfil médio de cada
+    hora de cada dia da semana e o ajusta pela tendência recente (suavização
+    exponencial dos totais diários). Cada valor vem com uma banda de confiança
+    de 95%.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/orders/consumption/forecast?days={days}&history_days={history_days}
+    ```
+    
+    **Query Parameters:**
+    - `days` (int, optional): Dias a prever, de 1 a 30 (padrão: 1)
+    - `history_days` (int, optional): Dias de histórico, de 7 a 365 (padrão: 28)
+    
+    **CURL Example:**
+    ```bash
+    curl -X GET "http://localhost:8000/orders/consumption/forecast?days=2" \
+      -H "accept: application/json"
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "history_days": 28,
+        "days": 2,
+        "forecast": [
+            {
+                "date": "2025-09-19",
+                "cups": {"expected": 48.2, "lower": 39.5, "upper": 56.9},
+                "water_ml": {"expected": 2410.0, "lower": 1980.4, "upper": 2839.6},
+                "milk_ml": {"expected": 1930.5, "lower": 1522.1, "upper": 2338.9},
+                "coffee_grounds_g": {"expected": 723.0, "lower": 598.2, "upper": 847.8}
+            }
+        ],
+        "totals": {
+            "cups": 96.1,
+            "water_ml": 4805.3,
+            "milk_ml": 3849.0,
+            "coffee_grounds_g": 1441.5
+        }
+    }
+    ```
+    
+    **Response Fields:**
+    - `forecast`: Um item por dia previsto, com valor esperado e banda (`lower`/`upper`)
+    - `totals`: Soma dos valores esperados no período previsto
+    """
+    return await run_in_session(db, get_consumption_forecast, days, history_days)
+
+@router.patch("/{order_id}/status", response_model=OrderStatusResponse, dependencies=[Depends(remember_write)])
+async def update_order_status_endpoint(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    db: Session = Depends(get_session)
+):
+    """
+    Atualiza o status de um pedido pendente.
+    
+    A transição só acontece a partir de `pending`: se outro barista já concluiu
+    o pedido, a requisição retorna 409 sem alterar nada.
+    
+    **Request URL:**
+    ```
+    PATCH http://localhost:8000/orders/{order_id}/status
+    ```
+    
+    **Request Body:**
+    ```json
+    {
+        "status": "completed"
+    }
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -X PATCH "http://localhost:8000/orders/1/status" \
+      -H "Content-Type: application/json" \
+      -d '{"status": "completed"}'
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "id": 1,
+        "status": "completed"
+    }
+    ```
+    
+    **Errors:**
+    - `404`: Pedido não encontrado
+    - `409`: Pedido não está mais pendente
+    """
+    updated = await run_in_session(db, transition_orders, [order_id], status_update.status)
+    if order_id not in updated:
+        order = await run_in_session(db, get_order_by_id, order_id)
+        if order is None:
+            raise HTTPException(status_code=404, detail=f"Pedido {order_id} não encontrado")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Pedido {order_id} não está pendente (status atual: {order.status})"
+        )
+    return OrderStatusResponse(id=order_id, status=status_update.status)
+
+@router.post("/complete", response_model=OrderBulkCompleteResponse, dependencies=[Depends(remember_write)])
+async def complete_orders_endpoint(
+    bulk: OrderBulkComplete,
+    db: Session = Depends(get_session)
+):
+    """
+    Conclui vários pedidos pendentes de uma vez.
+    
+    Todos os pedidos são alterados com um único UPDATE, apenas se ainda estiverem
+    pendentes. Pedidos inexistentes ou já concluídos são listados em `skipped`.
+    
+    **Request URL:**
+    ```
+    POST http://localhost:8000/orders/complete
+    ```
+    
+    **Request Body:**
+    ```json
+    {
+        "order_ids": [1, 2, 3]
+    }
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -X POST "http://localhost:8000/orders/complete" \
+      -H "Content-Type: application/json" \
+      -d '{"order_ids": [1, 2, 3]}'
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "completed": [1, 3],
+        "skipped": [2]
+    }
+    ```
+    
+    **Response Fields:**
+    - `completed`: Pedidos concluídos por esta requisição
+    - `skipped`: Pedidos inexistentes ou que já não estavam pendentes
+    """
+    completed = await run_in_session(db, transition_orders, bulk.order_ids, ORDER_STATUS_COMPLETED)
+    done = set(completed)
+    skipped = sorted({order_id for order_id in bulk.order_ids if order_id not in done})
+    return OrderBulkCompleteResponse(completed=completed, skipped=skipped)
+
+@router.get("/stream")
+async def stream_orders_endpoint(request: Request):
+    """
+    Stream (Server-Sent Events) de novos pedidos e mudanças de status.
+    
+    Substitui o polling de `/orders/pending` nos displays da cozinha: cada
+    pedido confirmado é enviado uma única vez para todos os displays
+    conectados a este worker. Ao conectar, carregue `/orders/pending` uma vez
+    e aplique os eventos recebidos.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/orders/stream
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -N "http://localhost:8000/orders/stream"
+    ```
+    
+    **Eventos:**
+    ```
+    event: order_created
+    data: {"id": 1, "created_at": "2025-09-18T17:39:33.186615", "total_price": 8.5, "status": "pending", "items": [...]}
+    
+    event: order_status
+    data: {"ids": [1, 2], "status": "completed"}
+    
+    event: orders_imported
+    data: {"ids": [3, 4, 5]}
+    
+    event: resync
+    data: {}
+    ```
+    
+    - `order_created`: Pedido criado (mesmo formato da resposta de `POST /orders/`)
+    - `order_status`: Pedidos que mudaram de status
+    - `orders_imported`: Pedidos gravados por `POST /orders/bulk`, em um único
+      evento por lote (só os IDs); recarregue `/orders/pending` para obtê-los
+    - `resync`: O display não acompanhou o volume de eventos; o stream é
+      encerrado e o cliente deve recarregar `/orders/pending` e reconectar
+    
+    Comentários `: keep-alive` são enviados periodicamente enquanto não há eventos.
+    """
+    subscription = order_events.subscribe()
+    
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.ORDER_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            order_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
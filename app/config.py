@@ -1,11 +1,55 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _budget(name: str, rate: float, burst: int, concurrency: int) -> dict:
+    """Orçamento de admissão com valores padrão sobrescritos por RATE_LIMIT_<NOME>_*"""
+    prefix = f"RATE_LIMIT_{name.upper()}_"
+    return {
+        "rate": float(os.getenv(prefix + "RATE", str(rate))),  # Requisições/s por cliente
+        "burst": int(os.getenv(prefix + "BURST", str(burst))),  # Rajada máxima por cliente
+        "concurrency": int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),  # Em voo no worker; 0 = sem limite
+    }
+
+def _routes(defaults: dict, budgets: dict) -> dict:
+    """Prefixo -> orçamento padrão, sobrescrito ou ampliado por RATE_LIMIT_ROUTES ("/prefixo=orçamento,...")"""
+    routes = dict(defaults)
+    for entry in os.getenv("RATE_LIMIT_ROUTES", "").split(","):
+        if not entry.strip():
+            continue
+        prefix, _, name = (part.strip() for part in entry.partition("="))
+        if not prefix.startswith("/") or name not in budgets:
+            raise ValueError(f"Entrada inválida em RATE_LIMIT_ROUTES: {entry.strip()!r}")
+        routes[prefix] = name
+    return routes
+
 class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Usa AsyncSession (asyncpg/aiosqlite) nas rotas em vez da sessão síncrona
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+    
+    # Pool de conexões (por worker)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # -1 desativa
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 desativa
+    
+    # Réplica de leitura: rotas somente leitura usam READ_DATABASE_URL quando definido
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    # Atraso máximo aceito; acima dele (ou réplica fora do ar) as leituras vão ao primário
+    READ_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "5"))
+    READ_REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("READ_REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+    # Depois de uma escrita, as leituras do mesmo cliente vão ao primário por este tempo
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+    
+    # Arquivamento: pedidos concluídos mais antigos que a retenção saem de orders/order_items
+    ARCHIVE_RETENTION_DAYS: int = int(os.getenv("ARCHIVE_RETENTION_DAYS", "180"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))  # Pedidos por transação
     
     # API
     API_TITLE: str = "Coffee Shop API"
@@ -14,5 +58,73 @@ class Settings:
     
     # CORS
     ALLOWED_ORIGINS: list = ["*"]
+    
+    # Stream de pedidos (SSE): eventos enfileirados por assinante e intervalo de keep-alive
+    ORDER_STREAM_QUEUE_SIZE: int = int(os.getenv("ORDER_STREAM_QUEUE_SIZE", "256"))
+    ORDER_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("ORDER_STREAM_HEARTBEAT_SECONDS", "15"))
+    
+    # Serialização direta (dicts + orjson) nas listagens, sem validação Pydantic da resposta
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+    
+    # Idempotency-Key em POST /orders/: "memory" (por worker) ou "database" (vários workers)
+    IDEMPOTENCY_BACKEND: str = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))  # Apenas backend memory
+    # Espera máxima de uma repetição enquanto a requisição original ainda está em andamento
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+    # Intervalo mínimo entre limpezas das chaves expiradas (apenas backend database)
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS: float = float(os.getenv("IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS", "300"))
+    
+    # Controle de admissão (rate limit por cliente + limite de concorrência por orçamento)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Header que identifica o cliente (ex: X-Terminal-Id); sem ele, o IP de origem
+    RATE_LIMIT_CLIENT_HEADER: str = os.getenv("RATE_LIMIT_CLIENT_HEADER", "")
+    RATE_LIMIT_BUDGETS: dict = {
+        "menu": _budget("menu", 20, 40, 0),
+        "expensive": _budget("expensive", 1, 5, 4),
+        "default": _budget("default", 10, 20, 32),
+    }
+    # Prefixo da rota -> orçamento (vence o prefixo mais longo)
+    RATE_LIMIT_ROUTES: dict = _routes({
+        "/menu": "menu",
+        "/orders/consumption": "expensive",
+        "/orders/export": "expensive",
+        "/orders/sales": "expensive",
+        "/": "default",
+    }, RATE_LIMIT_BUDGETS)
+    # Rotas fora do controle de admissão
+    RATE_LIMIT_EXEMPT: list = ["/orders/stream", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"]
+    
+    # Métricas no formato Prometheus em /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    
+    # Aviso no log de requisições acima do orçamento de consultas ao banco
+    QUERY_BUDGET_ENABLED: bool = os.getenv("QUERY_BUDGET_ENABLED", "false").lower() in ("1", "true", "yes")
+    QUERY_BUDGET_DEFAULT: int = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+    # Repetições do mesmo SQL em uma requisição que caracterizam N+1
+    QUERY_BUDGET_DUPLICATES: int = int(os.getenv("QUERY_BUDGET_DUPLICATES", "3"))
+    # Template da rota -> consultas esperadas (POST /orders/ com folga para a Idempotency-Key no banco)
+    QUERY_BUDGETS: dict = {
+        "/menu/": 1,
+        "/menu/all": 1,
+        "/orders/": 10,
+        "/orders/bulk": 4,
+        "/orders/pending": 2,
+        "/orders/export": 1,
+        "/orders/sales": 1,
+        "/orders/consumption": 1,
+        "/orders/consumption/forecast": 1,
+        "/orders/{order_id}/status": 1,
+        "/orders/complete": 1,
+    }
+    
+    # Profiling sob demanda: requisições com PROFILING_HEADER igual ao segredo
+    # são perfiladas (vazio desativa)
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    PROFILING_HEADER: str = os.getenv("PROFILING_HEADER", "X-Profile-Token")
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "coffee-shop-profiles"))
+    
+    # Cache do menu (segundos; 0 desativa a expiração por tempo)
+    MENU_CACHE_TTL_SECONDS: int = int(os.getenv("MENU_CACHE_TTL_SECONDS", "60"))
 
 settings = Settings()
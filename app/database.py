@@ -1,13 +1,25 @@
 import os 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app import metrics
+from app.config import settings
+from app.db_pool import engine_options
+from app.read_routing import reads_from_primary, replica_monitor
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Drivers assíncronos usados quando DATABASE_ASYNC está habilitado
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -19,6 +31,129 @@ def get_db():
         yield db
     finally:
         db.close()
-        
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+
+def async_database_url(url: str) -> str:
+    """Converte a URL síncrona do banco para o driver assíncrono equivalente"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    _async_url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependência das rotas: sessão assíncrona ou síncrona conforme DATABASE_ASYNC
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+
+# Réplica de leitura (opcional), usada pelas rotas somente leitura
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, **engine_options(settings.READ_DATABASE_URL))
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    if settings.DATABASE_ASYNC:
+        _async_read_url = async_database_url(settings.READ_DATABASE_URL)
+        async_read_engine = create_async_engine(_async_read_url, **engine_options(_async_read_url, is_async=True))
+        AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
+
+def get_read_db(request: Request, primary=Depends(get_db)):
+    """Sessão das rotas somente leitura.
+
+    Usa a réplica quando configurada, exceto logo após uma escrita do mesmo
+    cliente (read-your-writes) ou com a réplica fora do ar ou atrasada:
+    nesses casos a leitura vai ao primário. Um erro do banco durante uma
+    leitura na réplica a marca como indisponível até a próxima verificação.
+    """
+    if ReadSessionLocal is None:
+        yield primary
+        return
+    if reads_from_primary(request):
+        metrics.db_reads.inc(("read_your_writes",))
+        yield primary
+        return
+    db = ReadSessionLocal()
+    try:
+        if replica_monitor.claim_check():
+            replica_monitor.check(db)
+        if replica_monitor.available:
+            metrics.db_reads.inc(("replica",))
+            try:
+                yield db
+            except exc.DBAPIError:
+                replica_monitor.report(None)
+                raise
+        else:
+            metrics.db_reads.inc(("fallback",))
+            yield primary
+    finally:
+        db.close()
+
+async def get_read_async_db(request: Request, primary=Depends(get_async_db)):
+    """Equivalente assíncrono de ``get_read_db``"""
+    if AsyncReadSessionLocal is None:
+        yield primary
+        return
+    if reads_from_primary(request):
+        metrics.db_reads.inc(("read_your_writes",))
+        yield primary
+        return
+    async with AsyncReadSessionLocal() as db:
+        if replica_monitor.claim_check():
+            await replica_monitor.check_async(db)
+        if replica_monitor.available:
+            metrics.db_reads.inc(("replica",))
+            try:
+                yield db
+            except exc.DBAPIError:
+                replica_monitor.report(None)
+                raise
+        else:
+            metrics.db_reads.inc(("fallback",))
+            yield primary
+
+get_read_session = get_read_async_db if settings.DATABASE_ASYNC else get_read_db
+
+async def run_in_session(db, fn, *args, **kwargs):
+    """Executa uma função de serviço com a sessão da requisição.
+
+    Com ``AsyncSession`` a função roda via ``run_sync``: o mesmo código de
+    serviço usa o driver assíncrono sem bloquear o event loop. Com a sessão
+    síncrona a função é chamada diretamente.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
+
+# Revisão que corresponde ao esquema criado por create_all antes das migrations
+LEGACY_BASELINE_REVISION = "0001"
+
+def create_tables(bind=None):
+    """Aplica as migrations pendentes (equivalente a ``alembic upgrade head``).
+
+    Bancos criados antes das migrations (sem ``alembic_version``) são
+    marcados com a revisão inicial antes do upgrade.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini"))
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "orders" in tables and "alembic_version" not in tables:
+            command.stamp(config, LEGACY_BASELINE_REVISION)
+        command.upgrade(config, "head")
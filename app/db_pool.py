@@ -0,0 +1,111 @@
+import bisect
+import threading
+import time
+from sqlalchemy import exc, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import settings
+
+# Limites (em ms) dos buckets do histograma de espera por conexão
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class PoolStats:
+    """Contadores de espera por conexão de um pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.timeouts = 0
+
+    def observe_wait(self, wait_ms: float):
+        index = bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.bucket_counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "count": self.wait_count,
+                "sum_ms": round(self.wait_sum_ms, 3),
+                "buckets": buckets,
+                "timeouts": self.timeouts,
+            }
+
+class _TimedPoolMixin:
+    """Mede o tempo que cada checkout espera por uma conexão livre"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.observe_timeout()
+            raise
+        finally:
+            self.stats.observe_wait((time.perf_counter() - started) * 1000)
+
+class InstrumentedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Monta os argumentos de ``create_engine`` a partir das configurações do pool"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+
+    # SQLite em memória usa um pool próprio de conexão única
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if backend == "postgresql" and timeout_ms > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+def pool_status(engine) -> dict:
+    """Retorna o estado atual do pool de um engine"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status["wait_ms"] = stats.snapshot()
+    return status
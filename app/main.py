@@ -1,8 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import create_tables
+from app.database import async_engine, async_read_engine, create_tables, engine, read_engine
+from app.db_pool import pool_status
 from app.api import coffee_router, order_router
+from app.metrics import CONTENT_TYPE, registry
+from app.middleware import (
+    AdmissionControlMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryBudgetMiddleware
+)
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -13,6 +21,24 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Profiling sob demanda com o header secreto
+# (o middleware registrado primeiro fica mais perto das rotas)
+if settings.PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware)
+
+# Aviso de requisições acima do orçamento de consultas
+if settings.QUERY_BUDGET_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Métricas por rota
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Controle de admissão: rejeita com 429/503 antes de chegar aos handlers.
+# Registrado antes do CORS para que as rejeições também levem os headers CORS.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -115,3 +141,129 @@ async def health_check():
     - Verificação de conectividade
     """
     return {"status": "healthy"}
+
+@app.get("/health/pool")
+async def pool_health_check():
+    """
+    Estado dos pools de conexão com o banco.
+    
+    Mostra, para cada engine deste worker, as conexões em uso, o overflow e
+    o histograma do tempo de espera por uma conexão livre.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/health/pool
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -X GET "http://localhost:8000/health/pool" \
+      -H "accept: application/json"
+    ```
+    
+    **Response Example:**
+    ```json
+    {
+        "pools": {
+            "primary": {
+                "pool_class": "InstrumentedQueuePool",
+                "size": 5,
+                "checked_in": 4,
+                "checked_out": 1,
+                "overflow": 0,
+                "max_overflow": 10,
+                "timeout_s": 30.0,
+                "wait_ms": {
+                    "count": 120,
+                    "sum_ms": 3.2,
+                    "buckets": {"1": 118, "5": 120, "+Inf": 120},
+                    "timeouts": 0
+                }
+            }
+        }
+    }
+    ```
+    
+    **Response Fields:**
+    - `checked_out`: Conexões emprestadas no momento
+    - `overflow`: Conexões abertas além de `size`
+    - `wait_ms.buckets`: Contagem acumulada de checkouts por tempo de espera (ms)
+    - `wait_ms.timeouts`: Checkouts que estouraram `DB_POOL_TIMEOUT`
+    - Com `READ_DATABASE_URL` definido, a réplica aparece como `replica`
+    """
+    return {"pools": _pool_statuses()}
+
+def _pool_statuses() -> dict:
+    pools = {"primary": pool_status(engine)}
+    if async_engine is not None:
+        pools["primary_async"] = pool_status(async_engine.sync_engine)
+    if read_engine is not None:
+        pools["replica"] = pool_status(read_engine)
+    if async_read_engine is not None:
+        pools["replica_async"] = pool_status(async_read_engine.sync_engine)
+    return pools
+
+def _pool_connections() -> dict:
+    """Conexões de cada pool por estado, para o gauge ``db_pool_connections``"""
+    gauges = {}
+    for name, status in _pool_statuses().items():
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in status:
+                gauges[(name, state)] = status[state]
+    return gauges
+
+registry.gauge(
+    "db_pool_connections", "Conexões dos pools do banco por estado", ("pool", "state"),
+    collect_fn=_pool_connections,
+)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Métricas do worker no formato texto do Prometheus.
+    
+    Expõe contagem e latência das requisições por template de rota, requisições
+    em andamento, consultas e tempo no banco por requisição, pedidos
+    registrados e o uso dos pools de conexão. Os contadores são mantidos por
+    thread, sem lock no caminho das requisições.
+    
+    **Request URL:**
+    ```
+    GET http://localhost:8000/metrics
+    ```
+    
+    **CURL Example:**
+    ```bash
+    curl -X GET "http://localhost:8000/metrics"
+    ```
+    
+    **Response Example:**
+    ```
+    # HELP http_requests_total Requisições HTTP atendidas
+    # TYPE http_requests_total counter
+    http_requests_total{method="GET",route="/orders/pending",status="200"} 42
+    # HELP http_request_duration_seconds Latência das requisições HTTP
+    # TYPE http_request_duration_seconds histogram
+    http_request_duration_seconds_bucket{method="GET",route="/orders/pending",le="0.005"} 30
+    ...
+    http_request_duration_seconds_sum{method="GET",route="/orders/pending"} 0.19
+    http_request_duration_seconds_count{method="GET",route="/orders/pending"} 42
+    # HELP orders_created_total Pedidos registrados
+    # TYPE orders_created_total counter
+    orders_created_total{source="pos"} 17
+    ```
+    
+    **Métricas:**
+    - `http_requests_total`: Requisições por método, rota e status
+    - `http_request_duration_seconds`: Histograma de latência por rota
+    - `http_requests_in_flight`: Requisições em andamento por método
+    - `http_request_db_queries` / `http_request_db_duration_seconds`: Consultas e tempo no banco por requisição
+    - `orders_created_total`: Pedidos registrados (`pos` ou `bulk`)
+    - `db_reads_total`: Destino das rotas de leitura com réplica configurada
+    - `db_pool_connections`: Conexões de cada pool por estado
+    
+    **Observações:**
+    - Cada worker expõe os próprios valores; agregue no Prometheus
+    - Requisições sem rota correspondente usam `route="unmatched"`
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,233 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Content-Type do formato texto do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (em segundos) dos buckets de latência das requisições
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Limites dos buckets de consultas ao banco por requisição
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+# Limites (em segundos) dos buckets de tempo no banco por requisição
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+class _Shards:
+    """Um dicionário de valores por thread.
+
+    Cada thread escreve apenas no seu shard, então os incrementos não
+    disputam lock; a coleta soma os shards de todas as threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def all(self) -> list:
+        with self._lock:
+            return list(self._shards)
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+
+    def samples(self):
+        """Pares (sufixo, labels, valor) no formato de exposição"""
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Contador monotônico"""
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in self._shards.all():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self):
+        for labels, value in sorted(self.collect().items()):
+            yield "", dict(zip(self.labelnames, labels)), value
+
+class Gauge(Counter):
+    """Valor que sobe e desce, ou lido na coleta por ``collect_fn``"""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), collect_fn: Callable[[], dict] = None):
+        super().__init__(name, help, labelnames)
+        self.collect_fn = collect_fn
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def collect(self) -> dict:
+        if self.collect_fn is not None:
+            return self.collect_fn()
+        return super().collect()
+
+class Histogram(_Metric):
+    """Histograma com buckets fixos"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: tuple = ()):
+        shard = self._shards.local()
+        series = shard.get(labels)
+        if series is None:
+            # Contagem por bucket (o último é +Inf) seguida da soma
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in self._shards.all():
+            for labels, series in list(shard.items()):
+                merged = totals.get(labels)
+                if merged is None:
+                    totals[labels] = list(series)
+                else:
+                    for index, value in enumerate(series):
+                        merged[index] += value
+        return totals
+
+    def samples(self):
+        for labels, series in sorted(self.collect().items()):
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield "_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield "_sum", base, series[-1]
+            yield "_count", base, cumulative
+
+class MetricsRegistry:
+    """Conjunto de métricas expostas em ``/metrics``"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = (), collect_fn: Callable[[], dict] = None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, collect_fn))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Todas as métricas no formato texto do Prometheus"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Requisições HTTP atendidas", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento", ("method",)
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Consultas ao banco por requisição", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Tempo no banco por requisição", ("method", "route"), DB_TIME_BUCKETS
+)
+orders_created = registry.counter(
+    "orders_created_total", "Pedidos registrados", ("source",)
+)
+db_reads = registry.counter(
+    "db_reads_total", "Sessões das rotas de leitura por destino (replica, read_your_writes, fallback)", ("target",)
+)
+
+# Consultas e tempo no banco da requisição atual: [consultas, segundos]
+_request_db_usage: ContextVar[Optional[list]] = ContextVar("request_db_usage", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db_usage.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    usage = _request_db_usage.get()
+    started = getattr(context, "_metrics_started", None)
+    if usage is not None and started is not None:
+        usage[0] += 1
+        usage[1] += time.perf_counter() - started
+
+def track_db_queries():
+    """Conta consultas e tempo no banco de todos os engines (síncronos e assíncronos)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def start_request_db_usage():
+    """Passa a acumular o uso do banco no contexto atual; devolve (uso, token)"""
+    usage = [0, 0.0]
+    return usage, _request_db_usage.set(usage)
+
+def stop_request_db_usage(token):
+    """Encerra o acúmulo; o uso é somado ao contexto externo, se houver"""
+    usage = _request_db_usage.get()
+    _request_db_usage.reset(token)
+    outer = _request_db_usage.get()
+    if outer is not None and usage is not None:
+        outer[0] += usage[0]
+        outer[1] += usage[1]
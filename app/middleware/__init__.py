@@ -0,0 +1,13 @@
+from .admission import AdmissionControlMiddleware, Budget, TokenBuckets
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .query_budget import QueryBudgetMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "Budget",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "QueryBudgetMiddleware",
+    "TokenBuckets",
+]
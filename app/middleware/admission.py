@@ -0,0 +1,125 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+from starlette.responses import JSONResponse
+from app.config import settings
+
+# Limite de buckets (orçamento, cliente) mantidos por worker; os mais antigos são descartados
+MAX_TRACKED_CLIENTS = 10000
+# Retry-After sugerido quando o orçamento está sem vagas de concorrência
+CONCURRENCY_RETRY_AFTER_SECONDS = 1
+
+class Budget(NamedTuple):
+    """Orçamento de admissão de um grupo de rotas"""
+    name: str
+    rate: float  # Requisições/s repostas no bucket de cada cliente
+    burst: int  # Capacidade do bucket de cada cliente
+    concurrency: int = 0  # Requisições simultâneas no worker; 0 = sem limite
+
+class TokenBuckets:
+    """Token buckets por (orçamento, cliente), com limite de tamanho (LRU)"""
+
+    def __init__(self, max_clients: int = MAX_TRACKED_CLIENTS, clock: Callable[[], float] = time.monotonic):
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets = OrderedDict()  # (budget, client) -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, budget: Budget, client: str) -> Optional[float]:
+        """Consome um token; retorna ``None`` se admitido ou os segundos até o próximo token"""
+        if budget.rate <= 0:
+            return None
+        now = self.clock()
+        key = (budget.name, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(budget.burst), now]
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(budget.burst, bucket[0] + (now - bucket[1]) * budget.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return None
+            return (1 - bucket[0]) / budget.rate
+
+class AdmissionControlMiddleware:
+    """Rate limit por cliente e limite de concorrência por orçamento de rotas.
+
+    Cada rota é associada ao orçamento do prefixo mais longo em ``routes``.
+    Requisições acima da taxa do cliente recebem 429 e, acima do limite de
+    requisições simultâneas do orçamento no worker, 503 — ambas com
+    ``Retry-After`` e antes de chegar aos handlers e ao banco. Middleware ASGI
+    puro, para não bufferizar respostas em streaming.
+    """
+
+    def __init__(
+        self,
+        app,
+        budgets: dict = None,
+        routes: dict = None,
+        exempt: list = None,
+        client_header: str = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.app = app
+        budgets = settings.RATE_LIMIT_BUDGETS if budgets is None else budgets
+        self.budgets = {name: Budget(name=name, **config) for name, config in budgets.items()}
+        routes = settings.RATE_LIMIT_ROUTES if routes is None else routes
+        self.routes = sorted(routes.items(), key=lambda route: len(route[0]), reverse=True)
+        self.exempt = tuple(settings.RATE_LIMIT_EXEMPT if exempt is None else exempt)
+        client_header = settings.RATE_LIMIT_CLIENT_HEADER if client_header is None else client_header
+        self.client_header = client_header.lower().encode("latin-1") if client_header else None
+        self.buckets = TokenBuckets(clock=clock)
+        self.in_flight = {name: 0 for name in self.budgets}
+
+    def budget_for(self, path: str) -> Optional[Budget]:
+        """Orçamento da rota, ou ``None`` se ela não passa pelo controle de admissão"""
+        if any(path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in self.exempt):
+            return None
+        for prefix, name in self.routes:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return self.budgets[name]
+        return None
+
+    def client_id(self, scope) -> str:
+        """Identificador do cliente: header configurado ou IP de origem"""
+        if self.client_header:
+            for name, value in scope.get("headers", []):
+                if name == self.client_header:
+                    return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        budget = self.budget_for(scope["path"])
+        if budget is None:
+            return await self.app(scope, receive, send)
+
+        retry_after = self.buckets.take(budget, self.client_id(scope))
+        if retry_after is not None:
+            response = _reject(429, "Limite de requisições excedido", retry_after)
+            return await response(scope, receive, send)
+        if budget.concurrency and self.in_flight[budget.name] >= budget.concurrency:
+            response = _reject(503, "Servidor ocupado, tente novamente", CONCURRENCY_RETRY_AFTER_SECONDS)
+            return await response(scope, receive, send)
+
+        self.in_flight[budget.name] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[budget.name] -= 1
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
@@ -0,0 +1,46 @@
+import time
+from app import metrics
+
+# Rótulo das requisições que não casaram com nenhuma rota (evita um label por URL)
+UNMATCHED_ROUTE = "unmatched"
+
+class MetricsMiddleware:
+    """Registra contagem, latência e uso do banco de cada requisição HTTP.
+
+    As métricas são rotuladas pelo template da rota (``/orders/{order_id}/status``),
+    não pela URL, para manter a cardinalidade fixa. Middleware ASGI puro: a
+    latência de respostas em streaming vai até o fim do stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        metrics.track_db_queries()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        usage, token = metrics.start_request_db_usage()
+        metrics.http_requests_in_flight.inc((method,))
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_requests_in_flight.dec((method,))
+            metrics.stop_request_db_usage(token)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            labels = (method, route)
+            metrics.http_requests.inc((method, route, str(status_code)))
+            metrics.http_request_duration.observe(elapsed, labels)
+            metrics.http_request_db_queries.observe(usage[0], labels)
+            metrics.http_request_db_duration.observe(usage[1], labels)
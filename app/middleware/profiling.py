@@ -0,0 +1,166 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from app import metrics
+from app.config import settings
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES_DIR = os.path.join(APP_DIR, "services") + os.sep
+# Funções cujo tempo acumulado conta como serialização da resposta
+SERIALIZATION_FUNCTIONS = {"serialize_response", "render", "jsonable_encoder"}
+SERIALIZATION_MODULES = ("fastapi", "starlette", os.path.join("app", "serialization.py"))
+# Funções listadas no resumo JSON
+TOP_FUNCTIONS = 25
+# Um perfil por vez no processo: o cProfile instala um hook global por
+# interpretador (no 3.12+ um segundo ``enable()`` falha com ValueError)
+_profiling = threading.Lock()
+
+class ProfilingMiddleware:
+    """Perfila requisições que trazem o header secreto de profiling.
+
+    A requisição roda sob o ``cProfile`` e gera, em ``directory``, um ``.prof``
+    (abra com ``python -m pstats`` ou snakeviz) e um ``.json`` com o tempo
+    separado em handler da rota, funções de serviço, execução de SQL e
+    serialização da resposta, além das funções mais custosas. O nome dos
+    arquivos volta no header ``X-Profile-Id``.
+
+    Só uma requisição é perfilada por vez no processo; as que chegam com um
+    perfil em andamento são atendidas sem profiling e recebem
+    ``X-Profile-Skipped: busy``. O profiler cobre a thread do event loop:
+    requisições não perfiladas atendidas ao mesmo tempo no worker também
+    aparecem no ``.prof``, e o trabalho no threadpool (dependências síncronas,
+    iteradores síncronos de ``StreamingResponse``) entra apenas como espera.
+    """
+
+    def __init__(self, app, secret: str = None, header: str = None, directory: str = None):
+        self.app = app
+        self.secret = (settings.PROFILING_SECRET if secret is None else secret).encode("utf-8")
+        header = settings.PROFILING_HEADER if header is None else header
+        self.header = header.lower().encode("latin-1")
+        self.directory = settings.PROFILING_DIR if directory is None else directory
+        metrics.track_db_queries()
+
+    def _requested(self, scope) -> bool:
+        if not self.secret:
+            return False
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                return hmac.compare_digest(value, self.secret)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            return await self.app(scope, receive, send)
+        if not _profiling.acquire(blocking=False):
+            return await self.app(scope, receive, _with_header(send, b"x-profile-skipped", b"busy"))
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profiling.release()
+
+    async def _profile(self, scope, receive, send):
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+        send_with_profile_id = _with_header(send, b"x-profile-id", profile_id.encode("latin-1"))
+        profiler = cProfile.Profile()
+        usage, token = metrics.start_request_db_usage()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            metrics.stop_request_db_usage(token)
+            self._write(profile_id, scope, profiler, elapsed, usage)
+
+    def _write(self, profile_id: str, scope, profiler: cProfile.Profile, elapsed: float, usage: list):
+        route = getattr(scope.get("route"), "path", None)
+        endpoint = getattr(scope.get("route"), "endpoint", None)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route or scope["path"]).strip("_") or "root"
+        base = os.path.join(self.directory, f"{profile_id}-{scope['method']}-{slug}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(base + ".prof")
+        summary = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "route": route,
+            "breakdown_ms": breakdown(stats, elapsed, usage, endpoint),
+            "db_queries": usage[0],
+            "top_functions": top_functions(stats),
+        }
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+
+def _with_header(send, name: bytes, value: bytes):
+    """``send`` que acrescenta um header ao início da resposta"""
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message["headers"] = [*message.get("headers", []), (name, value)]
+        await send(message)
+    return wrapped
+
+def _cumulative(stats: pstats.Stats, predicate) -> float:
+    """Tempo acumulado das funções selecionadas que não são chamadas por outra selecionada"""
+    selected = {func for func in stats.stats if predicate(func)}
+    total = 0.0
+    for func in selected:
+        _, _, _, cumulative, callers = stats.stats[func]
+        if not any(caller in selected for caller in callers):
+            total += cumulative
+    return total
+
+def _is_serialization(func) -> bool:
+    filename, _, name = func
+    return name in SERIALIZATION_FUNCTIONS and any(module in filename for module in SERIALIZATION_MODULES)
+
+def breakdown(stats: pstats.Stats, elapsed: float, usage: list, endpoint=None) -> dict:
+    """Tempo da requisição (ms) em partes disjuntas: handler, serviço, SQL, serialização e o resto"""
+    sql = usage[1]
+    service = _cumulative(stats, lambda func: func[0].startswith(SERVICES_DIR))
+    serialization = _cumulative(stats, _is_serialization)
+    handler = 0.0
+    code = getattr(endpoint, "__code__", None)
+    if code is not None:
+        handler = _cumulative(
+            stats, lambda func: func == (code.co_filename, code.co_firstlineno, code.co_name)
+        )
+    parts = {
+        "sql": sql,
+        "service": max(service - sql, 0.0),
+        # O handler inclui o serviço (e o SQL) que ele chamou
+        "handler": max(handler - service, 0.0),
+        "serialization": serialization,
+    }
+    parts["other"] = max(elapsed - sum(parts.values()), 0.0)
+    parts["total"] = elapsed
+    return {name: round(seconds * 1000, 3) for name, seconds in parts.items()}
+
+def _location(filename: str, line: int, name: str) -> str:
+    if filename.startswith(APP_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(APP_DIR))
+    return f"{filename}:{line}({name})"
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> list:
+    """Funções com maior tempo acumulado"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": _location(filename, line, name),
+            "calls": calls,
+            "self_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
@@ -0,0 +1,37 @@
+import logging
+from app.config import settings
+from app.query_recorder import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetMiddleware:
+    """Avisa no log quando uma requisição excede o orçamento de consultas da rota.
+
+    O orçamento vem de ``QUERY_BUDGETS`` (template da rota -> consultas) ou de
+    ``QUERY_BUDGET_DEFAULT``. Também avisa quando o mesmo SQL se repete
+    ``QUERY_BUDGET_DUPLICATES`` vezes (N+1). O aviso inclui o call site na
+    aplicação de cada consulta repetida. A requisição não é interrompida.
+    """
+
+    def __init__(self, app, budgets: dict = None, default: int = None, duplicates: int = None):
+        self.app = app
+        self.budgets = settings.QUERY_BUDGETS if budgets is None else budgets
+        self.default = settings.QUERY_BUDGET_DEFAULT if default is None else default
+        self.duplicates = settings.QUERY_BUDGET_DUPLICATES if duplicates is None else duplicates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with QueryRecorder() as recorder:
+            await self.app(scope, receive, send)
+
+        route = getattr(scope.get("route"), "path", None)
+        if route is None:
+            return
+        budget = self.budgets.get(route, self.default)
+        if recorder.count > budget or recorder.duplicates(self.duplicates):
+            logger.warning(
+                "%s %s excedeu o orçamento de %d consultas: %s",
+                scope["method"], route, budget, recorder.report(),
+            )
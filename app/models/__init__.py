@@ -1,4 +1,7 @@
 from .coffee import Coffee
 from .order import Order, OrderItem
+from .archive import OrderArchive, OrderItemArchive
+from .consumption import ConsumptionHourly
+from .idempotency import IdempotencyKey
 
-__all__ = ["Coffee", "Order", "OrderItem"]
+__all__ = ["Coffee", "Order", "OrderItem", "OrderArchive", "OrderItemArchive", "ConsumptionHourly", "IdempotencyKey"]
@@ -0,0 +1,41 @@
+from sqlalchemy import Integer, Column, String, Float, DateTime, ForeignKey, Index
+from app.database import Base
+
+class OrderArchive(Base):
+    """Pedido concluído movido de ``orders`` pelo job de arquivamento"""
+    __tablename__ = 'orders_archive'
+    
+    # Mesmo ID do pedido original
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, nullable=False)
+    total_price = Column(Float, nullable=False)  # Preço total em reais
+    status = Column(String, nullable=False)
+    
+    __table_args__ = (
+        # Leituras de períodos antigos (export, bordas das séries)
+        Index("ix_orders_archive_created_at", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<OrderArchive(id={self.id}, total_price={self.total_price}, status='{self.status}')>"
+
+class OrderItemArchive(Base):
+    """Item de um pedido arquivado, com o mesmo snapshot do café de ``order_items``"""
+    __tablename__ = 'order_items_archive'
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, ForeignKey('orders_archive.id'), nullable=False)
+    coffee_id = Column(Integer, ForeignKey('coffees.id'), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    coffee_name = Column(String, nullable=False)
+    unit_price_cents = Column(Integer, nullable=False)
+    water_ml = Column(Integer, nullable=False)
+    milk_ml = Column(Integer, nullable=False)
+    coffee_grounds_g = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_order_items_archive_order_id", "order_id"),
+    )
+    
+    def __repr__(self):
+        return f"<OrderItemArchive(order_id={self.order_id}, coffee_id={self.coffee_id}, quantity={self.quantity})>"
@@ -6,7 +6,7 @@ class Coffee(Base):
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, index=True, nullable=False)
-    price = Column(Integer, index=True, nullable=False)  # Preço em centavos
+    price = Column(Integer, nullable=False)  # Preço em centavos
     water_ml = Column(Integer, nullable=False)
     milk_ml = Column(Integer, nullable=False)
     coffee_grounds_g = Column(Integer, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Integer, Column, DateTime, ForeignKey
+from app.database import Base
+
+class ConsumptionHourly(Base):
+    """Consumo agregado por hora e por café, mantido junto com cada pedido"""
+    __tablename__ = 'consumption_hourly'
+    
+    bucket = Column(DateTime, primary_key=True)  # Início da hora (UTC)
+    coffee_id = Column(Integer, ForeignKey('coffees.id'), primary_key=True)
+    cups = Column(Integer, nullable=False, default=0)
+    water_ml = Column(Integer, nullable=False, default=0)
+    milk_ml = Column(Integer, nullable=False, default=0)
+    coffee_grounds_g = Column(Integer, nullable=False, default=0)
+    revenue_cents = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ConsumptionHourly(bucket={self.bucket}, coffee_id={self.coffee_id}, cups={self.cups})>"
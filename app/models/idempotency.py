@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Index, String, Text
+from app.database import Base
+
+class IdempotencyKey(Base):
+    """Resposta gravada para uma Idempotency-Key (backend de banco)"""
+    __tablename__ = 'idempotency_keys'
+    
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 do corpo da requisição
+    response = Column(Text, nullable=True)  # JSON da resposta; NULL enquanto em processamento
+    created_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        # Limpeza das chaves expiradas
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(key='{self.key}', done={self.response is not None})>"
@@ -1,8 +1,12 @@
-from sqlalchemy import Integer, Column, String, Float, DateTime, ForeignKey
+from sqlalchemy import Integer, Column, String, Float, DateTime, ForeignKey, Index, event, select, text
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.coffee import Coffee
 from datetime import datetime
 
+ORDER_STATUS_PENDING = 'pending'
+ORDER_STATUS_COMPLETED = 'completed'
+
 class Order(Base):
     __tablename__ = 'orders'
     
@@ -14,6 +18,20 @@ class Order(Base):
     # Relacionamento com itens do pedido
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     
+    # Índices mantidos pelas migrations (migrations/versions)
+    __table_args__ = (
+        # Filtros por status com ordenação por (created_at, id)
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        # Fila de pendentes (índice parcial no PostgreSQL e no SQLite)
+        Index(
+            "ix_orders_pending_created_at_id", "created_at", "id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        # Janelas de consumo e relatórios por período
+        Index("ix_orders_created_at", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<Order(id={self.id}, total_price={self.total_price}, status='{self.status}')>"
 
@@ -25,21 +43,57 @@ class OrderItem(Base):
     coffee_id = Column(Integer, ForeignKey('coffees.id'), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     
+    # Snapshot do café no momento do pedido (valores por unidade): leituras não
+    # dependem de coffees e editar o menu não altera pedidos já feitos
+    coffee_name = Column(String, nullable=False)
+    unit_price_cents = Column(Integer, nullable=False)
+    water_ml = Column(Integer, nullable=False)
+    milk_ml = Column(Integer, nullable=False)
+    coffee_grounds_g = Column(Integer, nullable=False)
+    
     # Relacionamentos
     order = relationship("Order", back_populates="items")
     coffee = relationship("Coffee")
     
-    @property
-    def coffee_name(self):
-        """Retorna o nome do café"""
-        return self.coffee.name if self.coffee else None
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_coffee_id_order_id", "coffee_id", "order_id"),
+    )
     
     @property
     def item_price(self):
-        """Calcula o preço total do item (preço do café * quantidade)"""
-        if self.coffee:
-            return (self.coffee.price * self.quantity) / 100  # Converte centavos para reais
-        return 0.0
+        """Calcula o preço total do item (preço unitário no pedido * quantidade)"""
+        return (self.unit_price_cents * self.quantity) / 100  # Converte centavos para reais
     
     def __repr__(self):
         return f"<OrderItem(order_id={self.order_id}, coffee_id={self.coffee_id}, quantity={self.quantity})>"
+
+# Colunas de OrderItem copiadas do café (coluna do item -> coluna de coffees)
+COFFEE_SNAPSHOT_COLUMNS = {
+    "coffee_name": "name",
+    "unit_price_cents": "price",
+    "water_ml": "water_ml",
+    "milk_ml": "milk_ml",
+    "coffee_grounds_g": "coffee_grounds_g",
+}
+
+def coffee_snapshot(coffee) -> dict:
+    """Valores do snapshot de um café para um novo item de pedido"""
+    return {
+        column: getattr(coffee, source) for column, source in COFFEE_SNAPSHOT_COLUMNS.items()
+    }
+
+@event.listens_for(OrderItem, "before_insert")
+def _fill_coffee_snapshot(mapper, connection, target):
+    """Preenche o snapshot de itens criados sem ele (ex.: direto pelo ORM)"""
+    if target.unit_price_cents is not None:
+        return
+    # Só usa o café já carregado; lazy load durante o flush não é permitido
+    coffee = target.__dict__.get("coffee")
+    if coffee is None:
+        coffee = connection.execute(
+            select(Coffee.__table__).where(Coffee.id == target.coffee_id)
+        ).one()
+    for column, value in coffee_snapshot(coffee).items():
+        if getattr(target, column) is None:
+            setattr(target, column, value)
@@ -0,0 +1,124 @@
+import os
+import sys
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Diretório da aplicação: o call site é o primeiro frame dentro dele
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Diretório raiz do projeto, para exibir caminhos relativos
+PROJECT_DIR = os.path.dirname(APP_DIR)
+
+class RecordedQuery(NamedTuple):
+    statement: str
+    parameters: object
+    executemany: bool
+    call_site: Optional[str]  # "app/services/x.py:42 in funcao", quando capturado
+
+class QueryBudgetExceeded(AssertionError):
+    """Mais consultas do que o orçamento permite, ou consultas repetidas (N+1)"""
+
+def call_site() -> Optional[str]:
+    """Primeiro frame da aplicação na pilha atual (fora deste módulo)"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return (
+                f"{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} "
+                f"in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return None
+
+# Gravador ativo no contexto atual (modo sem engine)
+_context_recorder: ContextVar[Optional["QueryRecorder"]] = ContextVar("query_recorder", default=None)
+
+def _record_in_context(conn, cursor, statement, parameters, context, executemany):
+    recorder = _context_recorder.get()
+    if recorder is not None:
+        recorder._on_execute(conn, cursor, statement, parameters, context, executemany)
+
+class QueryRecorder:
+    """Registra as consultas SQL emitidas dentro de um bloco ``with``.
+
+    Com ``engine`` registra tudo o que passa por ele, de qualquer thread (uso
+    nos testes, onde a requisição roda em outra thread). Sem ``engine``
+    registra apenas as consultas do contexto atual (``contextvars``), em
+    qualquer engine — o modo usado por requisição em produção. O mesmo
+    gravador pode ser reutilizado; cada ``with`` recomeça a contagem.
+    """
+
+    def __init__(self, engine=None, capture_call_sites: bool = True):
+        self.engine = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+        self.capture_call_sites = capture_call_sites
+        self.queries: List[RecordedQuery] = []
+        self._token = None
+        self._last_context = None
+
+    def __enter__(self) -> "QueryRecorder":
+        self.queries = []
+        self._last_context = None
+        if self.engine is not None:
+            event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        else:
+            if not event.contains(Engine, "before_cursor_execute", _record_in_context):
+                event.listen(Engine, "before_cursor_execute", _record_in_context)
+            self._token = _context_recorder.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.engine is not None:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        else:
+            _context_recorder.reset(self._token)
+            self._token = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Um INSERT com RETURNING de várias linhas é enviado em lotes (no SQLite,
+        # uma linha por lote) no mesmo contexto de execução: conta uma só vez
+        if context is not None and context is self._last_context:
+            return
+        self._last_context = context
+        self.record(statement, parameters, executemany)
+
+    def record(self, statement: str, parameters, executemany: bool = False):
+        site = call_site() if self.capture_call_sites else None
+        self.queries.append(RecordedQuery(statement, parameters, executemany, site))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def statements(self) -> List[str]:
+        return [query.statement for query in self.queries]
+
+    def selects(self) -> List[RecordedQuery]:
+        return [query for query in self.queries if query.statement.lstrip().upper().startswith("SELECT")]
+
+    def duplicates(self, min_count: int = 2) -> dict:
+        """Consultas com o mesmo SQL emitidas ``min_count`` vezes ou mais (sinal de N+1)"""
+        counts = Counter(self.statements)
+        return {statement: count for statement, count in counts.items() if count >= min_count}
+
+    def call_sites(self, statement: str) -> List[str]:
+        """Call sites distintos que emitiram ``statement``"""
+        return sorted({query.call_site for query in self.queries if query.statement == statement and query.call_site})
+
+    def report(self) -> str:
+        """Resumo legível das consultas, com as repetidas e seus call sites"""
+        lines = [f"{self.count} consultas"]
+        for statement, count in self.duplicates().items():
+            sites = ", ".join(self.call_sites(statement)) or "call site desconhecido"
+            lines.append(f"  {count}x {' '.join(statement.split())[:200]} ({sites})")
+        return "\n".join(lines)
+
+    def assert_budget(self, max_queries: int, allow_duplicates: bool = False):
+        """Falha se o bloco excedeu ``max_queries`` ou repetiu uma consulta"""
+        if self.count > max_queries:
+            raise QueryBudgetExceeded(f"Orçamento de {max_queries} consultas excedido: {self.report()}")
+        if not allow_duplicates and self.duplicates():
+            raise QueryBudgetExceeded(f"Consultas repetidas (N+1): {self.report()}")
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import exc, text
+from app.config import settings
+
+# Cookie com o instante (epoch) até o qual as leituras do cliente vão ao primário
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+# Atraso de replicação no PostgreSQL; 0 quando a réplica já aplicou todo o WAL
+# recebido (sem escrita recente no primário o timestamp de replay envelhece)
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+def replication_lag(db) -> float:
+    """Atraso (s) da réplica da sessão; outros bancos só verificam a conexão"""
+    if db.get_bind().dialect.name == "postgresql":
+        return float(db.execute(POSTGRES_LAG_SQL).scalar() or 0)
+    db.execute(text("SELECT 1"))
+    return 0.0
+
+class ReplicaMonitor:
+    """Estado da réplica de leitura, verificado no máximo a cada ``interval`` segundos.
+
+    A verificação roda na requisição que encontra o estado vencido; as demais
+    usam o último resultado. Réplica inacessível ou com atraso acima de
+    ``max_lag`` fica indisponível até a próxima verificação.
+    """
+
+    def __init__(self, interval: float = None, max_lag: float = None, clock=time.monotonic):
+        self.interval = settings.READ_REPLICA_CHECK_INTERVAL_SECONDS if interval is None else interval
+        self.max_lag = settings.READ_REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        self.clock = clock
+        self.available = False
+        self.lag: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def claim_check(self) -> bool:
+        """True para a única requisição que deve verificar a réplica agora"""
+        with self._lock:
+            now = self.clock()
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.interval
+            return True
+
+    def report(self, lag: Optional[float]):
+        """Registra o atraso medido; ``None`` quando a réplica não respondeu"""
+        self.lag = lag
+        self.available = lag is not None and lag <= self.max_lag
+
+    def check(self, db):
+        try:
+            self.report(replication_lag(db))
+        except exc.DBAPIError:
+            self.report(None)
+
+    async def check_async(self, db):
+        try:
+            self.report(await db.run_sync(replication_lag))
+        except exc.DBAPIError:
+            self.report(None)
+
+replica_monitor = ReplicaMonitor()
+
+def reads_from_primary(request: Request) -> bool:
+    """True enquanto o cliente está na janela de read-your-writes"""
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def remember_write(response: Response):
+    """Dependência das rotas de escrita: leituras seguintes do cliente vão ao primário"""
+    if not settings.READ_DATABASE_URL:
+        return
+    window = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE, f"{time.time() + window:.3f}",
+        max_age=max(int(window + 0.999), 1), httponly=True, samesite="lax",
+    )
@@ -1,8 +1,14 @@
 from .coffee import Coffee, CoffeeCreate, CoffeeResponse
-from .order import OrderCreate, OrderResponse, OrderSummary, OrderItemCreate, OrderItemResponse
+from .order import (
+    OrderCreate, OrderResponse, OrderSummary, OrderItemCreate, OrderItemResponse,
+    OrderStatusUpdate, OrderStatusResponse, OrderBulkComplete, OrderBulkCompleteResponse,
+    OrderBulkEntry, OrderBulkCreate, OrderBulkResult, OrderBulkResponse
+)
 
 __all__ = [
     "Coffee", "CoffeeCreate", "CoffeeResponse",
     "OrderCreate", "OrderResponse", "OrderSummary", 
-    "OrderItemCreate", "OrderItemResponse"
+    "OrderItemCreate", "OrderItemResponse",
+    "OrderStatusUpdate", "OrderStatusResponse", "OrderBulkComplete", "OrderBulkCompleteResponse",
+    "OrderBulkEntry", "OrderBulkCreate", "OrderBulkResult", "OrderBulkResponse"
 ]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
 class OrderItemCreate(BaseModel):
@@ -9,6 +9,22 @@ class OrderItemCreate(BaseModel):
 class OrderCreate(BaseModel):
     items: List[OrderItemCreate]
 
+class OrderBulkEntry(OrderCreate):
+    created_at: Optional[datetime] = None  # Data/hora original do pedido no POS
+
+class OrderBulkCreate(BaseModel):
+    orders: List[OrderBulkEntry] = Field(..., min_length=1, max_length=5000)
+
+class OrderBulkResult(BaseModel):
+    index: int  # Posição do pedido no lote enviado
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class OrderBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBulkResult]
+
 class OrderItemResponse(BaseModel):
     id: int
     coffee_id: int
@@ -38,3 +54,17 @@ class OrderSummary(BaseModel):
     
     class Config:
         from_attributes = True
+
+class OrderStatusUpdate(BaseModel):
+    status: Literal["completed"]
+
+class OrderStatusResponse(BaseModel):
+    id: int
+    status: str
+
+class OrderBulkComplete(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class OrderBulkCompleteResponse(BaseModel):
+    completed: List[int]  # Pedidos que saíram de pending nesta requisição
+    skipped: List[int]    # Inexistentes ou que já não estavam pendentes
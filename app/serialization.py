@@ -0,0 +1,35 @@
+import json
+from datetime import date, datetime
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da biblioteca padrão
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+def dumps(payload) -> bytes:
+    """Serializa dicts/listas/datas em JSON compacto (UTF-8).
+
+    Usa orjson quando instalado; a saída é equivalente à do ``json`` padrão.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """Resposta JSON que serializa o conteúdo diretamente com ``dumps``.
+
+    Não passa pelo ``jsonable_encoder``: o conteúdo já deve estar no formato
+    final (dicts, listas, números, strings e datas).
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
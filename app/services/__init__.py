@@ -1,7 +1,23 @@
-from .coffee_service import get_all_coffees, get_coffee_by_id, create_coffee, get_menu_with_prices
-from .order_service import create_order, get_pending_orders, get_order_by_id, get_consumption_analysis
+from .coffee_service import (
+    get_all_coffees, get_coffee_by_id, create_coffee, get_menu_with_prices,
+    get_cached_menu, invalidate_menu_cache
+)
+from .archive_service import archive_completed_orders
+from .forecast_service import get_consumption_forecast
+from .order_service import (
+    create_order, create_orders_bulk, insert_order_items, get_pending_orders, get_pending_orders_page,
+    get_pending_orders_payload,
+    get_order_by_id, get_consumption_analysis, transition_orders,
+    export_orders, export_orders_async, order_export_range, get_sales_series
+)
 
 __all__ = [
     "get_all_coffees", "get_coffee_by_id", "create_coffee", "get_menu_with_prices",
-    "create_order", "get_pending_orders", "get_order_by_id", "get_consumption_analysis"
+    "get_cached_menu", "invalidate_menu_cache",
+    "archive_completed_orders",
+    "get_consumption_forecast",
+    "create_order", "create_orders_bulk", "insert_order_items", "get_pending_orders", "get_pending_orders_page",
+    "get_pending_orders_payload",
+    "get_order_by_id", "get_consumption_analysis", "transition_orders",
+    "export_orders", "export_orders_async", "order_export_range", "get_sales_series"
 ]
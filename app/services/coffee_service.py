@@ -1,6 +1,23 @@
+import hashlib
+import threading
+import time
+from typing import NamedTuple
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.models.coffee import Coffee
-from app.schemas.coffee import CoffeeCreate
+from app.serialization import dumps
+from app.schemas.coffee import CoffeeCreate, CoffeeResponse
+
+class CachedMenu(NamedTuple):
+    """Resposta do menu já serializada, válida para uma versão do menu"""
+    version: int
+    body: bytes
+    etag: str
+    created_at: float
+
+_menu_lock = threading.Lock()
+_menu_version = 0
+_menu_cache = {}
 
 def get_all_coffees(db: Session):
     """Busca todos os cafés do menu"""
@@ -16,6 +33,7 @@ def create_coffee(db: Session, coffee: CoffeeCreate):
     db.add(db_coffee)
     db.commit()
     db.refresh(db_coffee)
+    invalidate_menu_cache()
     return db_coffee
 
 def get_menu_with_prices(db: Session):
@@ -32,3 +50,52 @@ def get_menu_with_prices(db: Session):
             "coffee_grounds_g": coffee.coffee_grounds_g
         })
     return menu
+
+def invalidate_menu_cache():
+    """Descarta as respostas do menu em cache e avança a versão do menu"""
+    global _menu_version
+    with _menu_lock:
+        _menu_version += 1
+        _menu_cache.clear()
+
+def _build_menu_payload(db: Session, kind: str):
+    if kind == "menu":
+        return get_menu_with_prices(db)
+    if kind == "all":
+        return [
+            CoffeeResponse.model_validate(coffee).model_dump(mode="json")
+            for coffee in get_all_coffees(db)
+        ]
+    raise ValueError(f"Tipo de menu desconhecido: {kind}")
+
+def get_cached_menu(db: Session, kind: str) -> CachedMenu:
+    """Retorna o menu (``menu`` ou ``all``) serializado, com ETag forte.
+
+    Enquanto a versão do menu não muda e o TTL não expira, a resposta sai do
+    cache sem consultar o banco nem passar pelo encoder JSON. O TTL limita a
+    defasagem em implantações com vários workers, onde ``create_coffee`` só
+    invalida o cache do próprio processo.
+    """
+    cached = _menu_cache.get(kind)
+    version = _menu_version
+    if cached is not None and cached.version == version and not _expired(cached):
+        return cached
+    
+    # A consulta roda fora do lock: com AsyncSession ela cede o event loop
+    # no meio (run_sync), e outra requisição da mesma thread travaria no lock
+    body = dumps(_build_menu_payload(db, kind))
+    cached = CachedMenu(
+        version=version,
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        created_at=time.monotonic(),
+    )
+    with _menu_lock:
+        # Menu alterado durante a consulta: responde sem guardar a versão antiga
+        if version == _menu_version:
+            _menu_cache[kind] = cached
+    return cached
+
+def _expired(cached: CachedMenu) -> bool:
+    ttl = settings.MENU_CACHE_TTL_SECONDS
+    return ttl > 0 and time.monotonic() - cached.created_at >= ttl
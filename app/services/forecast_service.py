@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.consumption import ConsumptionHourly
+from app.services.rollup_service import hour_bucket
+
+# Insumos previstos, na ordem das colunas das matrizes
+FORECAST_FIELDS = ("cups", "water_ml", "milk_ml", "coffee_grounds_g")
+# Peso do dia mais recente na suavização exponencial dos totais diários
+SMOOTHING_ALPHA = 0.3
+# z da banda de confiança de 95%
+CONFIDENCE_Z = 1.96
+# Um slot sazonal por (dia da semana, hora do dia)
+WEEK_SLOTS = 7 * 24
+
+def _load_hourly_history(db: Session, start: datetime, end: datetime) -> np.ndarray:
+    """Consumo total por hora em ``[start, end)``, uma linha por hora (sem lacunas)"""
+    hours = int((end - start).total_seconds() // 3600)
+    history = np.zeros((hours, len(FORECAST_FIELDS)))
+    rows = db.execute(
+        select(
+            ConsumptionHourly.bucket,
+            *[func.sum(getattr(ConsumptionHourly, field)) for field in FORECAST_FIELDS],
+        )
+        .where(ConsumptionHourly.bucket >= start, ConsumptionHourly.bucket < end)
+        .group_by(ConsumptionHourly.bucket)
+    ).all()
+    if rows:
+        hour = timedelta(hours=1)
+        offsets = [(row[0] - start) // hour for row in rows]
+        history[offsets] = np.array([row[1:] for row in rows], dtype=float)
+    return history
+
+def _week_slots(start: datetime, hours: int) -> np.ndarray:
+    """Slot sazonal (dia da semana * 24 + hora) de cada hora a partir de ``start``"""
+    first = start.weekday() * 24 + start.hour
+    return (first + np.arange(hours)) % WEEK_SLOTS
+
+def _smoothed_level(daily: np.ndarray, alpha: float) -> np.ndarray:
+    """Suavização exponencial simples dos totais diários, por coluna.
+
+    Forma fechada: pesos ``alpha * (1 - alpha) ** k`` do dia mais recente para
+    o mais antigo, com o restante do peso no primeiro dia.
+    """
+    days = daily.shape[0]
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1)
+    weights[0] = (1 - alpha) ** (days - 1)
+    return weights @ daily
+
+def get_consumption_forecast(db: Session, days: int = 1, history_days: int = 28, now: datetime = None):
+    """Previsão de consumo de insumos para os próximos ``days`` dias (UTC).
+
+    A partir do rollup horário dos últimos ``history_days`` dias calcula, para
+    cada insumo, a média e a variância por (dia da semana, hora). O perfil
+    sazonal é escalado pela razão entre o total diário suavizado
+    exponencialmente e a média diária do histórico. As bandas de 95% somam a
+    variância horária dos resíduos em cada dia previsto.
+    """
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    history_start = today - timedelta(days=history_days)
+    history_end = hour_bucket(now)  # A hora corrente ainda está incompleta
+
+    history = _load_hourly_history(db, history_start, history_end)
+    slots = _week_slots(history_start, history.shape[0])
+
+    # Média e variância por slot, para todos os insumos de uma vez
+    counts = np.bincount(slots, minlength=WEEK_SLOTS).astype(float)[:, None]
+    sums = np.zeros((WEEK_SLOTS, len(FORECAST_FIELDS)))
+    np.add.at(sums, slots, history)
+    seen = np.maximum(counts, 1)
+    means = sums / seen
+    residuals = history - means[slots]
+    variances = np.zeros_like(sums)
+    np.add.at(variances, slots, residuals ** 2)
+    variances /= np.maximum(counts - 1, 1)
+
+    # Nível: só dias completos entram na suavização
+    daily = history[:history_days * 24].reshape(history_days, 24, -1).sum(axis=1)
+    average = daily.mean(axis=0)
+    level = _smoothed_level(daily, SMOOTHING_ALPHA)
+    scale = np.divide(level, average, out=np.ones_like(level), where=average > 0)
+
+    forecast_start = today + timedelta(days=1)
+    future_slots = _week_slots(forecast_start, days * 24).reshape(days, 24)
+    expected = means[future_slots].sum(axis=1) * scale
+    spread = CONFIDENCE_Z * np.sqrt(variances[future_slots].sum(axis=1)) * scale
+    lower = np.maximum(expected - spread, 0)
+    upper = expected + spread
+
+    return {
+        "history_days": history_days,
+        "days": days,
+        "forecast": [
+            {
+                "date": (forecast_start + timedelta(days=day)).date().isoformat(),
+                **{
+                    field: {
+                        "expected": round(float(expected[day, index]), 2),
+                        "lower": round(float(lower[day, index]), 2),
+                        "upper": round(float(upper[day, index]), 2),
+                    }
+                    for index, field in enumerate(FORECAST_FIELDS)
+                },
+            }
+            for day in range(days)
+        ],
+        "totals": {
+            field: round(float(expected[:, index].sum()), 2)
+            for index, field in enumerate(FORECAST_FIELDS)
+        },
+    }
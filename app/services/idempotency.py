@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import run_in_session
+from app.models.idempotency import IdempotencyKey
+
+# Intervalo entre verificações no banco enquanto a requisição original está em
+# andamento: começa em POLL_INTERVAL_SECONDS e dobra até MAX_POLL_INTERVAL_SECONDS
+POLL_INTERVAL_SECONDS = 0.02
+MAX_POLL_INTERVAL_SECONDS = 0.5
+# Idade a partir da qual uma reserva sem resposta no banco é tida como abandonada
+ABANDONED_CLAIM_SECONDS = 60
+
+# Estados de uma chave ao tentar reservá-la
+CLAIMED = "claimed"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+
+class IdempotencyKeyReused(ValueError):
+    """A chave já foi usada com um corpo de requisição diferente"""
+
+class IdempotencyKeyInProgress(RuntimeError):
+    """A requisição original ainda não terminou dentro do tempo de espera"""
+
+def request_fingerprint(payload) -> str:
+    """Hash do corpo da requisição, para detectar reuso da chave com outro pedido"""
+    return hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+
+class IdempotencyStore:
+    """Reserva chaves e guarda a resposta da primeira requisição de cada uma.
+
+    Subclasses implementam ``_claim``, ``_complete`` e ``_release`` de forma
+    atômica; ``begin`` trata repetições e requisições concorrentes. Enquanto a
+    requisição original está em andamento a repetição espera em ``_wait``:
+    por padrão, verificações com intervalo crescente.
+    """
+
+    async def begin(self, db, key: str, fingerprint: str) -> Optional[dict]:
+        """Reserva a chave, ou devolve a resposta já gravada para ela.
+
+        Retorna ``None`` quando esta requisição deve executar a operação. Se
+        outra requisição com a mesma chave está em andamento, espera por ela
+        (até ``IDEMPOTENCY_WAIT_SECONDS``) e devolve a mesma resposta.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        attempt = 0
+        while True:
+            state, stored_fingerprint, response = await self._claim(db, key, fingerprint)
+            if state == CLAIMED:
+                return None
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyReused(
+                    "Idempotency-Key já utilizada com um pedido diferente"
+                )
+            if state == DONE:
+                return response
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyKeyInProgress(
+                    "Requisição com esta Idempotency-Key ainda em processamento"
+                )
+            await self._wait(key, attempt, remaining)
+            attempt += 1
+
+    async def _wait(self, key: str, attempt: int, timeout: float):
+        """Espera antes de verificar a chave de novo (no máximo ``timeout`` segundos)"""
+        await asyncio.sleep(min(POLL_INTERVAL_SECONDS * 2 ** attempt, MAX_POLL_INTERVAL_SECONDS, timeout))
+
+    async def complete(self, db, key: str, response: dict):
+        """Grava a resposta da requisição que reservou a chave"""
+        await self._complete(db, key, response)
+
+    async def release(self, db, key: str):
+        """Libera a chave quando a operação falhou, permitindo nova tentativa"""
+        await self._release(db, key)
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Chaves em memória do worker, com TTL e limite de tamanho (LRU).
+
+    O limite descarta só respostas gravadas: reservas em andamento nunca saem
+    antes de terminar e, se abandonadas, expiram em ``ABANDONED_CLAIM_SECONDS``.
+    Repetições em andamento esperam por ``_complete``/``_release`` da chave,
+    sem verificações periódicas.
+    """
+
+    def __init__(self, max_keys: int = None, ttl_seconds: int = None):
+        self.max_keys = max_keys or settings.IDEMPOTENCY_MAX_KEYS
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self._entries = OrderedDict()  # key -> [fingerprint, response, expires_at]
+        self._waiters = {}  # key -> [(loop, future)] das repetições em espera
+        self._lock = threading.Lock()
+
+    async def _claim(self, db, key, fingerprint):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._entries[key] = [fingerprint, None, now + ABANDONED_CLAIM_SECONDS]
+                self._trim()
+                return CLAIMED, fingerprint, None
+            self._entries.move_to_end(key)
+            return (IN_FLIGHT if entry[1] is None else DONE), entry[0], entry[1]
+
+    def _trim(self):
+        """Descarta as respostas menos usadas acima de ``max_keys`` (chamado com o lock)"""
+        excess = len(self._entries) - self.max_keys
+        if excess <= 0:
+            return
+        evicted = []
+        for key, entry in self._entries.items():
+            if entry[1] is not None:
+                evicted.append(key)
+                if len(evicted) == excess:
+                    break
+        for key in evicted:
+            del self._entries[key]
+
+    async def _wait(self, key, attempt, timeout):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            entry = self._entries.get(key)
+            # A original pode ter terminado entre o _claim e este ponto
+            if entry is None or entry[1] is not None:
+                return
+            waiter = (loop, future)
+            self._waiters.setdefault(key, []).append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(key)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[key]
+
+    def _wake(self, key):
+        """Acorda as repetições da chave (chamado com o lock; podem estar em outro event loop)"""
+        for loop, future in self._waiters.pop(key, ()):
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def _complete(self, db, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = response
+                entry[2] = time.monotonic() + self.ttl_seconds
+            self._wake(key)
+
+    async def _release(self, db, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is None:
+                del self._entries[key]
+            self._wake(key)
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Chaves na tabela ``idempotency_keys``, compartilhadas entre workers.
+
+    A chave primária decide qual requisição executa a operação. Reservas sem
+    resposta há mais de ``ABANDONED_CLAIM_SECONDS`` são consideradas
+    abandonadas (worker encerrado no meio da requisição) e podem ser retomadas.
+
+    A reserva só remove a linha vencida da própria chave; as demais chaves
+    expiradas são apagadas por ``purge_expired``, chamada no máximo uma vez a
+    cada ``IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS`` por worker.
+    """
+
+    def __init__(self, ttl_seconds: int = None, cleanup_interval: float = None, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self.cleanup_interval = (
+            settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS if cleanup_interval is None else cleanup_interval
+        )
+        self.clock = clock
+        self._next_cleanup = 0.0
+        self._lock = threading.Lock()
+
+    def _claim_cleanup(self) -> bool:
+        """True para a única requisição que deve limpar as chaves expiradas agora"""
+        with self._lock:
+            now = self.clock()
+            if now < self._next_cleanup:
+                return False
+            self._next_cleanup = now + self.cleanup_interval
+            return True
+
+    async def _claim(self, db, key, fingerprint):
+        now = datetime.utcnow()
+        if self._claim_cleanup():
+            await run_in_session(db, self.purge_expired, now)
+        return await run_in_session(db, self._claim_row, key, fingerprint, now)
+
+    def purge_expired(self, db: Session, now: datetime = None) -> int:
+        """Apaga as chaves com mais de ``ttl_seconds``; retorna quantas foram removidas"""
+        expired = (now or datetime.utcnow()) - timedelta(seconds=self.ttl_seconds)
+        try:
+            result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < expired))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result.rowcount
+
+    def _claim_row(self, db: Session, key: str, fingerprint: str, now: datetime):
+        expired = now - timedelta(seconds=self.ttl_seconds)
+        abandoned = now - timedelta(seconds=ABANDONED_CLAIM_SECONDS)
+        try:
+            # Só a linha desta chave: expirada ou reserva abandonada
+            db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.created_at < expired,
+                    and_(IdempotencyKey.response.is_(None), IdempotencyKey.created_at < abandoned),
+                ),
+            ))
+            row = db.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.response)
+                .where(IdempotencyKey.key == key)
+            ).first()
+            if row is not None:
+                db.commit()
+                if row.response is None:
+                    return IN_FLIGHT, row.fingerprint, None
+                return DONE, row.fingerprint, json.loads(row.response)
+            db.execute(IdempotencyKey.__table__.insert().values(
+                key=key, fingerprint=fingerprint, response=None, created_at=now
+            ))
+            db.commit()
+            return CLAIMED, fingerprint, None
+        except IntegrityError:
+            # Outra requisição reservou a chave entre a leitura e o INSERT
+            db.rollback()
+            return IN_FLIGHT, fingerprint, None
+        except Exception:
+            db.rollback()
+            raise
+
+    async def _complete(self, db, key, response):
+        await run_in_session(db, self._update_row, key, json.dumps(response, ensure_ascii=False))
+
+    def _update_row(self, db: Session, key: str, response: str):
+        db.execute(update(IdempotencyKey).where(IdempotencyKey.key == key).values(response=response))
+        db.commit()
+
+    async def _release(self, db, key):
+        await run_in_session(db, self._delete_row, key)
+
+    def _delete_row(self, db: Session, key: str):
+        db.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.response.is_(None),
+        ))
+        db.commit()
+
+def build_idempotency_store() -> IdempotencyStore:
+    """Cria o backend configurado em ``IDEMPOTENCY_BACKEND``"""
+    if settings.IDEMPOTENCY_BACKEND == "memory":
+        return MemoryIdempotencyStore()
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore()
+    raise ValueError(f"Backend de idempotência desconhecido: {settings.IDEMPOTENCY_BACKEND}")
+
+idempotency_store = build_idempotency_store()
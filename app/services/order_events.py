@@ -0,0 +1,77 @@
+import asyncio
+import json
+import threading
+from app.config import settings
+
+# Mensagem enviada a um assinante que ficou para trás antes de encerrar o stream
+RESYNC_MESSAGE = b'event: resync\ndata: {}\n\n'
+
+class Subscription:
+    """Fila limitada de eventos de um assinante do stream"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def _offer(self, message: bytes):
+        """Enfileira uma mensagem (roda no event loop do assinante)"""
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Assinante lento: descarta o que estava pendente, avisa e encerra.
+            # O cliente recarrega GET /orders/pending e se reconecta.
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_MESSAGE)
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Próxima mensagem SSE, ou None quando o stream deve ser encerrado"""
+        return await self.queue.get()
+
+class OrderEventHub:
+    """Distribui eventos de pedidos para os streams abertos neste processo.
+
+    Cada evento é serializado uma única vez e entregue a todos os assinantes;
+    ``publish`` pode ser chamado de qualquer thread.
+    """
+
+    def __init__(self, queue_size: int = None):
+        self.queue_size = queue_size or settings.ORDER_STREAM_QUEUE_SIZE
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: str, payload):
+        """Envia um evento para todos os assinantes"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        message = f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, message)
+            except RuntimeError:
+                # Event loop do assinante já foi encerrado
+                self.unsubscribe(subscription)
+
+order_events = OrderEventHub()
@@ -1,85 +1,625 @@
-from sqlalchemy.orm import Session
-from app.models.order import Order, OrderItem
+import base64
+import csv
+import io
+from sqlalchemy import BigInteger, cast, func, insert, select, tuple_, union_all, update
+from sqlalchemy.orm import Session, selectinload
+from app import metrics
+from app.models.order import ORDER_STATUS_PENDING, Order, OrderItem, coffee_snapshot
 from app.models.coffee import Coffee
-from app.schemas.order import OrderCreate
-from typing import List
+from app.models.consumption import ConsumptionHourly
+from app.serialization import dumps
+from app.schemas.order import OrderBulkEntry, OrderCreate, OrderItemResponse, OrderResponse
+from app.services.archive_service import order_sources
+from app.services.order_events import order_events
+from app.services.rollup_service import (
+    hour_bucket,
+    next_hour_bucket,
+    record_consumption,
+    record_order_consumption
+)
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 def create_order(db: Session, order_data: OrderCreate):
-    """Cria um novo pedido"""
-    # Calcular preço total
-    total_price = 0
-    order_items = []
-    
+    """Cria um novo pedido em uma única transação.
+
+    Valida todos os cafés com uma única consulta, insere o pedido e os itens
+    no mesmo flush (INSERT em lote com RETURNING quando o dialeto suporta) e
+    monta o ``OrderResponse`` a partir dos dados em memória, sem recarregar
+    o pedido do banco. O rollup horário de consumo é atualizado na mesma
+    transação.
+    """
+    coffees = _load_coffees(db, {item.coffee_id for item in order_data.items})
+    error = _validate_items(order_data.items, coffees)
+    if error:
+        raise ValueError(error)
+
+    db_order = Order(created_at=datetime.utcnow(), status=ORDER_STATUS_PENDING, total_price=0)
+    total_price_cents = 0
     for item in order_data.items:
-        coffee = db.query(Coffee).filter(Coffee.id == item.coffee_id).first()
-        if not coffee:
-            raise ValueError(f"Café com ID {item.coffee_id} não encontrado")
+        coffee = coffees[item.coffee_id]
+        total_price_cents += coffee.price * item.quantity
+        db_order.items.append(
+            OrderItem(
+                coffee=coffee, coffee_id=coffee.id, quantity=item.quantity,
+                **coffee_snapshot(coffee)
+            )
+        )
+    db_order.total_price = total_price_cents / 100  # Converte centavos para reais
+
+    db.add(db_order)
+    try:
+        db.flush()
+        record_order_consumption(
+            db,
+            db_order.created_at,
+            [(coffees[item.coffee_id], item.quantity) for item in order_data.items],
+        )
+        response = _build_order_response(db_order)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    metrics.orders_created.inc(("pos",))
+    if order_events.has_subscribers:
+        order_events.publish("order_created", response.model_dump(mode="json"))
+    return response
+
+def _load_coffees(db: Session, coffee_ids) -> dict:
+    """Carrega os cafés informados com uma única consulta, indexados por ID"""
+    if not coffee_ids:
+        return {}
+    return {
+        coffee.id: coffee
+        for coffee in db.query(Coffee).filter(Coffee.id.in_(coffee_ids))
+    }
+
+def _validate_items(items, coffees: dict) -> Optional[str]:
+    """Retorna o erro do primeiro item com café inexistente, na ordem do pedido"""
+    for item in items:
+        if item.coffee_id not in coffees:
+            return f"Café com ID {item.coffee_id} não encontrado"
+    return None
+
+def create_orders_bulk(db: Session, entries: List[OrderBulkEntry], batch_size: int = 5000):
+    """Grava um lote de pedidos (sincronização offline do POS) em uma transação.
+
+    Todos os pedidos são validados com uma única consulta de cafés; os
+    inválidos são reportados sem impedir a gravação dos demais. Pedidos e
+    itens são inseridos em lote (INSERT multi-linha; COPY para os itens no
+    PostgreSQL com psycopg2) e o rollup é atualizado com um único upsert.
+    Retorna, na ordem de entrada, ``{"index", "id", "error"}`` por pedido.
+    """
+    coffees = _load_coffees(db, {item.coffee_id for entry in entries for item in entry.items})
+    now = datetime.utcnow()
+    
+    results = []
+    valid = []
+    for index, entry in enumerate(entries):
+        error = _validate_items(entry.items, coffees)
+        results.append({"index": index, "id": None, "error": error})
+        if error is None:
+            valid.append((index, entry, _naive_utc(entry.created_at) if entry.created_at else now))
+    if not valid:
+        return results
+    
+    order_rows = [
+        {
+            "created_at": created_at,
+            "status": ORDER_STATUS_PENDING,
+            "total_price": sum(
+                coffees[item.coffee_id].price * item.quantity for item in entry.items
+            ) / 100,  # Converte centavos para reais
+        }
+        for _, entry, created_at in valid
+    ]
+    
+    try:
+        order_ids = []
+        insert_orders = insert(Order).returning(Order.id, sort_by_parameter_order=True)
+        for start in range(0, len(order_rows), batch_size):
+            order_ids.extend(
+                db.execute(insert_orders, order_rows[start:start + batch_size]).scalars().all()
+            )
         
-        item_price = (coffee.price * item.quantity) / 100  # Converte centavos para reais
-        total_price += item_price
+        snapshots = {coffee_id: coffee_snapshot(coffee) for coffee_id, coffee in coffees.items()}
+        item_rows = [
+            (order_id, item.coffee_id, item.quantity,
+             *(snapshots[item.coffee_id][column] for column in ORDER_ITEM_COLUMNS[3:]))
+            for order_id, (_, entry, _) in zip(order_ids, valid)
+            for item in entry.items
+        ]
+        insert_order_items(db, item_rows, batch_size)
         
-        order_items.append({
-            "coffee_id": item.coffee_id,
-            "quantity": item.quantity
-        })
+        record_consumption(db, (
+            (created_at, coffees[item.coffee_id], item.quantity)
+            for _, entry, created_at in valid
+            for item in entry.items
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     
-    # Criar pedido
-    db_order = Order(total_price=total_price)
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-    
-    # Criar itens do pedido
-    for item_data in order_items:
-        order_item = OrderItem(
-            order_id=db_order.id,
-            coffee_id=item_data["coffee_id"],
-            quantity=item_data["quantity"]
-        )
-        db.add(order_item)
+    for order_id, (index, _, _) in zip(order_ids, valid):
+        results[index]["id"] = order_id
+    metrics.orders_created.inc(("bulk",), len(order_ids))
+    # Um evento por lote: um por pedido estouraria a fila dos displays
+    order_events.publish("orders_imported", {"ids": order_ids})
+    return results
+
+ORDER_ITEM_COLUMNS = (
+    "order_id", "coffee_id", "quantity",
+    "coffee_name", "unit_price_cents", "water_ml", "milk_ml", "coffee_grounds_g",
+)
+
+def insert_order_items(db: Session, rows: List[tuple], batch_size: int):
+    """Insere itens de pedido em massa: COPY no psycopg2, INSERT em lote nos demais.
+
+    Cada linha é uma tupla na ordem de ``ORDER_ITEM_COLUMNS``; o rollup de
+    consumo não é atualizado.
+    """
+    if not rows:
+        return
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY order_items ({', '.join(ORDER_ITEM_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+        return
     
-    db.commit()
-    db.refresh(db_order)
+    insert_items = insert(OrderItem)
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert_items, [
+            dict(zip(ORDER_ITEM_COLUMNS, row)) for row in rows[start:start + batch_size]
+        ])
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Converte datas com fuso para UTC sem fuso, como são gravadas no banco"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _build_order_response(order: Order) -> OrderResponse:
+    """Monta a resposta do pedido a partir do estado em memória da sessão"""
+    return OrderResponse(
+        id=order.id,
+        created_at=order.created_at,
+        total_price=order.total_price,
+        status=order.status,
+        items=[
+            OrderItemResponse(
+                id=item.id,
+                coffee_id=item.coffee_id,
+                quantity=item.quantity,
+                coffee_name=item.coffee_name,
+                item_price=item.item_price,
+            )
+            for item in order.items
+        ],
+    )
+
+def encode_order_cursor(created_at: datetime, order_id: int) -> str:
+    """Gera o cursor opaco que aponta para depois do pedido informado"""
+    raw = f"{created_at.isoformat()}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_order_cursor(cursor: str):
+    """Decodifica um cursor de paginação em ``(created_at, id)``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor de paginação inválido")
+
+def _pending_filters(
+    after: Optional[Tuple[datetime, int]],
+    since: Optional[datetime],
+    coffee_id: Optional[int],
+) -> list:
+    """Critérios da fila de pendentes, comuns às consultas ORM e por colunas"""
+    criteria = [Order.status == ORDER_STATUS_PENDING]
+    if since is not None:
+        criteria.append(Order.created_at >= since)
+    if after is not None:
+        criteria.append(tuple_(Order.created_at, Order.id) > tuple_(*after))
+    if coffee_id is not None:
+        criteria.append(Order.items.any(OrderItem.coffee_id == coffee_id))
+    return criteria
+
+def get_pending_orders(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    since: Optional[datetime] = None,
+    coffee_id: Optional[int] = None,
+):
+    """Busca pedidos pendentes em ordem de chegada, com seus itens.
+
+    A paginação é por keyset em ``(created_at, id)``: ``after`` é a chave do
+    último pedido da página anterior. Os itens são carregados em uma segunda
+    consulta (selectinload), sem multiplicar as linhas dos pedidos.
+    """
+    query = db.query(Order).filter(*_pending_filters(after, since, coffee_id))
+    query = query.order_by(Order.created_at, Order.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.options(
+        selectinload(Order.items)
+    ).all()
+
+def get_pending_orders_payload(
+    db: Session,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    since: Optional[datetime] = None,
+    coffee_id: Optional[int] = None,
+) -> List[dict]:
+    """Mesmos pedidos de ``get_pending_orders``, já no formato de ``OrderSummary``.
+
+    Lê apenas colunas (sem objetos ORM nem validação Pydantic): uma consulta
+    para a página de pedidos e outra para os itens.
+    """
+    stmt = select(
+        Order.id, Order.created_at, Order.total_price, Order.status
+    ).where(*_pending_filters(after, since, coffee_id)).order_by(Order.created_at, Order.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    orders = [
+        {"id": order_id, "created_at": created_at, "total_price": total_price,
+         "status": status, "items": []}
+        for order_id, created_at, total_price, status in db.execute(stmt)
+    ]
+    if not orders:
+        return orders
     
-    # Recarregar o pedido com os itens para garantir que os relacionamentos estejam carregados
-    db_order = db.query(Order).filter(Order.id == db_order.id).first()
-    return db_order
+    by_id = {order["id"]: order for order in orders}
+    items = db.execute(
+        select(
+            OrderItem.order_id, OrderItem.id, OrderItem.coffee_id, OrderItem.quantity,
+            OrderItem.coffee_name, OrderItem.unit_price_cents,
+        ).where(OrderItem.order_id.in_(by_id)).order_by(OrderItem.id)
+    )
+    for order_id, item_id, item_coffee_id, quantity, name, price in items:
+        by_id[order_id]["items"].append({
+            "id": item_id,
+            "coffee_id": item_coffee_id,
+            "quantity": quantity,
+            "coffee_name": name,
+            "item_price": (price * quantity) / 100,
+        })
+    return orders
+
+def get_pending_orders_page(
+    db: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    coffee_id: Optional[int] = None,
+    as_payload: bool = False,
+):
+    """Retorna uma página de pedidos pendentes e o cursor da próxima página.
 
-def get_pending_orders(db: Session):
-    """Busca todos os pedidos pendentes com seus itens e informações do café"""
-    from sqlalchemy.orm import joinedload
-    return db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.coffee)
-    ).filter(Order.status == 'pending').all()
+    Com ``as_payload`` os pedidos vêm como dicts (``get_pending_orders_payload``).
+    """
+    after = decode_order_cursor(cursor) if cursor else None
+    load = get_pending_orders_payload if as_payload else get_pending_orders
+    orders = load(db, limit + 1, after, since, coffee_id)
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        if as_payload:
+            next_cursor = encode_order_cursor(last["created_at"], last["id"])
+        else:
+            next_cursor = encode_order_cursor(last.created_at, last.id)
+    return orders, next_cursor
 
 def get_order_by_id(db: Session, order_id: int):
     """Busca um pedido por ID"""
     return db.query(Order).filter(Order.id == order_id).first()
 
+def transition_orders(db: Session, order_ids: List[int], status: str) -> List[int]:
+    """Muda o status de vários pedidos pendentes com um único UPDATE.
+
+    Só pedidos ainda em ``pending`` são alterados (concorrência otimista: o
+    próprio WHERE garante que duas requisições não concluam o mesmo pedido).
+    Retorna os IDs efetivamente alterados.
+    """
+    if not order_ids:
+        return []
+    stmt = update(Order).where(
+        Order.id.in_(set(order_ids)),
+        Order.status == ORDER_STATUS_PENDING,
+    ).values(status=status)
+    
+    if db.get_bind().dialect.update_returning:
+        updated = db.execute(stmt.returning(Order.id)).scalars().all()
+    else:
+        updated = db.query(Order.id).filter(
+            Order.id.in_(set(order_ids)),
+            Order.status == ORDER_STATUS_PENDING,
+        ).with_for_update().all()
+        updated = [order_id for (order_id,) in updated]
+        db.execute(stmt.where(Order.id.in_(updated)))
+    db.commit()
+    updated = sorted(updated)
+    if updated:
+        order_events.publish("order_status", {"ids": updated, "status": status})
+    return updated
+
+# Tamanho aproximado (bytes) de cada bloco enviado pelo export
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def order_export_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """Normaliza o período do export para UTC e valida que ``end > start``"""
+    start, end = _naive_utc(start), _naive_utc(end)
+    if end <= start:
+        raise ValueError("O fim do período deve ser posterior ao início")
+    return start, end
+
+def order_export_statement(start: datetime, end: datetime):
+    """Consulta do export: uma linha por item, agrupável por pedido.
+
+    Pedidos com ``start <= created_at < end`` em ordem de ``(created_at, id)``;
+    os itens de um pedido vêm sempre em linhas consecutivas. Períodos que
+    começam antes da retenção também leem as tabelas de arquivo.
+    """
+    parts = [
+        select(
+            order.id.label("order_id"),
+            order.created_at.label("created_at"),
+            order.total_price,
+            order.status,
+            item.id.label("item_id"),
+            item.coffee_id,
+            item.quantity,
+            item.coffee_name,
+            item.unit_price_cents,
+        ).select_from(order).outerjoin(
+            item, item.order_id == order.id
+        ).where(
+            order.created_at >= start,
+            order.created_at < end,
+        )
+        for order, item in order_sources(start)
+    ]
+    if len(parts) == 1:
+        return parts[0].order_by(Order.created_at, Order.id, OrderItem.id)
+    rows = union_all(*parts).subquery()
+    return select(rows).order_by(rows.c.created_at, rows.c.order_id, rows.c.item_id)
+
+class OrderExportEncoder:
+    """Agrupa as linhas do export por pedido e gera blocos NDJSON.
+
+    ``add`` recebe as linhas na ordem da consulta e devolve um bloco de bytes
+    quando o buffer passa de ``EXPORT_CHUNK_BYTES``; ``finish`` devolve o
+    restante. Só o pedido corrente e o bloco em montagem ficam em memória.
+    """
+
+    def __init__(self, chunk_bytes: int = EXPORT_CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self._order = None
+        self._lines = []
+        self._size = 0
+
+    def add(self, row) -> Optional[bytes]:
+        order_id, created_at, total_price, status, item_id, coffee_id, quantity, name, price = row
+        chunk = None
+        if self._order is None or self._order["id"] != order_id:
+            chunk = self._close_order()
+            self._order = {
+                "id": order_id,
+                "created_at": created_at.isoformat(),
+                "total_price": total_price,
+                "status": status,
+                "items": [],
+            }
+        if item_id is not None:
+            self._order["items"].append({
+                "id": item_id,
+                "coffee_id": coffee_id,
+                "quantity": quantity,
+                "coffee_name": name,
+                "item_price": (price * quantity) / 100,
+            })
+        return chunk
+
+    def finish(self) -> Optional[bytes]:
+        return self._close_order() or self._flush()
+
+    def _close_order(self) -> Optional[bytes]:
+        if self._order is None:
+            return None
+        line = dumps(self._order)
+        self._lines.append(line)
+        self._size += len(line) + 1
+        self._order = None
+        return self._flush() if self._size >= self.chunk_bytes else None
+
+    def _flush(self) -> Optional[bytes]:
+        if not self._lines:
+            return None
+        chunk = b"\n".join(self._lines) + b"\n"
+        self._lines = []
+        self._size = 0
+        return chunk
+
+def export_orders(db: Session, start: datetime, end: datetime, batch_size: int = 1000):
+    """Gera os pedidos do período em NDJSON, em blocos de bytes.
+
+    As linhas são lidas com ``yield_per`` (cursor no servidor no PostgreSQL),
+    de modo que a memória não cresce com o tamanho do período. O período
+    deve vir normalizado por ``order_export_range``.
+    """
+    result = db.execute(
+        order_export_statement(start, end).execution_options(yield_per=batch_size)
+    )
+    encoder = OrderExportEncoder()
+    try:
+        for row in result:
+            chunk = encoder.add(row)
+            if chunk:
+                yield chunk
+    finally:
+        result.close()
+    chunk = encoder.finish()
+    if chunk:
+        yield chunk
+
+async def export_orders_async(db, start: datetime, end: datetime, batch_size: int = 1000):
+    """Versão de ``export_orders`` para ``AsyncSession`` (``db.stream``)"""
+    result = await db.stream(
+        order_export_statement(start, end).execution_options(yield_per=batch_size)
+    )
+    encoder = OrderExportEncoder()
+    try:
+        async for row in result:
+            chunk = encoder.add(row)
+            if chunk:
+                yield chunk
+    finally:
+        await result.close()
+    chunk = encoder.finish()
+    if chunk:
+        yield chunk
+
+# Formatos de truncamento do SQLite (strftime) por tamanho de bucket
+SQLITE_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+def _truncate(db: Session, column, bucket: str):
+    """Expressão que trunca uma coluna de data/hora para a hora ou o dia"""
+    if bucket not in SQLITE_BUCKET_FORMATS:
+        raise ValueError(f"Bucket inválido: {bucket}")
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.date_trunc(bucket, column)
+    if dialect == "sqlite":
+        return func.strftime(SQLITE_BUCKET_FORMATS[bucket], column)
+    raise ValueError(f"Série de vendas não suportada no banco {dialect}")
+
+def get_sales_series(
+    db: Session,
+    bucket: str,
+    start: datetime,
+    end: datetime,
+    coffee_id: Optional[int] = None,
+):
+    """Vendas (xícaras e receita) por hora ou dia e por café no período.
+
+    A agregação é feita no banco com um único GROUP BY sobre a data truncada:
+    horas completas vêm do rollup horário e apenas as frações de hora nas
+    bordas do período são somadas a partir dos itens (e do arquivo, quando a
+    borda é anterior à retenção). O resultado é orientado
+    a colunas: listas paralelas com uma posição por par (bucket, café), em
+    ordem de bucket e café.
+    """
+    start, end = order_export_range(start, end)
+    first_hour, last_hour = next_hour_bucket(start), hour_bucket(end)
+    
+    def items_between(lower, upper):
+        queries = []
+        for order, item in order_sources(lower):
+            query = select(
+                _truncate(db, order.created_at, bucket).label("bucket_start"),
+                item.coffee_id.label("coffee_id"),
+                item.quantity.label("cups"),
+                (item.unit_price_cents * item.quantity).label("revenue_cents"),
+            ).select_from(item).join(
+                order, item.order_id == order.id
+            ).where(order.created_at >= lower, order.created_at < upper)
+            if coffee_id is not None:
+                query = query.where(item.coffee_id == coffee_id)
+            queries.append(query)
+        return queries
+    
+    if first_hour >= last_hour:
+        # Período sem nenhuma hora completa
+        parts = items_between(start, end)
+    else:
+        rollup = select(
+            _truncate(db, ConsumptionHourly.bucket, bucket).label("bucket_start"),
+            ConsumptionHourly.coffee_id.label("coffee_id"),
+            ConsumptionHourly.cups.label("cups"),
+            ConsumptionHourly.revenue_cents.label("revenue_cents"),
+        ).where(ConsumptionHourly.bucket >= first_hour, ConsumptionHourly.bucket < last_hour)
+        if coffee_id is not None:
+            rollup = rollup.where(ConsumptionHourly.coffee_id == coffee_id)
+        parts = [rollup, *items_between(start, first_hour), *items_between(last_hour, end)]
+    
+    rows = union_all(*parts).subquery()
+    stmt = select(
+        rows.c.bucket_start,
+        rows.c.coffee_id,
+        func.sum(rows.c.cups),
+        func.sum(rows.c.revenue_cents),
+    ).group_by(rows.c.bucket_start, rows.c.coffee_id).order_by(rows.c.bucket_start, rows.c.coffee_id)
+    
+    # Transpõe as linhas em colunas de uma vez
+    moments, coffee_ids, cups, revenue_cents = list(zip(*db.execute(stmt).all())) or ((), (), (), ())
+    return {
+        "bucket": bucket,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "columns": {
+            # SQLite devolve "AAAA-MM-DD HH:MM:SS"; PostgreSQL, datetime
+            "bucket_start": [
+                moment.replace(" ", "T") if isinstance(moment, str) else moment.isoformat()
+                for moment in moments
+            ],
+            "coffee_id": list(coffee_ids),
+            "cups": [int(value) for value in cups],
+            "revenue": [int(value) / 100 for value in revenue_cents],  # Converte centavos para reais
+        },
+    }
+
 def get_consumption_analysis(db: Session, days: int = 1):
     """Analisa o consumo de insumos baseado nos pedidos dos últimos dias"""
-    from datetime import datetime, timedelta
+    from datetime import timedelta
     
     # Calcular data de início
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    # Buscar pedidos dos últimos dias
-    orders = db.query(Order).filter(Order.created_at >= start_date).all()
-    
-    total_water = 0
-    total_milk = 0
-    total_coffee_grounds = 0
-    total_coffees = 0
-    
-    for order in orders:
-        for item in order.items:
-            coffee = item.coffee
-            quantity = item.quantity
-            
-            total_water += coffee.water_ml * quantity
-            total_milk += coffee.milk_ml * quantity
-            total_coffee_grounds += coffee.coffee_grounds_g * quantity
-            total_coffees += quantity
+    # Horas completas vêm do rollup horário; apenas a fração inicial da
+    # janela (antes da primeira hora cheia) é agregada a partir dos itens,
+    # incluindo os arquivados quando a janela é maior que a retenção
+    boundary = next_hour_bucket(start_date)
+    rollup = db.query(
+        func.coalesce(func.sum(ConsumptionHourly.cups), 0).label("cups"),
+        func.coalesce(func.sum(ConsumptionHourly.water_ml), 0).label("water_ml"),
+        func.coalesce(func.sum(ConsumptionHourly.milk_ml), 0).label("milk_ml"),
+        func.coalesce(func.sum(ConsumptionHourly.coffee_grounds_g), 0).label("coffee_grounds_g"),
+    ).filter(ConsumptionHourly.bucket >= boundary)
+    partial_hour = [
+        db.query(
+            func.coalesce(func.sum(item.quantity), 0),
+            func.coalesce(func.sum(item.water_ml * item.quantity), 0),
+            func.coalesce(func.sum(item.milk_ml * item.quantity), 0),
+            func.coalesce(func.sum(item.coffee_grounds_g * item.quantity), 0),
+        ).select_from(item).join(
+            order, item.order_id == order.id
+        ).filter(order.created_at >= start_date, order.created_at < boundary)
+        for order, item in order_sources(start_date)
+    ]
+    
+    parts = rollup.union_all(*partial_hour).subquery()
+    totals = db.query(*[
+        cast(func.sum(column), BigInteger) for column in parts.c
+    ]).one()
+    
+    total_coffees, total_water, total_milk, total_coffee_grounds = totals
     
     # Calcular médias
     avg_water_per_day = total_water / days if days > 0 else 0
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, text, union_all, update
+from sqlalchemy.orm import Session
+from app.models.archive import OrderArchive, OrderItemArchive
+from app.models.coffee import Coffee
+from app.models.consumption import ConsumptionHourly
+from app.models.order import Order, OrderItem
+
+ROLLUP_FIELDS = ("cups", "water_ml", "milk_ml", "coffee_grounds_g", "revenue_cents")
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Trunca uma data/hora para o início da hora"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def next_hour_bucket(moment: datetime) -> datetime:
+    """Retorna o primeiro início de hora maior ou igual à data/hora informada"""
+    bucket = hour_bucket(moment)
+    return bucket if bucket == moment else bucket + timedelta(hours=1)
+
+def _line_values(coffee: Coffee, quantity: int) -> tuple:
+    """Contribuição de um item de pedido para o rollup, na ordem de ROLLUP_FIELDS"""
+    return (
+        quantity,
+        coffee.water_ml * quantity,
+        coffee.milk_ml * quantity,
+        coffee.coffee_grounds_g * quantity,
+        coffee.price * quantity,
+    )
+
+def _upsert_rows(db: Session, rows: list):
+    """Soma as linhas ao rollup de forma atômica (INSERT ... ON CONFLICT DO UPDATE)"""
+    if not rows:
+        return
+    # Ordem fixa de chaves evita deadlocks entre transações concorrentes
+    rows = sorted(rows, key=lambda row: (row["bucket"], row["coffee_id"]))
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(ConsumptionHourly)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConsumptionHourly.bucket, ConsumptionHourly.coffee_id],
+            set_={
+                field: getattr(ConsumptionHourly, field) + getattr(stmt.excluded, field)
+                for field in ROLLUP_FIELDS
+            },
+        )
+        db.execute(stmt, rows)
+        return
+
+    # Demais dialetos: UPDATE incremental e INSERT quando a linha ainda não existe
+    for row in rows:
+        result = db.execute(
+            update(ConsumptionHourly)
+            .where(
+                ConsumptionHourly.bucket == row["bucket"],
+                ConsumptionHourly.coffee_id == row["coffee_id"],
+            )
+            .values({
+                field: getattr(ConsumptionHourly, field) + row[field]
+                for field in ROLLUP_FIELDS
+            })
+        )
+        if result.rowcount == 0:
+            db.add(ConsumptionHourly(**row))
+    db.flush()
+
+def _to_rows(totals: dict) -> list:
+    return [
+        {"bucket": bucket, "coffee_id": coffee_id, **dict(zip(ROLLUP_FIELDS, values))}
+        for (bucket, coffee_id), values in totals.items()
+    ]
+
+def record_order_consumption(db: Session, created_at: datetime, lines):
+    """Acumula no rollup horário o consumo de um pedido.
+
+    Deve ser chamado dentro da mesma transação que grava o pedido; ``lines``
+    é uma sequência de pares ``(coffee, quantity)``.
+    """
+    record_consumption(db, ((created_at, coffee, quantity) for coffee, quantity in lines))
+
+def record_consumption(db: Session, lines):
+    """Acumula no rollup horário itens de vários pedidos de uma vez.
+
+    ``lines`` é uma sequência de ``(created_at, coffee, quantity)``; as linhas
+    são somadas por hora e café antes de um único upsert em lote.
+    """
+    totals = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+    for created_at, coffee, quantity in lines:
+        acc = totals[(hour_bucket(created_at), coffee.id)]
+        for index, value in enumerate(_line_values(coffee, quantity)):
+            acc[index] += value
+    _upsert_rows(db, _to_rows(totals))
+
+def backfill_consumption_rollup(db: Session, batch_size: int = 10000) -> int:
+    """Reconstrói o rollup horário a partir dos pedidos, inclusive os arquivados.
+
+    Bloqueia a tabela de rollup antes de ler os pedidos, de modo que pedidos
+    criados durante a reconstrução esperam o fim dela e somam sua parte sobre
+    o resultado final. Retorna o número de linhas gravadas.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(text("LOCK TABLE consumption_hourly IN EXCLUSIVE MODE"))
+    # No SQLite o DELETE já obtém o lock de escrita do banco
+    db.execute(delete(ConsumptionHourly))
+
+    # Usa o snapshot gravado em cada item, não os valores atuais do menu
+    rows = db.execute(
+        union_all(*[
+            select(
+                order.created_at,
+                item.quantity,
+                item.coffee_id,
+                item.water_ml,
+                item.milk_ml,
+                item.coffee_grounds_g,
+                item.unit_price_cents,
+            )
+            .select_from(item)
+            .join(order, item.order_id == order.id)
+            for order, item in ((Order, OrderItem), (OrderArchive, OrderItemArchive))
+        ])
+        .execution_options(yield_per=batch_size)
+    )
+
+    totals = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+    for created_at, quantity, coffee_id, water_ml, milk_ml, grounds_g, price in rows:
+        acc = totals[(hour_bucket(created_at), coffee_id)]
+        acc[0] += quantity
+        acc[1] += water_ml * quantity
+        acc[2] += milk_ml * quantity
+        acc[3] += grounds_g * quantity
+        acc[4] += price * quantity
+
+    rollup_rows = _to_rows(totals)
+    for start in range(0, len(rollup_rows), batch_size):
+        db.execute(ConsumptionHourly.__table__.insert(), rollup_rows[start:start + batch_size])
+    db.commit()
+    return len(rollup_rows)
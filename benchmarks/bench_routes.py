@@ -0,0 +1,60 @@
+"""
+Benchmarks das rotas via TestClient
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.services.coffee_service import invalidate_menu_cache
+
+ORDER = {"items": [{"coffee_id": 1, "quantity": 2}, {"coffee_id": 3, "quantity": 1}]}
+
+
+@pytest.fixture
+def client(dataset):
+    """Cliente com a sessão da aplicação apontando para o dataset"""
+    def override_get_db():
+        db = dataset.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    invalidate_menu_cache()
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+def request(client, method, url, json=None):
+    def call():
+        response = client.request(method, url, json=json)
+        assert response.status_code == 200, response.text
+    return call
+
+
+class BenchRoutes:
+    """Tempo, consultas e memória de cada rota (inclui validação e serialização)"""
+
+    def bench_post_order(self, bench, dataset, client):
+        bench("POST /orders/", dataset, request(client, "POST", "/orders/", ORDER))
+
+    def bench_get_pending(self, bench, dataset, client):
+        bench("GET /orders/pending", dataset, request(client, "GET", "/orders/pending"))
+
+    def bench_get_menu(self, bench, dataset, client):
+        bench("GET /menu/", dataset, request(client, "GET", "/menu/"))
+
+    def bench_get_consumption(self, bench, dataset, client):
+        bench("GET /orders/consumption", dataset, request(client, "GET", "/orders/consumption?days=30"))
+
+    def bench_get_sales(self, bench, dataset, client):
+        end = datetime.utcnow().replace(microsecond=0)
+        url = f"/orders/sales?bucket=day&from={(end - timedelta(days=30)).isoformat()}&to={end.isoformat()}"
+        bench("GET /orders/sales", dataset, request(client, "GET", url))
+
+    def bench_get_forecast(self, bench, dataset, client):
+        bench("GET /orders/consumption/forecast", dataset, request(client, "GET", "/orders/consumption/forecast?days=7"))
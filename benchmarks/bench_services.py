@@ -0,0 +1,57 @@
+"""
+Benchmarks das funções de serviço
+"""
+from collections import deque
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.forecast_service import get_consumption_forecast
+from app.services.order_service import (
+    create_order,
+    export_orders,
+    get_consumption_analysis,
+    get_pending_orders,
+    get_pending_orders_page,
+    get_sales_series
+)
+
+ORDER = OrderCreate(items=[
+    OrderItemCreate(coffee_id=1, quantity=2),
+    OrderItemCreate(coffee_id=3, quantity=1),
+])
+
+
+@pytest.fixture
+def db(dataset):
+    session = dataset.Session()
+    yield session
+    session.close()
+
+
+class BenchServices:
+    """Tempo, consultas e memória das funções de serviço por tamanho de dataset"""
+
+    def bench_create_order(self, bench, dataset, db):
+        bench("create_order", dataset, lambda: create_order(db, ORDER))
+
+    def bench_get_pending_orders(self, bench, dataset, db):
+        bench("get_pending_orders", dataset, lambda: get_pending_orders(db))
+
+    def bench_get_pending_orders_page(self, bench, dataset, db):
+        bench("get_pending_orders_page", dataset, lambda: get_pending_orders_page(db, 100, as_payload=True))
+
+    def bench_get_consumption_analysis(self, bench, dataset, db):
+        bench("get_consumption_analysis_30d", dataset, lambda: get_consumption_analysis(db, days=30))
+
+    def bench_get_sales_series(self, bench, dataset, db):
+        end = datetime.utcnow()
+        bench("get_sales_series_30d", dataset, lambda: get_sales_series(db, "day", end - timedelta(days=30), end))
+
+    def bench_get_consumption_forecast(self, bench, dataset, db):
+        bench("get_consumption_forecast", dataset, lambda: get_consumption_forecast(db, days=7))
+
+    def bench_export_orders(self, bench, dataset, db):
+        end = datetime.utcnow()
+        bench("export_orders_1d", dataset, lambda: deque(export_orders(db, end - timedelta(days=1), end), maxlen=0))
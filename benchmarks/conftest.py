@@ -0,0 +1,240 @@
+"""
+Configuração dos benchmarks: datasets por tamanho, medição e comparação com o baseline
+"""
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_tables
+from app.models.coffee import Coffee
+from app.query_recorder import QueryRecorder
+from scripts.generate_dataset import generate_dataset
+from scripts.populate_menu import menu_data
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+LAST_RUN_PATH = os.path.join(DATA_DIR, "last_run.json")
+
+DEFAULT_SIZES = "1000,100000,1000000"
+# Dias cobertos pelos pedidos de cada dataset
+DATASET_DAYS = 90
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-sizes", default=os.getenv("BENCH_SIZES", DEFAULT_SIZES),
+                    help="Quantidades de pedidos dos datasets, separadas por vírgula")
+    group.addoption("--bench-rounds", type=int, default=int(os.getenv("BENCH_ROUNDS", "5")),
+                    help="Execuções cronometradas por benchmark (vale a mediana)")
+    group.addoption("--bench-threshold", type=float, default=float(os.getenv("BENCH_THRESHOLD", "0.25")),
+                    help="Piora máxima do tempo em relação ao baseline (0.25 = 25%%)")
+    group.addoption("--bench-memory-threshold", type=float,
+                    default=float(os.getenv("BENCH_MEMORY_THRESHOLD", "0.25")),
+                    help="Piora máxima do pico de memória em relação ao baseline")
+    group.addoption("--bench-save-baseline", action="store_true",
+                    help="Grava os resultados desta execução em baseline.json")
+
+
+def pytest_generate_tests(metafunc):
+    if "dataset" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes").split(",")]
+        metafunc.parametrize("dataset", sizes, indirect=True, ids=str, scope="session")
+
+
+class Dataset:
+    """Cópia de trabalho de um banco com ``size`` pedidos sintéticos"""
+
+    def __init__(self, size: int, path: str):
+        self.size = size
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+
+def _build_dataset(size: int) -> str:
+    """Banco com ``size`` pedidos terminando agora, reaproveitado durante o dia"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    today = datetime.utcnow().strftime("%Y%m%d")
+    path = os.path.join(DATA_DIR, f"dataset-{size}-{today}.db")
+    if os.path.exists(path):
+        return path
+
+    for name in os.listdir(DATA_DIR):
+        if name.startswith(f"dataset-{size}-"):
+            os.remove(os.path.join(DATA_DIR, name))
+    building = path + ".building"
+    engine = create_engine(f"sqlite:///{building}")
+    try:
+        create_tables(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            db.add_all(Coffee(**item) for item in menu_data)
+            db.commit()
+            generate_dataset(db, size, days=DATASET_DAYS, seed=size)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+    os.replace(building, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def dataset(request, tmp_path_factory):
+    """Dataset do tamanho do parâmetro; benchmarks de escrita alteram só a cópia"""
+    source = _build_dataset(request.param)
+    path = tmp_path_factory.mktemp(f"dataset-{request.param}") / "bench.db"
+    shutil.copy(source, path)
+    data = Dataset(request.param, str(path))
+    yield data
+    data.engine.dispose()
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "cpu"
+
+
+def environment_id() -> str:
+    """Ambiente em que tempo e memória foram medidos (``BENCH_ENVIRONMENT`` sobrescreve)"""
+    return os.getenv("BENCH_ENVIRONMENT") or (
+        f"{platform.system()}-{platform.machine()} {_cpu_model()} x{os.cpu_count()} "
+        f"python{sys.version_info.major}.{sys.version_info.minor}"
+    )
+
+
+def _load_baseline() -> dict:
+    """``{"environment": ..., "benchmarks": {nome[tamanho]: resultado}}``"""
+    if not os.path.exists(BASELINE_PATH):
+        return {"environment": None, "benchmarks": {}}
+    with open(BASELINE_PATH, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _same_environment(baseline: dict) -> bool:
+    """Tempo e memória só são comparados com um baseline gravado neste ambiente"""
+    return baseline.get("environment") == environment_id()
+
+
+class BenchmarkRunner:
+    """Mede tempo (mediana), consultas ao banco e pico de memória de uma função.
+
+    O número de consultas é sempre comparado com o baseline; tempo e memória
+    dependem da máquina e só falham quando o baseline foi gravado no mesmo
+    ambiente (``environment_id``). Fora dele aparecem apenas no resumo.
+    """
+
+    def __init__(self, config, results: dict, baseline: dict):
+        self.rounds = config.getoption("--bench-rounds")
+        self.threshold = config.getoption("--bench-threshold")
+        self.memory_threshold = config.getoption("--bench-memory-threshold")
+        self.saving = config.getoption("--bench-save-baseline")
+        self.results = results
+        self.baseline = baseline["benchmarks"]
+        self.compare_resources = _same_environment(baseline)
+
+    def __call__(self, name: str, dataset: Dataset, fn) -> dict:
+        fn()  # Aquecimento: caches, compilação de statements, páginas do SQLite
+
+        with QueryRecorder(dataset.engine, capture_call_sites=False) as recorder:
+            started = time.perf_counter()
+            fn()
+            timings = [time.perf_counter() - started]
+        for _ in range(self.rounds - 1):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+
+        # tracemalloc deixa a execução mais lenta: medido em uma rodada à parte
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        key = f"{name}[{dataset.size}]"
+        result = {
+            "wall_ms": round(statistics.median(timings) * 1000, 3),
+            "queries": recorder.count,
+            "peak_kib": round(peak / 1024, 1),
+        }
+        self.results[key] = result
+        if not self.saving:
+            self._check(key, result)
+        return result
+
+    def _check(self, key: str, result: dict):
+        expected = self.baseline.get(key)
+        if expected is None:
+            return
+        regressions = []
+        if result["queries"] > expected["queries"]:
+            regressions.append(f"consultas {expected['queries']} -> {result['queries']}")
+        if self.compare_resources and "wall_ms" in expected:
+            if result["wall_ms"] > expected["wall_ms"] * (1 + self.threshold):
+                regressions.append(f"tempo {expected['wall_ms']} -> {result['wall_ms']} ms")
+            if result["peak_kib"] > expected["peak_kib"] * (1 + self.memory_threshold):
+                regressions.append(f"memória {expected['peak_kib']} -> {result['peak_kib']} KiB")
+        if regressions:
+            pytest.fail(f"{key} piorou em relação ao baseline: " + "; ".join(regressions), pytrace=False)
+
+
+def pytest_configure(config):
+    config._bench_results = {}
+
+
+@pytest.fixture(scope="session")
+def bench(request):
+    """Executor dos benchmarks: ``bench(nome, dataset, função)``"""
+    return BenchmarkRunner(request.config, request.config._bench_results, _load_baseline())
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = getattr(config, "_bench_results", {})
+    if not results:
+        return
+    baseline = _load_baseline()
+    environment = environment_id()
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<48} {'ms':>10} {'baseline':>10} {'consultas':>9} {'pico KiB':>10}")
+    for key, result in sorted(results.items()):
+        expected = baseline["benchmarks"].get(key, {}).get("wall_ms", "-")
+        terminalreporter.write_line(
+            f"{key:<48} {result['wall_ms']:>10} {expected:>10} {result['queries']:>9} {result['peak_kib']:>10}"
+        )
+    if not _same_environment(baseline):
+        terminalreporter.write_line(
+            f"Tempo e memória apenas informativos: baseline sem medições de {environment!r} "
+            "(grave com --bench-save-baseline)"
+        )
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(LAST_RUN_PATH, "w", encoding="utf-8") as file:
+        json.dump({"environment": environment, "benchmarks": results}, file, indent=2, sort_keys=True)
+    if config.getoption("--bench-save-baseline"):
+        previous = baseline["benchmarks"]
+        if not _same_environment(baseline):
+            # Tempos de outro ambiente não se misturam aos desta máquina
+            previous = {key: {"queries": value["queries"]} for key, value in previous.items()}
+        with open(BASELINE_PATH, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment, "benchmarks": {**previous, **results}},
+                      file, indent=2, sort_keys=True)
+            file.write("\n")
+        terminalreporter.write_line(f"Baseline atualizado: {BASELINE_PATH}")
@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import Base, engine
+import app.models  # noqa: F401  (registra as tabelas no metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """Gera o SQL das migrations sem conectar ao banco (alembic upgrade --sql)"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Aplica as migrations usando a conexão recebida de create_tables ou o engine da aplicação"""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        # Execução pela linha de comando do alembic
+        if config.config_file_name is not None:
+            fileConfig(config.config_file_name)
+        with engine.connect() as connection:
+            _run(connection)
+            connection.commit()
+    else:
+        _run(connection)
+
+def _run(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,36 @@
+"""Rollup horário de consumo (consumption_hourly)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-02
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos criados antes das migrations já podem ter a tabela (create_all)
+    if sa.inspect(op.get_bind()).has_table("consumption_hourly"):
+        return
+    op.create_table(
+        "consumption_hourly",
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("coffee_id", sa.Integer(), nullable=False),
+        sa.Column("cups", sa.Integer(), nullable=False),
+        sa.Column("water_ml", sa.Integer(), nullable=False),
+        sa.Column("milk_ml", sa.Integer(), nullable=False),
+        sa.Column("coffee_grounds_g", sa.Integer(), nullable=False),
+        sa.Column("revenue_cents", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["coffee_id"], ["coffees.id"]),
+        sa.PrimaryKeyConstraint("bucket", "coffee_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("consumption_hourly")
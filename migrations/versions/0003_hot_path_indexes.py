@@ -0,0 +1,55 @@
+"""Índices das consultas quentes de pedidos
+
+- orders(status, created_at, id): fila de pendentes e filtros por status
+- orders(created_at, id) WHERE status = 'pending': índice parcial da fila
+- orders(created_at): janelas de consumo e relatórios por período
+- order_items(order_id) e order_items(coffee_id, order_id): chaves estrangeiras
+- remove coffees(price), que nenhuma consulta usa
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-09
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+PENDING = sa.text("status = 'pending'")
+
+
+def _existing_indexes(table):
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    orders = _existing_indexes("orders")
+    if "ix_orders_status_created_at_id" not in orders:
+        op.create_index("ix_orders_status_created_at_id", "orders", ["status", "created_at", "id"])
+    op.create_index(
+        "ix_orders_pending_created_at_id",
+        "orders",
+        ["created_at", "id"],
+        postgresql_where=PENDING,
+        sqlite_where=PENDING,
+    )
+    op.create_index("ix_orders_created_at", "orders", ["created_at"])
+
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+    op.create_index("ix_order_items_coffee_id_order_id", "order_items", ["coffee_id", "order_id"])
+
+    if "ix_coffees_price" in _existing_indexes("coffees"):
+        op.drop_index("ix_coffees_price", table_name="coffees")
+
+
+def downgrade():
+    op.create_index("ix_coffees_price", "coffees", ["price"])
+    op.drop_index("ix_order_items_coffee_id_order_id", table_name="order_items")
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
+    op.drop_index("ix_orders_created_at", table_name="orders")
+    op.drop_index("ix_orders_pending_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_status_created_at_id", table_name="orders")
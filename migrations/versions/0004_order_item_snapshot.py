@@ -0,0 +1,53 @@
+"""Snapshot do café em order_items
+
+Grava em cada item o nome, o preço unitário e a receita do café no momento
+do pedido. Itens existentes são preenchidos a partir de coffees.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Coluna em order_items -> coluna de origem em coffees
+SNAPSHOT_COLUMNS = {
+    "coffee_name": ("name", sa.String()),
+    "unit_price_cents": ("price", sa.Integer()),
+    "water_ml": ("water_ml", sa.Integer()),
+    "milk_ml": ("milk_ml", sa.Integer()),
+    "coffee_grounds_g": ("coffee_grounds_g", sa.Integer()),
+}
+
+
+def upgrade():
+    with op.batch_alter_table("order_items") as batch:
+        for column, (_, type_) in SNAPSHOT_COLUMNS.items():
+            batch.add_column(sa.Column(column, type_, nullable=True))
+
+    # Backfill com um único UPDATE (subconsultas correlacionadas funcionam
+    # tanto no PostgreSQL quanto no SQLite)
+    op.execute(
+        "UPDATE order_items SET "
+        + ", ".join(
+            f"{column} = (SELECT coffees.{source} FROM coffees "
+            f"WHERE coffees.id = order_items.coffee_id)"
+            for column, (source, _) in SNAPSHOT_COLUMNS.items()
+        )
+    )
+
+    with op.batch_alter_table("order_items") as batch:
+        for column, (_, type_) in SNAPSHOT_COLUMNS.items():
+            batch.alter_column(column, existing_type=type_, nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("order_items") as batch:
+        for column in reversed(list(SNAPSHOT_COLUMNS)):
+            batch.drop_column(column)
@@ -0,0 +1,50 @@
+"""Tabelas de arquivo de pedidos concluídos (orders_archive, order_items_archive)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-24
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_orders_archive_created_at", "orders_archive", ["created_at"])
+
+    op.create_table(
+        "order_items_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("coffee_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("coffee_name", sa.String(), nullable=False),
+        sa.Column("unit_price_cents", sa.Integer(), nullable=False),
+        sa.Column("water_ml", sa.Integer(), nullable=False),
+        sa.Column("milk_ml", sa.Integer(), nullable=False),
+        sa.Column("coffee_grounds_g", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["coffee_id"], ["coffees.id"]),
+        sa.ForeignKeyConstraint(["order_id"], ["orders_archive.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_order_items_archive_order_id", "order_items_archive", ["order_id"])
+
+
+def downgrade():
+    op.drop_index("ix_order_items_archive_order_id", table_name="order_items_archive")
+    op.drop_table("order_items_archive")
+    op.drop_index("ix_orders_archive_created_at", table_name="orders_archive")
+    op.drop_table("orders_archive")
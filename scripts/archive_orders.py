@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from app.config import settings
+from app.database import create_tables, get_db
+from app.services.archive_service import archive_completed_orders
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move pedidos concluídos mais antigos que ARCHIVE_RETENTION_DAYS para as tabelas de arquivo"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                        help="Pedidos movidos por transação")
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Encerra depois deste número de lotes (padrão: até esvaziar)")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Pausa entre lotes, em segundos")
+    args = parser.parse_args()
+
+    print("Criando tabelas...")
+    create_tables()
+    db = next(get_db())
+    try:
+        print(f"Arquivando pedidos concluídos com mais de {settings.ARCHIVE_RETENTION_DAYS} dias...")
+        started = time.perf_counter()
+        summary = archive_completed_orders(db, args.batch_size, args.max_batches, args.pause)
+        elapsed = time.perf_counter() - started
+        print(
+            f"✅ {summary['orders']:,} pedidos e {summary['items']:,} itens anteriores a "
+            f"{summary['cutoff']:%Y-%m-%d %H:%M} arquivados em {summary['batches']} lotes ({elapsed:.1f}s)"
+        )
+    except Exception as e:
+        print(f"❌ Erro ao arquivar pedidos: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
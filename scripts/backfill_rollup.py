@@ -0,0 +1,27 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import create_tables, get_db
+from app.services.rollup_service import backfill_consumption_rollup
+
+def backfill_rollup():
+    """Reconstrói o rollup horário de consumo a partir dos pedidos existentes"""
+    print("Criando tabelas...")
+    create_tables()
+    
+    print("Conectando ao banco...")
+    db = next(get_db())
+    
+    try:
+        print("Reconstruindo rollup horário de consumo...")
+        rows = backfill_consumption_rollup(db)
+        print(f"✅ Rollup reconstruído com sucesso! ({rows} linhas hora × café)")
+    except Exception as e:
+        print(f"❌ Erro ao reconstruir rollup: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_rollup()
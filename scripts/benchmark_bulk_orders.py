@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.coffee import Coffee
+from app.schemas.order import OrderBulkEntry, OrderCreate, OrderItemCreate
+from app.services.order_service import create_order, create_orders_bulk
+from scripts.populate_menu import menu_data
+
+DEFAULT_SIZES = [1000, 100000]
+# Tamanho máximo de um lote em POST /orders/bulk
+REQUEST_BATCH = 5000
+
+
+def make_session(url: str):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    db.add_all(Coffee(**item) for item in menu_data)
+    db.commit()
+    coffee_ids = [coffee.id for coffee in db.query(Coffee).all()]
+    db.close()
+    return engine, Session, coffee_ids
+
+
+def make_entries(count: int, coffee_ids):
+    """Pedidos sintéticos com 1 a 3 itens, espalhados pelas últimas 24 horas"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    return [
+        OrderBulkEntry(
+            created_at=now - timedelta(seconds=rng.randrange(86400)),
+            items=[
+                OrderItemCreate(coffee_id=rng.choice(coffee_ids), quantity=rng.randint(1, 2))
+                for _ in range(rng.randint(1, 3))
+            ],
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_bulk(url: str, count: int):
+    engine, Session, coffee_ids = make_session(url)
+    entries = make_entries(count, coffee_ids)
+    started = time.perf_counter()
+    for start in range(0, count, REQUEST_BATCH):
+        db = Session()
+        try:
+            create_orders_bulk(db, entries[start:start + REQUEST_BATCH])
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed
+
+
+def bench_one_by_one(url: str, count: int):
+    engine, Session, coffee_ids = make_session(url)
+    entries = make_entries(count, coffee_ids)
+    started = time.perf_counter()
+    for entry in entries:
+        db = Session()
+        try:
+            create_order(db, OrderCreate(items=entry.items))
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed
+
+
+def main(sizes, database_url, one_by_one_limit):
+    print(f"Ingestão em lote (lotes de {REQUEST_BATCH} pedidos por transação)\n")
+    print(f"{'pedidos':>8} | {'lote (s)':>9} | {'pedidos/s':>10} | {'um a um (s)':>11} | {'pedidos/s':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = database_url or f"sqlite:///{os.path.join(tmp, 'bulk.db')}"
+            bulk = bench_bulk(url, size)
+            line = f"{size:>8} | {bulk:>9.2f} | {size / bulk:>10.0f} | "
+            if size <= one_by_one_limit:
+                url = database_url or f"sqlite:///{os.path.join(tmp, 'single.db')}"
+                single = bench_one_by_one(url, size)
+                line += f"{single:>11.2f} | {size / single:>10.0f}"
+            else:
+                line += f"{'-':>11} | {'-':>10}"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vazão de POST /orders/bulk versus POST /orders/ repetido")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Banco vazio para o benchmark (padrão: SQLite temporário)",
+    )
+    parser.add_argument(
+        "--one-by-one-limit",
+        type=int,
+        default=10000,
+        help="Maior tamanho medido também com create_order pedido a pedido",
+    )
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")], args.database_url, args.one_by_one_limit)
@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.coffee import Coffee
+from app.models.order import Order, OrderItem
+from app.schemas.order import OrderCreate, OrderItemCreate, OrderResponse
+from app.services.order_service import create_order
+from scripts.populate_menu import menu_data
+
+ITEM_COUNTS = [1, 3, 5, 10]
+ORDERS_PER_RUN = 200
+
+
+def legacy_create_order(db, order_data):
+    """Implementação anterior de create_order, mantida apenas para comparação"""
+    total_price = 0
+    order_items = []
+
+    for item in order_data.items:
+        coffee = db.query(Coffee).filter(Coffee.id == item.coffee_id).first()
+        if not coffee:
+            raise ValueError(f"Café com ID {item.coffee_id} não encontrado")
+        total_price += (coffee.price * item.quantity) / 100
+        order_items.append({"coffee_id": item.coffee_id, "quantity": item.quantity})
+
+    db_order = Order(total_price=total_price)
+    db.add(db_order)
+    db.commit()
+    db.refresh(db_order)
+
+    for item_data in order_items:
+        db.add(OrderItem(order_id=db_order.id, **item_data))
+
+    db.commit()
+    db.refresh(db_order)
+    return db.query(Order).filter(Order.id == db_order.id).first()
+
+
+def measure(create_fn, item_count):
+    """Mede comandos SQL, commits e tempo médio por pedido (incluindo a serialização)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    db.add_all(Coffee(**item) for item in menu_data)
+    db.commit()
+    coffee_ids = [coffee.id for coffee in db.query(Coffee).all()]
+    db.close()
+
+    counters = {"statements": 0, "commits": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counters["statements"] += 1
+
+    def on_commit(conn):
+        counters["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+
+    order_data = OrderCreate(items=[
+        OrderItemCreate(coffee_id=coffee_ids[i % len(coffee_ids)], quantity=1)
+        for i in range(item_count)
+    ])
+
+    started = time.perf_counter()
+    for _ in range(ORDERS_PER_RUN):
+        db = Session()
+        try:
+            # O FastAPI serializa a resposta com o response_model da rota
+            OrderResponse.model_validate(create_fn(db, order_data))
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - started
+
+    engine.dispose()
+    return {
+        "statements": counters["statements"] / ORDERS_PER_RUN,
+        "commits": counters["commits"] / ORDERS_PER_RUN,
+        "ms_per_order": elapsed * 1000 / ORDERS_PER_RUN,
+    }
+
+
+def main():
+    print(f"Round trips por pedido ({ORDERS_PER_RUN} pedidos por medição, SQLite em memória)\n")
+    print(f"{'itens':>5} | {'antes (SQL/commits/ms)':>24} | {'depois (SQL/commits/ms)':>24}")
+    for item_count in ITEM_COUNTS:
+        before = measure(legacy_create_order, item_count)
+        after = measure(create_order, item_count)
+        print(
+            f"{item_count:>5} | "
+            f"{before['statements']:>8.0f} / {before['commits']:.0f} / {before['ms_per_order']:>6.2f} | "
+            f"{after['statements']:>8.0f} / {after['commits']:.0f} / {after['ms_per_order']:>6.2f}"
+        )
+    print(
+        "\nNo SQLite os INSERTs dos itens são enviados um a um (o dialeto não garante a "
+        "ordem do RETURNING em lote); no PostgreSQL eles saem em um único comando."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import argparse
+import statistics
+import tempfile
+import time
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas.order import OrderSummary
+from app.serialization import FastJSONResponse, orjson
+from app.services.order_service import (
+    create_orders_bulk,
+    get_pending_orders,
+    get_pending_orders_payload
+)
+from scripts.benchmark_bulk_orders import make_entries, make_session
+
+summaries = TypeAdapter(List[OrderSummary])
+
+
+def models_path(db, count: int):
+    """Caminho padrão: objetos ORM → OrderSummary (from_attributes) → JSONResponse"""
+    started = time.process_time()
+    orders = get_pending_orders(db, count)
+    loaded = time.process_time()
+    validated = summaries.validate_python(orders, from_attributes=True)
+    body = JSONResponse(summaries.dump_python(validated, mode="json")).body
+    return loaded - started, time.process_time() - loaded, len(body)
+
+
+def fast_path(db, count: int):
+    """Caminho rápido: colunas → dicts → FastJSONResponse"""
+    started = time.process_time()
+    orders = get_pending_orders_payload(db, count)
+    loaded = time.process_time()
+    body = FastJSONResponse(orders).body
+    return loaded - started, time.process_time() - loaded, len(body)
+
+
+def measure(Session, path, count: int, runs: int):
+    samples = []
+    for _ in range(runs):
+        db = Session()
+        try:
+            samples.append(path(db, count))
+        finally:
+            db.close()
+    query = statistics.median(sample[0] for sample in samples) * 1000
+    encode = statistics.median(sample[1] for sample in samples) * 1000
+    return query, encode, samples[0][2]
+
+
+def main(count: int, runs: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session, coffee_ids = make_session(f"sqlite:///{os.path.join(tmp, 'serialization.db')}")
+        db = Session()
+        create_orders_bulk(db, make_entries(count, coffee_ids))
+        db.close()
+
+        print(f"CPU por requisição de {count} pedidos pendentes (mediana de {runs} execuções)")
+        print(f"Encoder JSON: {'orjson' if orjson is not None else 'json (orjson não instalado)'}\n")
+        print(f"{'caminho':<10} | {'consulta ms':>11} | {'serialização ms':>15} | {'total ms':>9} | {'bytes':>8}")
+        for name, path in (("modelos", models_path), ("rápido", fast_path)):
+            query, encode, size = measure(Session, path, count, runs)
+            print(f"{name:<10} | {query:>11.2f} | {encode:>15.2f} | {query + encode:>9.2f} | {size:>8}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara a serialização de GET /orders/pending com e sem FAST_JSON_RESPONSES")
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.orders, args.runs)
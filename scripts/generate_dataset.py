@@ -0,0 +1,147 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from app.database import create_tables, get_db
+from app.models.coffee import Coffee
+from app.models.order import ORDER_STATUS_COMPLETED, ORDER_STATUS_PENDING, Order
+from app.services.order_service import insert_order_items
+from app.services.rollup_service import backfill_consumption_rollup
+
+# Peso de cada hora do dia (UTC): abertura às 6h, picos no café da manhã,
+# almoço e meio da tarde, fechamento às 22h
+HOUR_WEIGHTS = np.array([
+    0, 0, 0, 0, 0, 0, 2, 8, 10, 7, 5, 6,
+    9, 8, 5, 6, 6, 4, 3, 2, 2, 1, 0, 0,
+], dtype=float)
+# Peso de cada dia da semana (segunda a domingo)
+WEEKDAY_WEIGHTS = np.array([1.0, 1.0, 1.05, 1.05, 1.15, 1.3, 0.8])
+# Itens distintos por pedido e quantidade por item
+ITEMS_PER_ORDER = (np.array([1, 2, 3, 4]), np.array([0.6, 0.25, 0.1, 0.05]))
+QUANTITIES = (np.array([1, 2, 3]), np.array([0.8, 0.15, 0.05]))
+# Popularidade dos cafés do menu inicial; outros cafés dividem o peso restante
+COFFEE_POPULARITY = {
+    "Expresso": 0.3,
+    "Cappuccino": 0.25,
+    "Americano": 0.2,
+    "Flat White": 0.15,
+    "Expresso Duplo": 0.1,
+}
+# Pedidos dos últimos minutos continuam pendentes
+PENDING_WINDOW = timedelta(minutes=30)
+
+def order_offsets(rng: np.random.Generator, count: int, start: datetime, days: int) -> np.ndarray:
+    """Segundos desde ``start`` de cada pedido, ordenados, com perfil por hora e dia da semana"""
+    slots = [start + timedelta(hours=hour) for hour in range(days * 24)]
+    weights = np.array([WEEKDAY_WEIGHTS[slot.weekday()] * HOUR_WEIGHTS[slot.hour] for slot in slots])
+    slot = rng.choice(len(slots), size=count, p=weights / weights.sum())
+    offsets = slot * 3600 + rng.integers(0, 3600, size=count)
+    offsets.sort()
+    return offsets
+
+def coffee_weights(coffees) -> np.ndarray:
+    known = sum(COFFEE_POPULARITY.get(coffee.name, 0) for coffee in coffees)
+    unknown = [coffee for coffee in coffees if coffee.name not in COFFEE_POPULARITY]
+    share = (1 - known) / len(unknown) if unknown and known < 1 else 0.05
+    weights = np.array([COFFEE_POPULARITY.get(coffee.name, share) for coffee in coffees])
+    return weights / weights.sum()
+
+def generate_dataset(db, orders: int, days: int = 90, seed: int = 42, batch_size: int = 20000, end: datetime = None) -> dict:
+    """Insere ``orders`` pedidos sintéticos nos ``days`` dias anteriores a ``end``.
+
+    Os pedidos recebem IDs explícitos (sem RETURNING por linha) e os itens
+    usam a mesma gravação em massa da importação em lote (COPY no psycopg2).
+    O rollup horário é reconstruído no final.
+    """
+    coffees = db.execute(select(Coffee).order_by(Coffee.id)).scalars().all()
+    if not coffees:
+        raise ValueError("Menu vazio: execute scripts/populate_menu.py antes")
+
+    rng = np.random.default_rng(seed)
+    end = (end or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    pending_after = end - PENDING_WINDOW
+    offsets = order_offsets(rng, orders, start, days)
+
+    coffee_ids = np.array([coffee.id for coffee in coffees])
+    weights = coffee_weights(coffees)
+    snapshots = [
+        (coffee.name, coffee.price, coffee.water_ml, coffee.milk_ml, coffee.coffee_grounds_g)
+        for coffee in coffees
+    ]
+    prices = np.array([coffee.price for coffee in coffees])
+
+    next_id = (db.execute(select(func.max(Order.id))).scalar() or 0) + 1
+    items_total = 0
+    for chunk_start in range(0, orders, batch_size):
+        chunk = offsets[chunk_start:chunk_start + batch_size]
+        size = len(chunk)
+        ids = np.arange(next_id + chunk_start, next_id + chunk_start + size)
+        created = (np.datetime64(start, "us") + chunk.astype("timedelta64[s]")).tolist()
+
+        per_order = rng.choice(ITEMS_PER_ORDER[0], size=size, p=ITEMS_PER_ORDER[1])
+        item_orders = np.repeat(np.arange(size), per_order)
+        item_coffees = rng.choice(len(coffees), size=len(item_orders), p=weights)
+        item_quantities = rng.choice(QUANTITIES[0], size=len(item_orders), p=QUANTITIES[1])
+        totals = np.bincount(item_orders, weights=prices[item_coffees] * item_quantities, minlength=size)
+
+        db.execute(insert(Order), [
+            {
+                "id": order_id,
+                "created_at": created_at,
+                "total_price": total / 100,
+                "status": ORDER_STATUS_PENDING if created_at >= pending_after else ORDER_STATUS_COMPLETED,
+            }
+            for order_id, created_at, total in zip(ids.tolist(), created, totals.tolist())
+        ])
+        item_rows = [
+            (int(ids[order]), int(coffee_ids[coffee]), quantity, *snapshots[coffee])
+            for order, coffee, quantity in zip(item_orders.tolist(), item_coffees.tolist(), item_quantities.tolist())
+        ]
+        insert_order_items(db, item_rows, batch_size)
+        db.commit()
+        items_total += len(item_rows)
+        print(f"  {chunk_start + size:>10,} pedidos / {items_total:>10,} itens")
+
+    if db.get_bind().dialect.name == "postgresql":
+        # IDs explícitos não avançam a sequência do SERIAL
+        db.execute(text("SELECT setval(pg_get_serial_sequence('orders', 'id'), (SELECT max(id) FROM orders))"))
+        db.commit()
+
+    rollup_rows = backfill_consumption_rollup(db)
+    return {"orders": orders, "items": items_total, "from": start, "to": end, "rollup_rows": rollup_rows}
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera pedidos sintéticos com perfil realista de horário e dia da semana")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    print("Criando tabelas...")
+    create_tables()
+    db = next(get_db())
+    try:
+        print(f"Gerando {args.orders:,} pedidos em {args.days} dias...")
+        started = time.perf_counter()
+        summary = generate_dataset(db, args.orders, args.days, args.seed, args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(
+            f"✅ {summary['orders']:,} pedidos e {summary['items']:,} itens de "
+            f"{summary['from']:%Y-%m-%d} a {summary['to']:%Y-%m-%d} em {elapsed:.1f}s "
+            f"({summary['orders'] / elapsed:,.0f} pedidos/s); rollup com {summary['rollup_rows']:,} linhas"
+        )
+    except Exception as e:
+        print(f"❌ Erro ao gerar dados: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
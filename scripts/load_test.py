@@ -0,0 +1,163 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+import httpx
+
+# Rota -> peso no mix padrão
+DEFAULT_MIX = {"create_order": 2, "pending": 3, "menu": 4, "consumption": 1}
+PERCENTILES = (50, 95, 99)
+
+def parse_mix(value: str) -> dict:
+    """Converte ``"create_order=2,menu=4"`` no mix de rotas"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Rota desconhecida no mix: {name} (use {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Percentil pelo método nearest-rank"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+    for percent in PERCENTILES:
+        summary[f"p{percent}_ms"] = round(percentile(values, percent) * 1000, 3)
+    return summary
+
+def create_order_request(rng: random.Random, coffee_ids: list):
+    items = [
+        {"coffee_id": coffee_id, "quantity": rng.choice((1, 1, 1, 2))}
+        for coffee_id in rng.sample(coffee_ids, k=min(len(coffee_ids), rng.choice((1, 1, 2, 3))))
+    ]
+    return "POST", "/orders/", {"items": items}
+
+# Rota do mix -> função que monta (método, caminho, corpo)
+ROUTES = {
+    "create_order": create_order_request,
+    "pending": lambda rng, coffee_ids: ("GET", "/orders/pending?limit=100", None),
+    "menu": lambda rng, coffee_ids: ("GET", "/menu/", None),
+    "consumption": lambda rng, coffee_ids: ("GET", "/orders/consumption?days=30", None),
+}
+
+async def run_load(base_url: str, mix: dict, concurrency: int, duration: float, warmup: float = 0, seed: int = 42) -> dict:
+    """Mantém ``concurrency`` requisições em voo sorteando rotas do mix"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        menu = (await client.get("/menu/all")).json()
+        coffee_ids = [coffee["id"] for coffee in menu]
+        names, weights = list(mix), list(mix.values())
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        recording = False
+
+        async def worker(index: int, deadline: float):
+            rng = random.Random(seed + index)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                method, path, body = ROUTES[name](rng, coffee_ids)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                if recording:
+                    latencies[name].append(time.perf_counter() - started)
+                    errors[name] += failed
+
+        if warmup:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(index, deadline) for index in range(concurrency)))
+
+        recording = True
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(index, deadline) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "base_url": base_url,
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "duration_s": round(elapsed, 3),
+        "concurrency": concurrency,
+        "mix": mix,
+        "routes": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report: dict, baseline: dict) -> str:
+    """Tabela com a variação de vazão e p95/p99 de cada rota em relação ao baseline"""
+    lines = [
+        f"Comparação com {baseline.get('commit') or 'baseline'}:",
+        f"{'rota':<14} | {'req/s':>16} | {'p95 ms':>18} | {'p99 ms':>18}",
+    ]
+    for name, current in {**report["routes"], "total": report["total"]}.items():
+        before = baseline["routes"].get(name) if name != "total" else baseline.get("total")
+        if not before:
+            continue
+        cells = []
+        for field in ("throughput_rps", "p95_ms", "p99_ms"):
+            change = (current[field] / before[field] - 1) * 100 if before[field] else 0.0
+            cells.append(f"{current[field]:>9.2f} ({change:+5.1f}%)")
+        lines.append(f"{name:<14} | " + " | ".join(cells))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com mix de rotas; relatório JSON por rota")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Pesos por rota, ex: create_order=2,pending=3,menu=4,consumption=1")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON do relatório (padrão: stdout)")
+    parser.add_argument("--compare", help="Relatório JSON anterior para comparação")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.base_url, args.mix, args.concurrency, args.duration, args.warmup, args.seed))
+    body = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(body + "\n")
+        print(f"Relatório gravado em {args.output}")
+    else:
+        print(body)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            print(compare(report, json.load(file)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
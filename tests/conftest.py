@@ -8,9 +8,11 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_read_db, Base
 from app.models.coffee import Coffee
 from app.models.order import Order, OrderItem
+from app.query_recorder import QueryRecorder
+from app.services.coffee_service import invalidate_menu_cache
 
 
 # Database de teste em memória
@@ -34,12 +36,14 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 @pytest.fixture(scope="function")
 def db_session():
     """Fixture para sessão de database de teste"""
     Base.metadata.create_all(bind=engine)
+    invalidate_menu_cache()
     db = TestingSessionLocal()
     try:
         yield db
@@ -54,6 +58,12 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(scope="function")
+def query_recorder(db_session):
+    """Fixture que registra as consultas ao banco de teste dentro de um ``with``"""
+    return QueryRecorder(engine)
+
+
 @pytest.fixture(scope="function")
 def sample_coffees(db_session):
     """Fixture com cafés de exemplo para testes"""
@@ -0,0 +1,143 @@
+"""
+Testes unitários para o controle de admissão (rate limit e concorrência)
+"""
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import config
+from app.middleware import AdmissionControlMiddleware, Budget, TokenBuckets
+
+BUDGETS = {
+    "menu": {"rate": 10, "burst": 3, "concurrency": 0},
+    "expensive": {"rate": 0.5, "burst": 1, "concurrency": 1},
+    "default": {"rate": 100, "burst": 100, "concurrency": 0},
+}
+ROUTES = {"/menu": "menu", "/orders/consumption": "expensive", "/": "default"}
+
+
+class FakeClock:
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def build_app(clock=None, release=None):
+    """App mínimo com rotas de cada orçamento atrás do middleware"""
+    app = FastAPI()
+
+    @app.get("/menu/")
+    async def menu():
+        return []
+
+    @app.get("/orders/consumption")
+    async def consumption():
+        if release is not None:
+            await release.wait()
+        return {}
+
+    @app.get("/orders/stream")
+    async def stream():
+        return {}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        budgets=BUDGETS,
+        routes=ROUTES,
+        exempt=["/orders/stream"],
+        client_header="X-Terminal-Id",
+        clock=clock or FakeClock(),
+    )
+    return app
+
+
+class TestAdmissionControl:
+    """Testes para AdmissionControlMiddleware"""
+
+    def test_rate_limit_per_client(self):
+        """Testa 429 com Retry-After ao esgotar a rajada e a reposição dos tokens"""
+        clock = FakeClock()
+        client = TestClient(build_app(clock))
+        terminal = {"X-Terminal-Id": "pos-1"}
+
+        assert [client.get("/menu/", headers=terminal).status_code for _ in range(3)] == [200] * 3
+        rejected = client.get("/menu/", headers=terminal)
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "1"
+        assert "detail" in rejected.json()
+
+        # Outro terminal tem o seu próprio bucket
+        assert client.get("/menu/", headers={"X-Terminal-Id": "pos-2"}).status_code == 200
+
+        clock.now += 0.1  # Um token reposto (10/s)
+        assert client.get("/menu/", headers=terminal).status_code == 200
+        assert client.get("/menu/", headers=terminal).status_code == 429
+
+    def test_budgets_are_independent(self):
+        """Testa que esgotar o orçamento caro não afeta o menu"""
+        client = TestClient(build_app())
+        terminal = {"X-Terminal-Id": "pos-1"}
+
+        assert client.get("/orders/consumption", headers=terminal).status_code == 200
+        rejected = client.get("/orders/consumption", headers=terminal)
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "2"  # 0.5 token/s
+        assert client.get("/menu/", headers=terminal).status_code == 200
+
+    def test_exempt_routes(self):
+        """Testa que rotas isentas e fora do mapa não passam pelo limite"""
+        client = TestClient(build_app())
+
+        assert all(client.get("/orders/stream").status_code == 200 for _ in range(20))
+        assert client.get("/inexistente").status_code == 404
+
+    def test_concurrency_limit(self):
+        """Testa 503 quando o orçamento já tem requisições em voo no worker"""
+        async def scenario():
+            release = asyncio.Event()
+            transport = httpx.ASGITransport(app=build_app(release=release))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = asyncio.ensure_future(
+                    client.get("/orders/consumption", headers={"X-Terminal-Id": "pos-1"})
+                )
+                await asyncio.sleep(0.05)
+                shed = await client.get("/orders/consumption", headers={"X-Terminal-Id": "pos-2"})
+                release.set()
+                return (await first).status_code, shed
+
+        first_status, shed = asyncio.run(scenario())
+        assert first_status == 200
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "1"
+
+    def test_token_buckets_evict_oldest_clients(self):
+        """Testa o limite de clientes acompanhados por worker"""
+        clock = FakeClock()
+        buckets = TokenBuckets(max_clients=2, clock=clock)
+        budget = Budget(name="menu", rate=1, burst=1)
+
+        assert buckets.take(budget, "a") is None
+        assert buckets.take(budget, "a") == 1.0
+        buckets.take(budget, "b")
+        buckets.take(budget, "c")  # Descarta "a"
+
+        assert buckets.take(budget, "a") is None
+
+    def test_routes_from_environment(self, monkeypatch):
+        """Testa RATE_LIMIT_ROUTES sobrescrevendo e acrescentando prefixos aos padrões"""
+        defaults = {"/menu": "menu", "/": "default"}
+        monkeypatch.setenv("RATE_LIMIT_ROUTES", " /menu=default, /orders/pending=expensive ,")
+
+        assert config._routes(defaults, BUDGETS) == {
+            "/menu": "default", "/": "default", "/orders/pending": "expensive",
+        }
+
+        for invalid in ("/orders/pending=inexistente", "orders=menu", "/orders"):
+            monkeypatch.setenv("RATE_LIMIT_ROUTES", invalid)
+            with pytest.raises(ValueError, match="RATE_LIMIT_ROUTES"):
+                config._routes(defaults, BUDGETS)
@@ -0,0 +1,162 @@
+"""
+Testes unitários para o arquivamento de pedidos concluídos
+"""
+import json
+from datetime import datetime, timedelta
+
+from app.models.archive import OrderArchive, OrderItemArchive
+from app.models.consumption import ConsumptionHourly
+from app.models.order import Order, OrderItem
+from app.schemas.order import OrderBulkEntry, OrderItemCreate
+from app.services.archive_service import archive_completed_orders, order_sources
+from app.services.order_service import (
+    create_orders_bulk,
+    export_orders,
+    get_consumption_analysis,
+    get_sales_series,
+    order_export_range,
+    transition_orders
+)
+from app.services.rollup_service import backfill_consumption_rollup
+
+# Pedidos antigos (sempre fora da retenção) com horários fora da hora cheia
+OLD_ORDERS = [datetime(2025, 3, 10, 8, 40), datetime(2025, 3, 10, 9, 15), datetime(2025, 3, 11, 7, 5)]
+
+
+def add_orders(db_session):
+    """Três pedidos antigos concluídos, um antigo pendente e um recente concluído"""
+    recent = datetime.utcnow() - timedelta(hours=2)
+    results = create_orders_bulk(db_session, [
+        OrderBulkEntry(created_at=OLD_ORDERS[0], items=[
+            OrderItemCreate(coffee_id=11, quantity=2),
+            OrderItemCreate(coffee_id=13, quantity=1)
+        ]),
+        OrderBulkEntry(created_at=OLD_ORDERS[1], items=[OrderItemCreate(coffee_id=11, quantity=1)]),
+        OrderBulkEntry(created_at=OLD_ORDERS[2], items=[OrderItemCreate(coffee_id=14, quantity=1)]),
+        OrderBulkEntry(created_at=datetime(2025, 3, 11, 7, 30), items=[OrderItemCreate(coffee_id=15, quantity=1)]),
+        OrderBulkEntry(created_at=recent, items=[OrderItemCreate(coffee_id=12, quantity=1)]),
+    ])
+    ids = [result["id"] for result in results]
+    transition_orders(db_session, ids[:3] + ids[4:], "completed")
+    return ids
+
+
+def export_lines(db_session, start, end):
+    start, end = order_export_range(start, end)
+    body = b"".join(export_orders(db_session, start, end))
+    return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+class TestArchiveService:
+    """Testes para o job de arquivamento e as leituras sobre o arquivo"""
+
+    def test_archives_only_old_completed_orders(self, db_session, sample_coffees):
+        """Testa que só pedidos concluídos fora da retenção saem das tabelas quentes"""
+        ids = add_orders(db_session)
+
+        summary = archive_completed_orders(db_session, batch_size=2)
+
+        assert summary["orders"] == 3
+        assert summary["items"] == 4
+        assert summary["batches"] == 2
+        assert sorted(row.id for row in db_session.query(Order)) == [ids[3], ids[4]]
+        assert sorted(row.id for row in db_session.query(OrderArchive)) == ids[:3]
+        assert db_session.query(OrderItem).filter(OrderItem.order_id.in_(ids[:3])).count() == 0
+        assert db_session.query(OrderItemArchive).count() == 4
+
+        # Sem pedidos restantes, o job não faz nada
+        assert archive_completed_orders(db_session)["orders"] == 0
+
+    def test_max_batches_limits_each_run(self, db_session, sample_coffees):
+        """Testa que ``max_batches`` interrompe o job entre lotes"""
+        add_orders(db_session)
+
+        assert archive_completed_orders(db_session, batch_size=1, max_batches=2)["orders"] == 2
+        assert archive_completed_orders(db_session, batch_size=1)["orders"] == 1
+
+    def test_keeps_highest_order_id_in_hot_table(self, db_session, sample_coffees):
+        """Testa que o pedido de maior ID não é arquivado (IDs não são reaproveitados)"""
+        results = create_orders_bulk(db_session, [
+            OrderBulkEntry(created_at=created_at, items=[OrderItemCreate(coffee_id=11, quantity=1)])
+            for created_at in OLD_ORDERS
+        ])
+        ids = [result["id"] for result in results]
+        transition_orders(db_session, ids, "completed")
+
+        assert archive_completed_orders(db_session)["orders"] == 2
+        assert [row.id for row in db_session.query(Order)] == [max(ids)]
+
+    def test_item_ids_are_not_reused_between_runs(self, db_session, sample_coffees):
+        """Testa dois arquivamentos com o pedido mais novo sem itens (sem colisão de IDs de itens)"""
+        def add_old_completed(*moments):
+            results = create_orders_bulk(db_session, [
+                OrderBulkEntry(created_at=moment, items=[OrderItemCreate(coffee_id=11, quantity=1)])
+                for moment in moments
+            ])
+            transition_orders(db_session, [result["id"] for result in results], "completed")
+
+        def add_empty_order():
+            db_session.add(Order(created_at=datetime.utcnow(), total_price=0, status="pending"))
+            db_session.commit()
+
+        add_old_completed(*OLD_ORDERS[:2])
+        add_empty_order()
+        archive_completed_orders(db_session)
+        add_old_completed(OLD_ORDERS[2])
+        add_empty_order()
+        archive_completed_orders(db_session)
+
+        hot = [item.id for item in db_session.query(OrderItem)]
+        archived = [item.id for item in db_session.query(OrderItemArchive)]
+        assert len(hot) + len(archived) == 3
+        assert not set(hot) & set(archived)
+        assert archived
+
+    def test_reads_match_before_and_after_archival(self, db_session, sample_coffees):
+        """Testa que export, série de vendas e consumo leem o arquivo de forma transparente"""
+        add_orders(db_session)
+        days = (datetime.utcnow() - datetime(2025, 3, 1)).days
+        start, end = datetime(2025, 3, 10, 8, 30), datetime(2025, 3, 11, 7, 10)
+
+        before = (
+            export_lines(db_session, datetime(2025, 3, 1), datetime.utcnow()),
+            get_sales_series(db_session, "hour", start, end),
+            get_consumption_analysis(db_session, days),
+        )
+        archive_completed_orders(db_session)
+        after = (
+            export_lines(db_session, datetime(2025, 3, 1), datetime.utcnow()),
+            get_sales_series(db_session, "hour", start, end),
+            get_consumption_analysis(db_session, days),
+        )
+
+        assert after == before
+        assert [order["created_at"] for order in after[0][:3]] == [moment.isoformat() for moment in OLD_ORDERS]
+        assert after[1]["columns"]["cups"] == [2, 1, 1, 1]
+
+    def test_recent_ranges_skip_archive(self, db_session, sample_coffees, query_recorder):
+        """Testa que períodos dentro da retenção não consultam as tabelas de arquivo"""
+        now = datetime.utcnow()
+        assert len(order_sources(now - timedelta(days=1), now)) == 1
+        assert len(order_sources(now - timedelta(days=365 * 5), now)) == 2
+
+        with query_recorder:
+            get_consumption_analysis(db_session, 7)
+            export_lines(db_session, now - timedelta(days=1), now)
+            get_sales_series(db_session, "day", now - timedelta(days=30, minutes=30), now)
+        assert not any("_archive" in statement for statement in query_recorder.statements)
+
+    def test_backfill_includes_archived_orders(self, db_session, sample_coffees):
+        """Testa que a reconstrução do rollup considera os pedidos arquivados"""
+        add_orders(db_session)
+        archive_completed_orders(db_session)
+
+        def rollup():
+            return sorted(
+                (row.bucket, row.coffee_id, row.cups, row.revenue_cents)
+                for row in db_session.query(ConsumptionHourly)
+            )
+
+        incremental = rollup()
+        backfill_consumption_rollup(db_session)
+        assert rollup() == incremental
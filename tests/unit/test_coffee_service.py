@@ -1,10 +1,20 @@
 """
 Testes unitários para o serviço de café
 """
+import json
 import pytest
+from datetime import datetime
 from unittest.mock import Mock, patch
-from app.services.coffee_service import get_all_coffees, get_menu_with_prices
+from app import serialization
+from app.services.coffee_service import (
+    create_coffee,
+    get_all_coffees,
+    get_cached_menu,
+    get_menu_with_prices,
+    invalidate_menu_cache
+)
 from app.models.coffee import Coffee
+from app.schemas.coffee import CoffeeCreate
 
 
 class TestCoffeeService:
@@ -83,3 +93,69 @@ class TestCoffeeService:
         assert americano["price"] == 3.5  # 350 centavos = R$ 3,50
 
 
+    
+    def test_get_cached_menu_serves_without_database(self, db_session, sample_coffees, query_recorder):
+        """Testa que o menu em cache é servido sem consultar o banco"""
+        first = get_cached_menu(db_session, "menu")
+        
+        with query_recorder:
+            second = get_cached_menu(db_session, "menu")
+        
+        assert second is first
+        assert query_recorder.count == 0
+        assert json.loads(first.body) == get_menu_with_prices(db_session)
+    
+    def test_create_coffee_invalidates_menu_cache(self, db_session, sample_coffees):
+        """Testa que criar um café invalida o menu em cache"""
+        before = get_cached_menu(db_session, "all")
+        
+        create_coffee(db_session, CoffeeCreate(
+            name="Mocha", price=600, water_ml=30, milk_ml=100, coffee_grounds_g=15
+        ))
+        after = get_cached_menu(db_session, "all")
+        
+        assert after.etag != before.etag
+        assert len(json.loads(after.body)) == 6
+    
+    def test_menu_endpoints_etag_not_modified(self, db_session, sample_coffees, client):
+        """Testa ETag e If-None-Match → 304 nas rotas do menu"""
+        for path in ("/menu/", "/menu/all"):
+            response = client.get(path)
+            assert response.status_code == 200
+            etag = response.headers["etag"]
+            
+            not_modified = client.get(path, headers={"If-None-Match": etag})
+            assert not_modified.status_code == 304
+            assert not_modified.headers["etag"] == etag
+            assert not_modified.content == b""
+            
+            stale = client.get(path, headers={"If-None-Match": '"outro"'})
+            assert stale.status_code == 200
+            assert stale.content == response.content
+    
+    def test_menu_all_response_shape(self, db_session, sample_coffees, client):
+        """Testa que /menu/all mantém o formato do CoffeeResponse"""
+        response = client.get("/menu/all")
+        
+        expresso = next(item for item in response.json() if item["name"] == "Expresso")
+        assert expresso == {
+            "id": 11,
+            "name": "Expresso",
+            "price": 200.0,
+            "water_ml": 50,
+            "milk_ml": 0,
+            "coffee_grounds_g": 15
+        }
+    
+    def test_menu_body_without_orjson(self, db_session, sample_coffees, monkeypatch):
+        """Testa que o fallback para o json padrão gera o mesmo conteúdo"""
+        with_orjson = get_cached_menu(db_session, "menu").body
+        
+        monkeypatch.setattr(serialization, "orjson", None)
+        invalidate_menu_cache()
+        without_orjson = get_cached_menu(db_session, "menu").body
+        
+        assert json.loads(without_orjson) == json.loads(with_orjson)
+        assert serialization.dumps({"criado": datetime(2025, 9, 18, 17, 39, 33)}) == (
+            b'{"criado":"2025-09-18T17:39:33"}'
+        )
@@ -0,0 +1,62 @@
+"""
+Testes unitários para o gerador de dados sintéticos e o relatório do teste de carga
+"""
+from datetime import datetime
+from sqlalchemy import func
+
+from app.models.consumption import ConsumptionHourly
+from app.models.order import Order, OrderItem
+from scripts.generate_dataset import HOUR_WEIGHTS, generate_dataset
+from scripts.load_test import parse_mix, percentile, summarize
+
+END = datetime(2025, 9, 18, 15)
+
+
+class TestDatasetGenerator:
+    """Testes para scripts/generate_dataset.py e scripts/load_test.py"""
+
+    def test_generated_orders_are_consistent(self, db_session, sample_coffees):
+        """Testa totais, snapshot dos itens, horários e o rollup reconstruído"""
+        summary = generate_dataset(db_session, orders=3000, days=14, seed=7, batch_size=1000, end=END)
+
+        assert db_session.query(Order).count() == 3000
+        assert db_session.query(OrderItem).count() == summary["items"]
+        assert summary["from"] == datetime(2025, 9, 4, 15)
+
+        orders = db_session.query(Order).all()
+        assert all(summary["from"] <= order.created_at < END for order in orders)
+        closed_hours = {hour for hour, weight in enumerate(HOUR_WEIGHTS) if weight == 0}
+        assert not any(order.created_at.hour in closed_hours for order in orders)
+
+        # Preço total do pedido igual à soma do snapshot dos itens
+        item_totals = dict(
+            db_session.query(OrderItem.order_id, func.sum(OrderItem.unit_price_cents * OrderItem.quantity))
+            .group_by(OrderItem.order_id)
+        )
+        assert all(round(order.total_price * 100) == item_totals[order.id] for order in orders)
+
+        cups = db_session.query(func.sum(OrderItem.quantity)).scalar()
+        assert db_session.query(func.sum(ConsumptionHourly.cups)).scalar() == cups
+
+    def test_generation_is_deterministic_and_appends(self, db_session, sample_coffees):
+        """Testa que a mesma seed gera o mesmo perfil e que novos pedidos continuam os IDs"""
+        first = generate_dataset(db_session, orders=200, days=3, seed=1, end=END)
+        second = generate_dataset(db_session, orders=200, days=3, seed=1, end=END)
+
+        assert first["items"] == second["items"]
+        ids = [order_id for (order_id,) in db_session.query(Order.id).order_by(Order.id)]
+        assert ids == list(range(1, 401))
+
+    def test_load_report_helpers(self):
+        """Testa os percentis e o mix de rotas do teste de carga"""
+        values = [value / 1000 for value in range(1, 101)]
+        assert percentile(values, 50) == 0.05
+        assert percentile(values, 99) == 0.099
+        assert percentile([], 95) == 0.0
+
+        summary = summarize(values, errors=2, elapsed=10)
+        assert summary["requests"] == 100
+        assert summary["throughput_rps"] == 10.0
+        assert summary["p95_ms"] == 95.0
+
+        assert parse_mix("menu=4,pending") == {"menu": 4.0, "pending": 1.0}
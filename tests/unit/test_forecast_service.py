@@ -0,0 +1,80 @@
+"""
+Testes unitários para a previsão de consumo
+"""
+import pytest
+from datetime import datetime, timedelta
+from app.models.consumption import ConsumptionHourly
+from app.services.forecast_service import get_consumption_forecast
+
+NOW = datetime(2025, 9, 18, 15, 30)  # Quinta-feira
+TODAY = datetime(2025, 9, 18)
+
+
+class TestForecastService:
+    """Testes para a previsão de consumo a partir do rollup horário"""
+
+    def _add_history(self, db_session, days, cups_for_day):
+        """Uma venda de Expresso às 8h de cada dia, com ``cups_for_day(dia)`` xícaras"""
+        for offset in range(days, 0, -1):
+            day = TODAY - timedelta(days=offset)
+            cups = cups_for_day(day)
+            if cups:
+                db_session.add(ConsumptionHourly(
+                    bucket=day.replace(hour=8), coffee_id=11, cups=cups,
+                    water_ml=50 * cups, milk_ml=0, coffee_grounds_g=15 * cups,
+                    revenue_cents=200 * cups
+                ))
+        db_session.commit()
+
+    def test_forecast_stable_history(self, db_session, sample_coffees):
+        """Testa que um histórico constante é projetado sem banda"""
+        self._add_history(db_session, 28, lambda day: 10)
+
+        forecast = get_consumption_forecast(db_session, days=2, history_days=28, now=NOW)
+
+        assert [day["date"] for day in forecast["forecast"]] == ["2025-09-19", "2025-09-20"]
+        friday = forecast["forecast"][0]
+        assert friday["cups"] == {"expected": 10.0, "lower": 10.0, "upper": 10.0}
+        assert friday["water_ml"]["expected"] == 500.0
+        assert friday["milk_ml"]["expected"] == 0.0
+        assert forecast["totals"]["coffee_grounds_g"] == 300.0
+
+    def test_forecast_weekday_seasonality(self, db_session, sample_coffees):
+        """Testa o perfil por dia da semana (sábados com o dobro de vendas)"""
+        self._add_history(db_session, 28, lambda day: 20 if day.weekday() == 5 else 10)
+
+        forecast = get_consumption_forecast(db_session, days=2, history_days=28, now=NOW)
+        friday, saturday = forecast["forecast"]
+
+        assert saturday["cups"]["expected"] == pytest.approx(2 * friday["cups"]["expected"], rel=0.01)
+
+    def test_forecast_follows_recent_trend(self, db_session, sample_coffees):
+        """Testa que a suavização exponencial puxa a previsão para os dias recentes"""
+        self._add_history(db_session, 28, lambda day: 20 if day >= TODAY - timedelta(days=7) else 5)
+
+        forecast = get_consumption_forecast(db_session, days=1, history_days=28, now=NOW)
+        cups = forecast["forecast"][0]["cups"]
+
+        assert cups["expected"] > 15
+        assert cups["lower"] < cups["expected"] < cups["upper"]
+
+    def test_forecast_without_history(self, db_session, sample_coffees):
+        """Testa a previsão com o rollup vazio"""
+        forecast = get_consumption_forecast(db_session, days=3, history_days=7, now=NOW)
+
+        assert len(forecast["forecast"]) == 3
+        assert forecast["totals"] == {"cups": 0.0, "water_ml": 0.0, "milk_ml": 0.0, "coffee_grounds_g": 0.0}
+
+    def test_forecast_endpoint(self, db_session, sample_coffees, client):
+        """Testa GET /orders/consumption/forecast e seus limites"""
+        client.post("/orders/", json={"items": [{"coffee_id": 13, "quantity": 2}]})
+
+        response = client.get("/orders/consumption/forecast?days=3")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["history_days"] == 28
+        assert len(body["forecast"]) == 3
+        assert set(body["forecast"][0]) == {"date", "cups", "water_ml", "milk_ml", "coffee_grounds_g"}
+
+        assert client.get("/orders/consumption/forecast?days=31").status_code == 422
+        assert client.get("/orders/consumption/forecast?history_days=400").status_code == 422
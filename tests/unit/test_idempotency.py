@@ -0,0 +1,228 @@
+"""
+Testes unitários para as chaves de idempotência de POST /orders/
+"""
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta
+
+from app.api import order as order_api
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+from app.models.order import Order
+from app.services import idempotency
+from app.services.idempotency import (
+    ABANDONED_CLAIM_SECONDS,
+    DatabaseIdempotencyStore,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    MemoryIdempotencyStore
+)
+
+ORDER = {"items": [{"coffee_id": 11, "quantity": 2}]}
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, monkeypatch):
+    """Store de cada backend, usado também pela rota de pedidos"""
+    store = MemoryIdempotencyStore() if request.param == "memory" else DatabaseIdempotencyStore()
+    monkeypatch.setattr(order_api, "idempotency_store", store)
+    return store
+
+
+class TestIdempotency:
+    """Testes para Idempotency-Key em POST /orders/"""
+
+    def test_replay_returns_original_order(self, db_session, sample_coffees, client, store):
+        """Testa que a repetição devolve o pedido original sem criar outro"""
+        headers = {"Idempotency-Key": "pos-1-0001"}
+        first = client.post("/orders/", json=ORDER, headers=headers)
+        second = client.post("/orders/", json=ORDER, headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert db_session.query(Order).count() == 1
+
+        other = client.post("/orders/", json=ORDER, headers={"Idempotency-Key": "pos-1-0002"})
+        assert other.json()["id"] != first.json()["id"]
+        assert db_session.query(Order).count() == 2
+
+    def test_key_reused_with_different_order(self, db_session, sample_coffees, client, store):
+        """Testa 422 quando a mesma chave chega com outro corpo"""
+        headers = {"Idempotency-Key": "pos-1-0003"}
+        client.post("/orders/", json=ORDER, headers=headers)
+
+        response = client.post("/orders/", json={"items": [{"coffee_id": 13, "quantity": 1}]}, headers=headers)
+
+        assert response.status_code == 422
+        assert "Idempotency-Key" in response.json()["detail"]
+
+    def test_failed_request_releases_key(self, db_session, sample_coffees, client, store):
+        """Testa que erros de validação não ficam gravados para a chave"""
+        headers = {"Idempotency-Key": "pos-1-0004"}
+        invalid = client.post("/orders/", json={"items": [{"coffee_id": 999, "quantity": 1}]}, headers=headers)
+        assert invalid.status_code == 400
+
+        valid = client.post("/orders/", json=ORDER, headers=headers)
+        assert valid.status_code == 200
+        assert "idempotent-replayed" not in valid.headers
+
+    def test_concurrent_requests_are_coalesced(self, db_session, store):
+        """Testa que uma repetição em andamento espera e recebe a mesma resposta"""
+        async def scenario():
+            assert await store.begin(db_session, "k", "f") is None
+            waiting = asyncio.ensure_future(store.begin(db_session, "k", "f"))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            await store.complete(db_session, "k", {"id": 7})
+            return await asyncio.wait_for(waiting, timeout=1)
+
+        assert asyncio.run(scenario()) == {"id": 7}
+        with pytest.raises(IdempotencyKeyReused):
+            asyncio.run(store.begin(db_session, "k", "outro"))
+
+    def test_memory_store_waiters_are_woken(self, monkeypatch):
+        """Testa que repetições em memória esperam o fim da original sem verificações periódicas"""
+        store = MemoryIdempotencyStore()
+        claims = []
+        claim = store._claim
+
+        async def counting_claim(db, key, fingerprint):
+            claims.append(key)
+            return await claim(db, key, fingerprint)
+
+        monkeypatch.setattr(store, "_claim", counting_claim)
+
+        async def scenario():
+            await store.begin(None, "k", "f")
+            waiting = asyncio.ensure_future(store.begin(None, "k", "f"))
+            await asyncio.sleep(0.1)
+            # Com a original liberada a repetição reserva a chave
+            await store.release(None, "k")
+            return await asyncio.wait_for(waiting, timeout=1)
+
+        assert asyncio.run(scenario()) is None
+        assert claims == ["k", "k", "k"]
+        assert store._waiters == {}
+
+    def test_database_store_polls_with_backoff(self, db_session, monkeypatch):
+        """Testa que a espera no banco aumenta o intervalo entre as verificações"""
+        monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.5)
+        store = DatabaseIdempotencyStore()
+        asyncio.run(store.begin(db_session, "lento", "f"))
+        claims = []
+        claim = store._claim
+
+        async def counting_claim(db, key, fingerprint):
+            claims.append(key)
+            return await claim(db, key, fingerprint)
+
+        monkeypatch.setattr(store, "_claim", counting_claim)
+        with pytest.raises(IdempotencyKeyInProgress):
+            asyncio.run(store.begin(db_session, "lento", "f"))
+
+        # 20, 40, 80, 160 ms e o restante: bem menos que 25 verificações a cada 20 ms
+        assert len(claims) <= 7
+
+    def test_in_progress_timeout(self, db_session, store, monkeypatch):
+        """Testa o erro quando a requisição original não termina a tempo"""
+        monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+        asyncio.run(store.begin(db_session, "lento", "f"))
+
+        with pytest.raises(IdempotencyKeyInProgress):
+            asyncio.run(store.begin(db_session, "lento", "f"))
+
+    def test_memory_store_evicts_least_recently_used(self):
+        """Testa o limite de chaves do backend em memória"""
+        store = MemoryIdempotencyStore(max_keys=2)
+
+        async def scenario():
+            for key in ("a", "b"):
+                await store.begin(None, key, "f")
+                await store.complete(None, key, {"key": key})
+            await store.begin(None, "a", "f")  # "a" passa a ser a mais recente
+            await store.begin(None, "c", "f")
+            return await store.begin(None, "a", "f"), await store.begin(None, "b", "f")
+
+        replay_a, replay_b = asyncio.run(scenario())
+        assert replay_a == {"key": "a"}
+        assert replay_b is None  # "b" foi descartada e pôde ser reservada de novo
+
+    def test_memory_store_keeps_in_flight_claims_when_full(self):
+        """Testa que o limite de chaves não descarta uma reserva em andamento"""
+        store = MemoryIdempotencyStore(max_keys=2)
+
+        async def scenario():
+            await store.begin(None, "pendente", "f")
+            for key in ("a", "b", "c"):
+                await store.begin(None, key, "f")
+                await store.complete(None, key, {"key": key})
+            with pytest.raises(IdempotencyKeyReused):
+                await store.begin(None, "pendente", "outro")
+            await store.complete(None, "pendente", {"key": "pendente"})
+            return await store.begin(None, "pendente", "f"), await store.begin(None, "b", "f")
+
+        replay_pending, replay_b = asyncio.run(scenario())
+        assert replay_pending == {"key": "pendente"}
+        assert replay_b is None
+
+    def test_memory_store_abandoned_claim_expires(self, monkeypatch):
+        """Testa que uma reserva sem resposta expira antes do TTL das respostas"""
+        store = MemoryIdempotencyStore(ttl_seconds=86400)
+        now = time.monotonic()
+        asyncio.run(store.begin(None, "abandonada", "f"))
+
+        monkeypatch.setattr(idempotency.time, "monotonic", lambda: now + ABANDONED_CLAIM_SECONDS + 1)
+        assert asyncio.run(store.begin(None, "abandonada", "f")) is None
+
+    def test_database_store_shared_between_workers(self, db_session):
+        """Testa que dois stores de banco (workers diferentes) veem a mesma chave"""
+        first_worker = DatabaseIdempotencyStore()
+        second_worker = DatabaseIdempotencyStore()
+
+        async def scenario():
+            await first_worker.begin(db_session, "k", "f")
+            await first_worker.complete(db_session, "k", {"id": 1})
+            return await second_worker.begin(db_session, "k", "f")
+
+        assert asyncio.run(scenario()) == {"id": 1}
+
+    def test_database_store_expired_and_abandoned_keys(self, db_session):
+        """Testa a retomada de reservas abandonadas e a limpeza das expiradas"""
+        old = datetime.utcnow() - timedelta(days=2)
+        db_session.add_all([
+            IdempotencyKey(key="abandonada", fingerprint="f", response=None, created_at=old),
+            IdempotencyKey(key="expirada", fingerprint="f", response='{"id": 1}', created_at=old),
+        ])
+        db_session.commit()
+        store = DatabaseIdempotencyStore(ttl_seconds=3600)
+
+        assert asyncio.run(store.begin(db_session, "abandonada", "f")) is None
+        assert db_session.query(IdempotencyKey).filter(IdempotencyKey.key == "expirada").count() == 0
+
+    def test_database_store_cleanup_is_throttled(self, db_session, query_recorder):
+        """Testa que a limpeza global roda no máximo uma vez por intervalo"""
+        old = datetime.utcnow() - timedelta(days=2)
+        store = DatabaseIdempotencyStore(ttl_seconds=3600, cleanup_interval=300)
+
+        def purges():
+            purge = "DELETE FROM idempotency_keys WHERE idempotency_keys.created_at < ?"
+            return [statement for statement in query_recorder.statements if statement == purge]
+
+        with query_recorder:
+            asyncio.run(store.begin(db_session, "primeira", "f"))
+            db_session.add_all([
+                IdempotencyKey(key="expirada", fingerprint="f", response='{"id": 1}', created_at=old),
+                IdempotencyKey(key="vencida", fingerprint="f", response='{"id": 2}', created_at=old),
+            ])
+            db_session.commit()
+            asyncio.run(store.begin(db_session, "segunda", "f"))
+            # A própria chave vencida é retomada sem esperar a limpeza
+            assert asyncio.run(store.begin(db_session, "vencida", "f")) is None
+
+        assert len(purges()) == 1
+        assert db_session.query(IdempotencyKey).filter(IdempotencyKey.key == "expirada").count() == 1
+        assert store.purge_expired(db_session) == 1
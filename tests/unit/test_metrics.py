@@ -0,0 +1,101 @@
+"""
+Testes unitários para o registro de métricas e o endpoint /metrics
+"""
+import threading
+import pytest
+from sqlalchemy import text
+from app import metrics
+from app.metrics import Counter, MetricsRegistry
+
+
+def sample_value(text, line_prefix):
+    """Valor da amostra cuja linha começa com ``line_prefix`` (0 se ausente)"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class TestMetricsRegistry:
+    """Testes para contadores, histogramas e o formato de exposição"""
+
+    def test_counter_sums_thread_shards(self):
+        """Testa que incrementos de várias threads são somados na coleta"""
+        counter = Counter("jobs_total", "Jobs", ("kind",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(("a",))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc(("b",), 2.5)
+
+        assert counter.collect() == {("a",): 4000, ("b",): 2.5}
+
+    def test_histogram_exposition(self):
+        """Testa buckets acumulados, soma e contagem no formato texto"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latência", ("route",), buckets=(0.1, 1))
+        histogram.observe(0.05, ("/a",))
+        histogram.observe(0.5, ("/a",))
+        histogram.observe(3, ("/a",))
+
+        assert registry.render().splitlines() == [
+            "# HELP latency_seconds Latência",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{route="/a",le="0.1"} 1',
+            'latency_seconds_bucket{route="/a",le="1"} 2',
+            'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+            'latency_seconds_sum{route="/a"} 3.55',
+            'latency_seconds_count{route="/a"} 3',
+        ]
+
+    def test_label_escaping_and_duplicates(self):
+        """Testa o escape dos valores de label e o registro duplicado"""
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits", ("path",)).inc(('a"b\\c',))
+
+        assert 'hits_total{path="a\\"b\\\\c"} 1' in registry.render()
+        with pytest.raises(ValueError):
+            registry.counter("hits_total", "Hits")
+
+    def test_metrics_endpoint(self, db_session, sample_coffees, client):
+        """Testa /metrics com rotas por template, consultas ao banco e pedidos criados"""
+        before = client.get("/metrics").text
+
+        order = client.post("/orders/", json={"items": [{"coffee_id": 11, "quantity": 1}]}).json()
+        client.patch(f"/orders/{order['id']}/status", json={"status": "completed"})
+        client.get("/nao-existe")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        after = response.text
+
+        def delta(prefix):
+            return sample_value(after, prefix) - sample_value(before, prefix)
+
+        assert delta('http_requests_total{method="POST",route="/orders/",status="200"}') == 1
+        assert delta('http_requests_total{method="PATCH",route="/orders/{order_id}/status",status="200"}') == 1
+        assert delta('http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+        assert delta('http_request_duration_seconds_count{method="POST",route="/orders/"}') == 1
+        assert delta('http_request_db_queries_sum{method="POST",route="/orders/"}') >= 2
+        assert delta('orders_created_total{source="pos"}') == 1
+        assert 'db_pool_connections{pool="primary"' in after
+
+    def test_db_usage_only_inside_request(self, db_session):
+        """Testa que só as consultas dentro do contexto da requisição são contadas"""
+        metrics.track_db_queries()
+        usage, token = metrics.start_request_db_usage()
+        try:
+            db_session.execute(text("SELECT 1"))
+        finally:
+            metrics.stop_request_db_usage(token)
+        db_session.execute(text("SELECT 1"))
+
+        assert usage[0] == 1
+        assert usage[1] > 0
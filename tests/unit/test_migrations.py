@@ -0,0 +1,188 @@
+"""
+Testes das migrations e do uso de índices pelas consultas dos serviços
+"""
+import re
+import pytest
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base, create_tables
+from app.query_recorder import QueryRecorder
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order_service import (
+    create_order,
+    get_consumption_analysis,
+    get_pending_orders,
+    get_sales_series
+)
+
+
+@pytest.fixture(scope="function")
+def migrated_engine(tmp_path):
+    """Engine de um banco SQLite novo criado apenas pelas migrations"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    create_tables(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def explain_plans(db_session, fn, *args, **kwargs):
+    """Executa a função de serviço e retorna o EXPLAIN QUERY PLAN de cada SELECT emitido"""
+    with QueryRecorder(db_session.get_bind(), capture_call_sites=False) as recorder:
+        fn(db_session, *args, **kwargs)
+    
+    plans = []
+    connection = db_session.connection()
+    for statement, parameters, executemany, _ in recorder.selects():
+        if executemany:
+            continue
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+def full_scans(plans, tables=("orders", "order_items", "consumption_hourly")):
+    """Lista as linhas de plano que varrem uma das tabelas sem usar índice"""
+    pattern = re.compile(r"^SCAN (%s)\b" % "|".join(tables))
+    return [
+        detail
+        for _, details in plans
+        for detail in details
+        if pattern.match(detail) and "INDEX" not in detail
+    ]
+
+
+class TestMigrations:
+    """Testes para o conjunto de migrations"""
+    
+    def test_migrations_match_models(self, migrated_engine):
+        """Testa que as migrations produzem o mesmo esquema dos modelos"""
+        with migrated_engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        
+        assert diff == []
+    
+    def test_hot_path_indexes_created(self, migrated_engine):
+        """Testa a criação dos índices das consultas quentes"""
+        inspector = inspect(migrated_engine)
+        orders = {index["name"] for index in inspector.get_indexes("orders")}
+        items = {index["name"] for index in inspector.get_indexes("order_items")}
+        coffees = {index["name"] for index in inspector.get_indexes("coffees")}
+        
+        assert {
+            "ix_orders_status_created_at_id",
+            "ix_orders_pending_created_at_id",
+            "ix_orders_created_at",
+        } <= orders
+        assert {"ix_order_items_order_id", "ix_order_items_coffee_id_order_id"} <= items
+        assert "ix_coffees_price" not in coffees
+    
+    def test_legacy_database_is_stamped_and_upgraded(self, tmp_path):
+        """Testa a adoção das migrations por um banco criado antes delas (create_all)"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        config = Config("alembic.ini")
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "0001")
+            connection.execute(text("DROP TABLE alembic_version"))
+            connection.execute(text(
+                "INSERT INTO orders (created_at, total_price, status) "
+                "VALUES ('2025-09-18 10:00:00.000000', 2.0, 'pending')"
+            ))
+        
+        create_tables(bind=engine)
+        
+        head = ScriptDirectory.from_config(config).get_current_head()
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head
+            assert connection.execute(text("SELECT COUNT(*) FROM orders")).scalar() == 1
+        engine.dispose()
+    
+    def test_order_item_snapshot_backfill(self, tmp_path):
+        """Testa o preenchimento do snapshot do café nos itens já existentes"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+        config = Config("alembic.ini")
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "0003")
+            connection.execute(text(
+                "INSERT INTO coffees (id, name, price, water_ml, milk_ml, coffee_grounds_g) "
+                "VALUES (13, 'Cappuccino', 450, 30, 120, 15)"
+            ))
+            connection.execute(text(
+                "INSERT INTO orders (id, created_at, total_price, status) "
+                "VALUES (1, '2025-09-18 10:00:00.000000', 9.0, 'completed')"
+            ))
+            connection.execute(text(
+                "INSERT INTO order_items (order_id, coffee_id, quantity) VALUES (1, 13, 2)"
+            ))
+            command.upgrade(config, "0004")
+        
+        with engine.connect() as connection:
+            row = connection.execute(text(
+                "SELECT coffee_name, unit_price_cents, water_ml, milk_ml, coffee_grounds_g "
+                "FROM order_items"
+            )).one()
+        assert tuple(row) == ("Cappuccino", 450, 30, 120, 15)
+        engine.dispose()
+
+
+class TestQueryPlans:
+    """Testes de EXPLAIN confirmando o uso de índices pelas consultas dos serviços"""
+    
+    def _add_orders(self, db_session):
+        for index in range(20):
+            create_order(db_session, OrderCreate(items=[
+                OrderItemCreate(coffee_id=11 + index % 5, quantity=1)
+            ]))
+    
+    def test_pending_orders_use_indexes(self, db_session, sample_coffees):
+        """Testa a fila de pendentes (com cursor e filtro por café)"""
+        self._add_orders(db_session)
+        
+        plans = explain_plans(
+            db_session, get_pending_orders,
+            limit=10,
+            after=(datetime.utcnow() - timedelta(hours=1), 0),
+            coffee_id=13
+        )
+        
+        assert len(plans) == 2  # pedidos + itens (selectinload)
+        assert full_scans(plans) == []
+        assert any("ix_order_items_order_id" in detail for detail in plans[1][1])
+    
+    def test_consumption_analysis_uses_indexes(self, db_session, sample_coffees):
+        """Testa a janela de consumo (rollup + fração inicial da janela)"""
+        self._add_orders(db_session)
+        
+        plans = explain_plans(db_session, get_consumption_analysis, 7)
+        
+        assert len(plans) == 1
+        assert full_scans(plans) == []
+        assert any("ix_orders_created_at" in detail for detail in plans[0][1])
+    
+    def test_sales_series_uses_indexes(self, db_session, sample_coffees):
+        """Testa a série de vendas por hora (período + itens por pedido)"""
+        self._add_orders(db_session)
+        now = datetime.utcnow()
+        
+        plans = explain_plans(db_session, get_sales_series, "hour", now - timedelta(days=90), now)
+        
+        assert len(plans) == 1
+        assert full_scans(plans) == []
+        assert any("ix_orders_created_at" in detail for detail in plans[0][1])
+    
+    def test_create_order_lookup_uses_primary_key(self, db_session, sample_coffees):
+        """Testa a consulta de cafés feita na criação do pedido"""
+        plans = explain_plans(db_session, create_order, OrderCreate(items=[
+            OrderItemCreate(coffee_id=11, quantity=1),
+            OrderItemCreate(coffee_id=13, quantity=1)
+        ]))
+        
+        assert len(plans) == 1
+        assert all(detail.startswith("SEARCH coffees") for detail in plans[0][1])
@@ -0,0 +1,121 @@
+"""
+Testes unitários para o hub de eventos de pedidos (stream SSE)
+"""
+import asyncio
+import json
+import threading
+
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order_events import RESYNC_MESSAGE, OrderEventHub, order_events
+from app.services.order_service import create_order, transition_orders
+
+
+def parse_event(message):
+    """Separa o nome do evento e o JSON de uma mensagem SSE"""
+    event, data = message.decode().strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+class TestOrderEventHub:
+    """Testes para a distribuição de eventos"""
+    
+    def test_publish_fans_out_same_message(self):
+        """Testa que todos os assinantes recebem a mesma mensagem serializada"""
+        hub = OrderEventHub(queue_size=10)
+        
+        async def scenario():
+            first, second = hub.subscribe(), hub.subscribe()
+            hub.publish("order_created", {"id": 1})
+            return await first.get(), await second.get()
+        
+        first, second = asyncio.run(scenario())
+        
+        assert first is second
+        assert parse_event(first) == ("order_created", {"id": 1})
+    
+    def test_publish_from_other_thread(self):
+        """Testa a publicação a partir de uma thread fora do event loop"""
+        hub = OrderEventHub(queue_size=10)
+        
+        async def scenario():
+            subscription = hub.subscribe()
+            thread = threading.Thread(target=hub.publish, args=("order_status", {"ids": [1]}))
+            thread.start()
+            message = await asyncio.wait_for(subscription.get(), timeout=1)
+            thread.join()
+            return message
+        
+        assert parse_event(asyncio.run(scenario())) == ("order_status", {"ids": [1]})
+    
+    def test_slow_subscriber_gets_resync_and_closes(self):
+        """Testa a contenção de assinantes lentos com fila limitada"""
+        hub = OrderEventHub(queue_size=2)
+        
+        async def scenario():
+            slow = hub.subscribe()
+            for order_id in range(5):
+                hub.publish("order_created", {"id": order_id})
+            await asyncio.sleep(0)
+            return [await slow.get(), await slow.get()], slow
+        
+        messages, slow = asyncio.run(scenario())
+        
+        assert messages == [RESYNC_MESSAGE, None]
+        assert slow.lagged
+    
+    def test_unsubscribe_stops_delivery(self):
+        """Testa que assinantes removidos não recebem eventos"""
+        hub = OrderEventHub(queue_size=10)
+        
+        async def scenario():
+            subscription = hub.subscribe()
+            hub.unsubscribe(subscription)
+            hub.publish("order_created", {"id": 1})
+            await asyncio.sleep(0)
+            return subscription.queue.qsize()
+        
+        assert asyncio.run(scenario()) == 0
+        assert not hub.has_subscribers
+    
+    def test_order_service_publishes_events(self, db_session, sample_coffees):
+        """Testa os eventos emitidos na criação e na conclusão de pedidos"""
+        async def scenario():
+            subscription = order_events.subscribe()
+            try:
+                order = create_order(db_session, OrderCreate(items=[
+                    OrderItemCreate(coffee_id=11, quantity=2)
+                ]))
+                transition_orders(db_session, [order.id], "completed")
+                return order, await subscription.get(), await subscription.get()
+            finally:
+                order_events.unsubscribe(subscription)
+        
+        order, created, status = asyncio.run(scenario())
+        
+        event, payload = parse_event(created)
+        assert event == "order_created"
+        assert payload["id"] == order.id
+        assert payload["items"][0]["coffee_name"] == "Expresso"
+        assert parse_event(status) == ("order_status", {"ids": [order.id], "status": "completed"})
+    
+    def test_bulk_import_publishes_single_event(self, db_session, sample_coffees, client):
+        """Testa o evento orders_imported emitido por POST /orders/bulk"""
+        async def scenario():
+            subscription = order_events.subscribe()
+            try:
+                response = await asyncio.to_thread(client.post, "/orders/bulk", json={"orders": [
+                    {"items": [{"coffee_id": 11, "quantity": 1}]},
+                    {"items": [{"coffee_id": 999, "quantity": 1}]},
+                    {"items": [{"coffee_id": 13, "quantity": 2}]},
+                ]})
+                message = await asyncio.wait_for(subscription.get(), timeout=1)
+                return response, message, subscription.queue.qsize()
+            finally:
+                order_events.unsubscribe(subscription)
+        
+        response, message, remaining = asyncio.run(scenario())
+        
+        imported = [result["id"] for result in response.json()["results"] if result["id"] is not None]
+        assert len(imported) == 2
+        assert parse_event(message) == ("orders_imported", {"ids": imported})
+        assert remaining == 0
@@ -1,15 +1,26 @@
 """
 Testes unitários para o serviço de pedidos
 """
+import json
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.services.order_service import (
     create_order, 
+    create_orders_bulk,
+    export_orders,
     get_pending_orders, 
-    get_consumption_analysis
+    get_pending_orders_page,
+    get_consumption_analysis,
+    get_sales_series,
+    order_export_range,
+    transition_orders,
+    OrderExportEncoder
 )
-from app.schemas.order import OrderCreate, OrderItemCreate
+from app.schemas.order import OrderBulkEntry, OrderCreate, OrderItemCreate
+from app.config import settings
 from app.models.order import Order, OrderItem
+from app.models.consumption import ConsumptionHourly
+from app.services.rollup_service import backfill_consumption_rollup
 
 
 class TestOrderService:
@@ -56,6 +67,63 @@ class TestOrderService:
         with pytest.raises(ValueError, match="Café com ID 999 não encontrado"):
             create_order(db_session, order_data)
     
+    def test_create_order_invalid_coffee_id_does_not_persist(self, db_session, sample_coffees):
+        """Testa que nenhum pedido é gravado quando algum café é inválido"""
+        order_data = OrderCreate(
+            items=[
+                OrderItemCreate(coffee_id=11, quantity=1),
+                OrderItemCreate(coffee_id=999, quantity=1)  # ID inexistente
+            ]
+        )
+        
+        with pytest.raises(ValueError, match="Café com ID 999 não encontrado"):
+            create_order(db_session, order_data)
+        
+        assert db_session.query(Order).count() == 0
+        assert db_session.query(OrderItem).count() == 0
+    
+    def test_create_order_single_lookup_without_reload(self, db_session, sample_coffees, query_recorder):
+        """Testa que a criação faz uma única consulta de cafés e nenhuma recarga do pedido"""
+        with query_recorder:
+            order = create_order(db_session, OrderCreate(items=[
+                OrderItemCreate(coffee_id=coffee_id, quantity=2)
+                for coffee_id in (11, 12, 13, 14, 15)
+            ]))
+            # A resposta já vem completa: acessar os itens não gera consultas
+            assert [item.coffee_name for item in order.items][0] == "Expresso"
+        
+        statements = [statement.lstrip().split()[0:3] for statement in query_recorder.statements]
+        selects = [s for s in statements if s[0] == "SELECT"]
+        order_inserts = [s for s in statements if s[:3] == ["INSERT", "INTO", "orders"]]
+        other = [s for s in statements if s[0] not in ("SELECT", "INSERT")]
+        
+        assert len(selects) == 1
+        assert len(order_inserts) == 1
+        assert other == []
+        # Cafés, pedido, itens (um INSERT para todos) e rollup, sem consulta por item
+        query_recorder.assert_budget(4)
+    
+    def test_order_items_keep_price_snapshot(self, db_session, sample_coffees, query_recorder):
+        """Testa que editar o menu não altera pedidos já feitos e que a leitura não usa coffees"""
+        order = create_order(db_session, OrderCreate(items=[OrderItemCreate(coffee_id=13, quantity=2)]))
+        
+        cappuccino = next(coffee for coffee in sample_coffees if coffee.id == 13)
+        cappuccino.price = 900
+        cappuccino.name = "Cappuccino Grande"
+        db_session.commit()
+        db_session.expunge_all()
+        
+        with query_recorder:
+            pending = get_pending_orders(db_session)
+            items = [(item.coffee_name, item.item_price) for item in pending[0].items]
+        
+        assert pending[0].id == order.id
+        assert items == [("Cappuccino", 9.0)]
+        assert not any("coffees" in statement for statement in query_recorder.statements)
+        
+        item = db_session.query(OrderItem).one()
+        assert (item.unit_price_cents, item.water_ml, item.milk_ml, item.coffee_grounds_g) == (450, 30, 120, 15)
+    
     def test_create_order_empty_items(self, db_session, sample_coffees):
         """Testa criação de pedido com lista vazia de itens"""
         order_data = OrderCreate(items=[])
@@ -138,6 +206,7 @@ class TestOrderService:
         
         db_session.add_all(items)
         db_session.commit()
+        backfill_consumption_rollup(db_session)
         
         # Testar análise de consumo para 2 dias (hoje e ontem)
         analysis = get_consumption_analysis(db_session, days=2)
@@ -185,6 +254,7 @@ class TestOrderService:
         item = OrderItem(order_id=order.id, coffee_id=11, quantity=1)
         db_session.add(item)
         db_session.commit()
+        backfill_consumption_rollup(db_session)
         
         # Testar com 1 dia
         analysis_1_day = get_consumption_analysis(db_session, days=1)
@@ -196,3 +266,411 @@ class TestOrderService:
         assert analysis_7_days["total_coffees"] == 1
         assert analysis_7_days["daily_averages"]["coffees"] == 1/7  # 1 café em 7 dias
 
+    
+    def test_get_consumption_analysis_constant_queries(self, db_session, sample_coffees, client, query_recorder):
+        """Testa que o endpoint de consumo faz o mesmo número de consultas para qualquer volume"""
+        def add_orders(count):
+            for _ in range(count):
+                create_order(db_session, OrderCreate(items=[
+                    OrderItemCreate(coffee_id=11, quantity=2),
+                    OrderItemCreate(coffee_id=13, quantity=1),
+                ]))
+        
+        def count_queries():
+            with query_recorder:
+                response = client.get("/orders/consumption?days=1")
+            assert response.status_code == 200
+            return query_recorder.count, response.json()
+        
+        add_orders(1)
+        few_queries, few = count_queries()
+        
+        add_orders(49)
+        many_queries, many = count_queries()
+        
+        assert few["total_coffees"] == 3
+        assert many["total_coffees"] == 150
+        assert many["total_water_ml"] == 50 * 130
+        assert many["total_milk_ml"] == 50 * 120
+        assert many["total_coffee_grounds_g"] == 50 * 45
+        assert few_queries == many_queries == 1
+    
+    def test_create_order_updates_hourly_rollup(self, db_session, sample_coffees):
+        """Testa que cada pedido acumula seu consumo no rollup horário"""
+        for _ in range(2):
+            create_order(db_session, OrderCreate(items=[
+                OrderItemCreate(coffee_id=13, quantity=1),  # Cappuccino
+                OrderItemCreate(coffee_id=13, quantity=2),  # Cappuccino
+                OrderItemCreate(coffee_id=11, quantity=1),  # Expresso
+            ]))
+        
+        rows = {row.coffee_id: row for row in db_session.query(ConsumptionHourly).all()}
+        
+        assert set(rows) == {11, 13}
+        assert rows[13].cups == 6
+        assert rows[13].water_ml == 6 * 30
+        assert rows[13].milk_ml == 6 * 120
+        assert rows[13].coffee_grounds_g == 6 * 15
+        assert rows[13].revenue_cents == 6 * 450
+        assert rows[11].cups == 2
+        assert rows[11].revenue_cents == 2 * 200
+        assert rows[11].bucket.minute == 0 and rows[11].bucket.second == 0
+    
+    def test_backfill_matches_incremental_rollup(self, db_session, sample_coffees):
+        """Testa que a reconstrução do rollup reproduz os valores incrementais"""
+        create_order(db_session, OrderCreate(items=[OrderItemCreate(coffee_id=14, quantity=3)]))
+        create_order(db_session, OrderCreate(items=[OrderItemCreate(coffee_id=15, quantity=1)]))
+        
+        def snapshot():
+            return sorted(
+                (row.bucket, row.coffee_id, row.cups, row.water_ml, row.milk_ml,
+                 row.coffee_grounds_g, row.revenue_cents)
+                for row in db_session.query(ConsumptionHourly).all()
+            )
+        
+        incremental = snapshot()
+        assert backfill_consumption_rollup(db_session) == 2
+        assert snapshot() == incremental
+    
+    def test_get_consumption_analysis_partial_first_hour(self, db_session, sample_coffees):
+        """Testa que a fração inicial da janela é contada a partir dos itens"""
+        now = datetime.utcnow()
+        
+        # Dentro da janela, mas antes da primeira hora cheia
+        inside = Order(total_price=2.0, status="completed", created_at=now - timedelta(days=1) + timedelta(seconds=5))
+        # Na mesma hora de início da janela, porém antes dela
+        outside = Order(total_price=2.0, status="completed", created_at=now - timedelta(days=1) - timedelta(seconds=5))
+        inside.items = [OrderItem(coffee_id=11, quantity=1)]
+        outside.items = [OrderItem(coffee_id=11, quantity=4)]
+        db_session.add_all([inside, outside])
+        db_session.commit()
+        backfill_consumption_rollup(db_session)
+        
+        analysis = get_consumption_analysis(db_session, days=1)
+        
+        assert analysis["total_coffees"] == 1
+    
+    def _add_pending_orders(self, db_session, count, coffee_id=11):
+        """Cria pedidos pendentes com created_at crescente (um por minuto)"""
+        base = datetime.utcnow() - timedelta(hours=1)
+        orders = []
+        for index in range(count):
+            order = Order(total_price=2.0, status="pending", created_at=base + timedelta(minutes=index))
+            order.items = [OrderItem(coffee_id=coffee_id, quantity=1)]
+            orders.append(order)
+        db_session.add_all(orders)
+        db_session.commit()
+        return orders
+    
+    def test_get_pending_orders_page_keyset(self, db_session, sample_coffees):
+        """Testa a paginação por keyset percorrendo todas as páginas"""
+        orders = self._add_pending_orders(db_session, 7)
+        expected_ids = [order.id for order in orders]
+        
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            page, cursor = get_pending_orders_page(db_session, 3, cursor)
+            seen.extend(order.id for order in page)
+            pages += 1
+            if cursor is None:
+                break
+        
+        assert seen == expected_ids
+        assert pages == 3
+    
+    def test_get_pending_orders_page_filters(self, db_session, sample_coffees):
+        """Testa os filtros since e coffee_id da fila de pendentes"""
+        expresso_orders = self._add_pending_orders(db_session, 3, coffee_id=11)
+        cappuccino_orders = self._add_pending_orders(db_session, 2, coffee_id=13)
+        
+        page, cursor = get_pending_orders_page(db_session, 10, coffee_id=13)
+        assert [order.id for order in page] == [order.id for order in cappuccino_orders]
+        assert cursor is None
+        
+        since = expresso_orders[1].created_at
+        page, _ = get_pending_orders_page(db_session, 10, since=since, coffee_id=11)
+        assert [order.id for order in page] == [order.id for order in expresso_orders[1:]]
+    
+    def test_get_pending_orders_page_invalid_cursor(self, db_session):
+        """Testa erro de validação para cursor inválido"""
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            get_pending_orders_page(db_session, 10, "não-é-um-cursor")
+    
+    def test_pending_orders_endpoint_pagination(self, db_session, sample_coffees, client):
+        """Testa o header X-Next-Cursor e o limite da rota de pendentes"""
+        orders = self._add_pending_orders(db_session, 3)
+        
+        first = client.get("/orders/pending?limit=2")
+        assert first.status_code == 200
+        assert [order["id"] for order in first.json()] == [orders[0].id, orders[1].id]
+        assert first.json()[0]["items"][0]["coffee_name"] == "Expresso"
+        
+        cursor = first.headers["x-next-cursor"]
+        second = client.get(f"/orders/pending?limit=2&cursor={cursor}")
+        assert [order["id"] for order in second.json()] == [orders[2].id]
+        assert "x-next-cursor" not in second.headers
+        
+        assert client.get("/orders/pending?cursor=invalido").status_code == 400
+        assert client.get("/orders/pending?limit=501").status_code == 422
+    
+    def test_pending_orders_fast_json_matches_models(self, db_session, sample_coffees, client, monkeypatch):
+        """Testa que o caminho rápido de /orders/pending gera o mesmo JSON"""
+        self._add_pending_orders(db_session, 3)
+        create_order(db_session, OrderCreate(items=[
+            OrderItemCreate(coffee_id=12, quantity=2),
+            OrderItemCreate(coffee_id=14, quantity=1)
+        ]))
+        
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        regular = client.get("/orders/pending?limit=3")
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        fast = client.get("/orders/pending?limit=3")
+        
+        assert fast.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.json() == regular.json()
+        assert fast.headers["x-next-cursor"] == regular.headers["x-next-cursor"]
+        
+        cursor = fast.headers["x-next-cursor"]
+        last = client.get(f"/orders/pending?limit=3&cursor={cursor}").json()
+        assert [item["coffee_name"] for item in last[0]["items"]] == ["Expresso Duplo", "Flat White"]
+        assert last[0]["total_price"] == 11.5
+    
+    def test_transition_orders_only_from_pending(self, db_session, sample_coffees):
+        """Testa a transição em lote apenas de pedidos pendentes"""
+        pending = self._add_pending_orders(db_session, 3)
+        done = Order(total_price=2.0, status="completed")
+        db_session.add(done)
+        db_session.commit()
+        
+        ids = [pending[0].id, pending[2].id, done.id, 999]
+        updated = transition_orders(db_session, ids, "completed")
+        
+        assert updated == [pending[0].id, pending[2].id]
+        assert transition_orders(db_session, ids, "completed") == []
+        remaining = get_pending_orders(db_session)
+        assert [order.id for order in remaining] == [pending[1].id]
+    
+    def test_update_order_status_endpoint(self, db_session, sample_coffees, client):
+        """Testa PATCH /orders/{id}/status com 200, 409 e 404"""
+        order = self._add_pending_orders(db_session, 1)[0]
+        
+        response = client.patch(f"/orders/{order.id}/status", json={"status": "completed"})
+        assert response.status_code == 200
+        assert response.json() == {"id": order.id, "status": "completed"}
+        
+        conflict = client.patch(f"/orders/{order.id}/status", json={"status": "completed"})
+        assert conflict.status_code == 409
+        
+        missing = client.patch("/orders/999/status", json={"status": "completed"})
+        assert missing.status_code == 404
+        
+        invalid = client.patch(f"/orders/{order.id}/status", json={"status": "pending"})
+        assert invalid.status_code == 422
+    
+    def test_complete_orders_endpoint(self, db_session, sample_coffees, client):
+        """Testa POST /orders/complete retornando concluídos e ignorados"""
+        orders = self._add_pending_orders(db_session, 3)
+        ids = [order.id for order in orders]
+        
+        response = client.post("/orders/complete", json={"order_ids": ids[:2] + [999]})
+        assert response.status_code == 200
+        assert response.json() == {"completed": ids[:2], "skipped": [999]}
+        
+        again = client.post("/orders/complete", json={"order_ids": ids})
+        assert again.json() == {"completed": [ids[2]], "skipped": ids[:2]}
+        
+        assert client.post("/orders/complete", json={"order_ids": []}).status_code == 422
+    
+    def test_create_orders_bulk(self, db_session, sample_coffees):
+        """Testa a gravação em lote com erros por pedido e datas do cliente"""
+        created_at = datetime(2025, 9, 18, 12, 5, tzinfo=timezone(timedelta(hours=-3)))
+        entries = [
+            OrderBulkEntry(created_at=created_at, items=[
+                OrderItemCreate(coffee_id=11, quantity=2),
+                OrderItemCreate(coffee_id=13, quantity=1)
+            ]),
+            OrderBulkEntry(items=[OrderItemCreate(coffee_id=999, quantity=1)]),
+            OrderBulkEntry(items=[OrderItemCreate(coffee_id=15, quantity=1)]),
+        ]
+        
+        results = create_orders_bulk(db_session, entries)
+        
+        assert [result["index"] for result in results] == [0, 1, 2]
+        assert results[1] == {"index": 1, "id": None, "error": "Café com ID 999 não encontrado"}
+        assert results[0]["error"] is None and results[2]["error"] is None
+        
+        first = db_session.get(Order, results[0]["id"])
+        assert first.created_at == datetime(2025, 9, 18, 15, 5)  # Convertido para UTC
+        assert first.total_price == 8.5
+        assert sorted((item.coffee_id, item.quantity) for item in first.items) == [(11, 2), (13, 1)]
+        assert db_session.get(Order, results[2]["id"]).total_price == 3.5
+        assert db_session.query(Order).count() == 2
+        
+        rollup = db_session.query(ConsumptionHourly).filter(
+            ConsumptionHourly.bucket == datetime(2025, 9, 18, 15)
+        ).all()
+        assert sorted((row.coffee_id, row.cups) for row in rollup) == [(11, 2), (13, 1)]
+    
+    def test_create_orders_bulk_statements_independent_of_batch(self, db_session, sample_coffees, query_recorder):
+        """Testa que o lote não faz consultas de cafés por pedido"""
+        entries = [
+            OrderBulkEntry(items=[OrderItemCreate(coffee_id=11 + index % 5, quantity=1)])
+            for index in range(50)
+        ]
+        with query_recorder:
+            create_orders_bulk(db_session, entries)
+        statements = query_recorder.statements
+        
+        assert sum(1 for statement in statements if statement.startswith("SELECT")) == 1
+        assert sum(1 for statement in statements if "INTO order_items" in statement) == 1
+        assert sum(1 for statement in statements if "INTO consumption_hourly" in statement) == 1
+    
+    def test_create_orders_bulk_endpoint(self, db_session, sample_coffees, client):
+        """Testa POST /orders/bulk"""
+        response = client.post("/orders/bulk", json={"orders": [
+            {"created_at": "2025-09-18T12:05:00Z", "items": [{"coffee_id": 11, "quantity": 2}]},
+            {"items": [{"coffee_id": 999, "quantity": 1}]}
+        ]})
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] == 1
+        assert body["failed"] == 1
+        assert body["results"][1]["error"] == "Café com ID 999 não encontrado"
+        assert client.post("/orders/bulk", json={"orders": []}).status_code == 422
+    
+    def test_export_orders_groups_items_per_line(self, db_session, sample_coffees):
+        """Testa o export NDJSON: período semiaberto, um pedido por linha"""
+        results = create_orders_bulk(db_session, [
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 10), items=[
+                OrderItemCreate(coffee_id=11, quantity=2),
+                OrderItemCreate(coffee_id=13, quantity=1)
+            ]),
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 11), items=[
+                OrderItemCreate(coffee_id=15, quantity=1)
+            ]),
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 12), items=[
+                OrderItemCreate(coffee_id=12, quantity=1)
+            ]),
+        ])
+        transition_orders(db_session, [results[0]["id"]], "completed")
+        
+        start, end = order_export_range(datetime(2025, 9, 18, 10), datetime(2025, 9, 18, 12))
+        body = b"".join(export_orders(db_session, start, end, batch_size=1))
+        lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        
+        assert [line["id"] for line in lines] == [results[0]["id"], results[1]["id"]]
+        assert lines[0]["status"] == "completed"
+        assert lines[0]["total_price"] == 8.5
+        assert [(item["coffee_name"], item["item_price"]) for item in lines[0]["items"]] == [
+            ("Expresso", 4.0), ("Cappuccino", 4.5)
+        ]
+        assert len(lines[1]["items"]) == 1
+        
+        with pytest.raises(ValueError, match="posterior"):
+            order_export_range(end, start)
+    
+    def test_export_encoder_flushes_chunks(self):
+        """Testa que o encoder emite blocos sem quebrar pedidos entre linhas"""
+        encoder = OrderExportEncoder(chunk_bytes=1)
+        created_at = datetime(2025, 9, 18, 10)
+        rows = [
+            (1, created_at, 4.0, "pending", 1, 11, 2, "Expresso", 200),
+            (1, created_at, 4.0, "pending", 2, 13, 1, "Cappuccino", 450),
+            (2, created_at, 3.5, "pending", 3, 15, 1, "Americano", 350),
+        ]
+        chunks = [encoder.add(row) for row in rows]
+        
+        assert chunks[:2] == [None, None]
+        assert json.loads(chunks[2])["id"] == 1
+        assert len(json.loads(chunks[2])["items"]) == 2
+        assert json.loads(encoder.finish())["id"] == 2
+        assert encoder.finish() is None
+    
+    def test_export_orders_endpoint(self, db_session, sample_coffees, client):
+        """Testa GET /orders/export em stream NDJSON"""
+        created = client.post("/orders/", json={"items": [{"coffee_id": 11, "quantity": 1}]}).json()
+        start = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        end = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        
+        response = client.get("/orders/export", params={"from": start, "to": end})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [created["id"]]
+        
+        assert client.get("/orders/export", params={"from": end, "to": start}).status_code == 400
+        assert client.get("/orders/export", params={"from": start}).status_code == 422
+    
+    def _add_sales(self, db_session):
+        """Pedidos em duas horas de um dia e em um segundo dia"""
+        create_orders_bulk(db_session, [
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 8, 5), items=[
+                OrderItemCreate(coffee_id=11, quantity=2),
+                OrderItemCreate(coffee_id=13, quantity=1)
+            ]),
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 8, 50), items=[
+                OrderItemCreate(coffee_id=11, quantity=1)
+            ]),
+            OrderBulkEntry(created_at=datetime(2025, 9, 18, 9, 10), items=[
+                OrderItemCreate(coffee_id=11, quantity=3)
+            ]),
+            OrderBulkEntry(created_at=datetime(2025, 9, 19, 7, 0), items=[
+                OrderItemCreate(coffee_id=13, quantity=2)
+            ]),
+        ])
+    
+    def test_get_sales_series_hourly_and_daily(self, db_session, sample_coffees):
+        """Testa a série de vendas por hora e por dia, orientada a colunas"""
+        self._add_sales(db_session)
+        start, end = datetime(2025, 9, 18), datetime(2025, 9, 20)
+        
+        hourly = get_sales_series(db_session, "hour", start, end)["columns"]
+        assert hourly == {
+            "bucket_start": [
+                "2025-09-18T08:00:00", "2025-09-18T08:00:00",
+                "2025-09-18T09:00:00", "2025-09-19T07:00:00"
+            ],
+            "coffee_id": [11, 13, 11, 13],
+            "cups": [3, 1, 3, 2],
+            "revenue": [6.0, 4.5, 6.0, 9.0],
+        }
+        
+        daily = get_sales_series(db_session, "day", start, end, coffee_id=11)["columns"]
+        assert daily == {
+            "bucket_start": ["2025-09-18T00:00:00"],
+            "coffee_id": [11],
+            "cups": [6],
+            "revenue": [12.0],
+        }
+        
+        # Fim exclusivo
+        morning = get_sales_series(db_session, "hour", start, datetime(2025, 9, 18, 9, 10))
+        assert morning["columns"]["cups"] == [3, 1]
+        
+        # Bordas fora da hora cheia vêm dos itens; o miolo, do rollup
+        partial = get_sales_series(db_session, "day", datetime(2025, 9, 18, 8, 30), datetime(2025, 9, 19, 7, 0, 1))
+        assert partial["columns"]["cups"] == [4, 2]
+        assert partial["columns"]["coffee_id"] == [11, 13]
+        
+        empty = get_sales_series(db_session, "day", datetime(2024, 1, 1), datetime(2024, 2, 1))
+        assert empty["columns"] == {"bucket_start": [], "coffee_id": [], "cups": [], "revenue": []}
+    
+    def test_sales_endpoint(self, db_session, sample_coffees, client):
+        """Testa GET /orders/sales e a validação dos parâmetros"""
+        self._add_sales(db_session)
+        params = {"bucket": "day", "from": "2025-09-18T00:00:00", "to": "2025-09-20T00:00:00"}
+        
+        response = client.get("/orders/sales", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["bucket"] == "day"
+        assert body["columns"]["bucket_start"] == [
+            "2025-09-18T00:00:00", "2025-09-18T00:00:00", "2025-09-19T00:00:00"
+        ]
+        assert body["columns"]["cups"] == [6, 1, 2]
+        
+        assert client.get("/orders/sales", params={**params, "bucket": "week"}).status_code == 422
+        assert client.get("/orders/sales", params={**params, "to": params["from"]}).status_code == 400
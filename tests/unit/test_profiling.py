@@ -0,0 +1,95 @@
+"""
+Testes unitários para o profiling sob demanda
+"""
+import asyncio
+import json
+import pstats
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware import ProfilingMiddleware
+
+SECRET = "segredo-de-teste"
+
+
+class TestProfiling:
+    """Testes para ProfilingMiddleware"""
+
+    def _client(self, directory, secret=SECRET):
+        return TestClient(ProfilingMiddleware(app, secret=secret, directory=str(directory)))
+
+    def test_profiles_request_with_secret_header(self, db_session, sample_coffees, tmp_path):
+        """Testa os artefatos gerados e a divisão do tempo da requisição"""
+        client = self._client(tmp_path)
+        client.post("/orders/", json={"items": [{"coffee_id": 11, "quantity": 2}]})
+
+        response = client.get("/orders/consumption?days=90", headers={"X-Profile-Token": SECRET})
+
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+        (summary_path,) = tmp_path.glob(f"{profile_id}-GET-orders_consumption.json")
+        summary = json.loads(summary_path.read_text(encoding="utf-8"))
+        assert summary["route"] == "/orders/consumption"
+        assert summary["query_string"] == "days=90"
+        assert summary["db_queries"] == 1
+
+        breakdown = summary["breakdown_ms"]
+        assert set(breakdown) == {"handler", "service", "sql", "serialization", "other", "total"}
+        assert breakdown["sql"] > 0
+        assert breakdown["service"] > 0
+        parts = sum(value for name, value in breakdown.items() if name != "total")
+        assert abs(parts - breakdown["total"]) < 0.01
+
+        assert len(summary["top_functions"]) > 0
+        stats = pstats.Stats(str(summary_path.with_suffix(".prof")))
+        assert any(name == "get_consumption_analysis" for _, _, name in stats.stats)
+
+    def test_requests_without_valid_header_are_not_profiled(self, db_session, sample_coffees, tmp_path):
+        """Testa que sem o header, com segredo errado ou sem segredo configurado nada é gerado"""
+        client = self._client(tmp_path)
+        assert "x-profile-id" not in client.get("/menu/").headers
+        assert "x-profile-id" not in client.get("/menu/", headers={"X-Profile-Token": "errado"}).headers
+
+        disabled = self._client(tmp_path, secret="")
+        assert "x-profile-id" not in disabled.get("/menu/", headers={"X-Profile-Token": ""}).headers
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_concurrent_profiled_requests_profile_only_one(self, tmp_path):
+        """Testa que uma segunda requisição perfilada ao mesmo tempo é atendida sem profiling"""
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = ProfilingMiddleware(slow_app, secret=SECRET, directory=str(tmp_path))
+        scope = {
+            "type": "http", "method": "GET", "path": "/lento", "query_string": b"",
+            "headers": [(b"x-profile-token", SECRET.encode())],
+        }
+
+        async def call():
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            task = asyncio.create_task(middleware(dict(scope), None, send))
+            await asyncio.sleep(0)
+            return task, messages
+
+        async def scenario():
+            first, first_messages = await call()
+            second, second_messages = await call()
+            # As duas estão em andamento ao mesmo tempo
+            release.set()
+            await asyncio.gather(first, second)
+            return first_messages[0]["headers"], second_messages[0]["headers"]
+
+        first, second = asyncio.run(scenario())
+
+        assert b"x-profile-id" in dict(first)
+        assert dict(second) == {b"x-profile-skipped": b"busy"}
+        assert len(list(tmp_path.glob("*.prof"))) == 1
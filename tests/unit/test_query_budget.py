@@ -0,0 +1,100 @@
+"""
+Testes unitários para o orçamento de consultas por endpoint e a detecção de N+1
+"""
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import QueryBudgetMiddleware
+from app.models.order import Order
+from app.query_recorder import QueryBudgetExceeded, QueryRecorder
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.coffee_service import get_menu_with_prices
+from app.services.order_service import create_order
+
+# (método, URL, corpo, consultas no máximo) — nenhuma consulta pode se repetir
+ENDPOINT_BUDGETS = [
+    ("post", "/orders/", {"items": [{"coffee_id": c, "quantity": 1} for c in (11, 12, 13, 14, 15)]}, 4),
+    ("post", "/orders/bulk", {"orders": [{"items": [{"coffee_id": 11 + i % 5, "quantity": 1}]} for i in range(30)]}, 4),
+    ("get", "/orders/pending", None, 2),
+    ("get", "/orders/consumption?days=7", None, 1),
+    ("get", "/orders/consumption/forecast", None, 1),
+    ("get", "/orders/sales?from=2025-09-01T00:00:00&to=2025-09-30T00:00:00", None, 1),
+    ("get", "/orders/export?from=2025-09-01T00:00:00&to=2030-01-01T00:00:00", None, 1),
+    ("get", "/menu/", None, 1),
+    ("patch", "/orders/1/status", {"status": "completed"}, 1),
+    ("post", "/orders/complete", {"order_ids": [2, 3, 4]}, 1),
+]
+
+
+@pytest.fixture
+def sample_orders(db_session, sample_coffees):
+    """Dez pedidos com itens de vários cafés"""
+    for index in range(10):
+        create_order(db_session, OrderCreate(items=[
+            OrderItemCreate(coffee_id=11 + index % 5, quantity=1),
+            OrderItemCreate(coffee_id=13, quantity=2),
+        ]))
+
+
+class TestQueryBudget:
+    """Testes para QueryRecorder, a fixture query_recorder e QueryBudgetMiddleware"""
+
+    @pytest.mark.parametrize("method,url,body,budget", ENDPOINT_BUDGETS)
+    def test_endpoint_query_budget(self, sample_orders, client, query_recorder, method, url, body, budget):
+        """Testa que cada endpoint fica dentro do orçamento e sem consultas repetidas"""
+        kwargs = {"json": body} if body is not None else {}
+        with query_recorder:
+            response = getattr(client, method)(url, **kwargs)
+
+        assert response.status_code == 200
+        query_recorder.assert_budget(budget)
+
+    def test_detects_n_plus_one_with_call_site(self, db_session, sample_orders, query_recorder):
+        """Testa que consultas repetidas são apontadas com o call site na aplicação"""
+        with query_recorder:
+            for _ in range(3):
+                get_menu_with_prices(db_session)
+
+        duplicates = query_recorder.duplicates()
+        assert list(duplicates.values()) == [3]
+        (statement,) = duplicates
+        assert query_recorder.call_sites(statement)[0].startswith("app/services/coffee_service.py:")
+        with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+            query_recorder.assert_budget(10)
+        with pytest.raises(QueryBudgetExceeded, match="Orçamento de 2"):
+            query_recorder.assert_budget(2, allow_duplicates=True)
+
+    def test_recorder_without_engine_records_current_context(self, db_session, sample_orders):
+        """Testa o modo por contexto usado em produção"""
+        with QueryRecorder() as recorder:
+            db_session.query(Order).count()
+
+        assert recorder.count == 1
+        assert recorder.queries[0].call_site is None  # Consulta feita fora de app/
+
+    def test_middleware_logs_requests_over_budget(self, db_session, sample_coffees, caplog):
+        """Testa o aviso no log com o call site quando a rota excede o orçamento"""
+        app = FastAPI()
+
+        @app.get("/menu-triplo")
+        def menu_three_times():
+            return [len(get_menu_with_prices(db_session)) for _ in range(3)]
+
+        @app.get("/menu-uma-vez")
+        def menu_once():
+            return len(get_menu_with_prices(db_session))
+
+        app.add_middleware(QueryBudgetMiddleware, budgets={"/menu-uma-vez": 1}, default=5, duplicates=3)
+        client = TestClient(app)
+
+        with caplog.at_level(logging.WARNING, logger="app.middleware.query_budget"):
+            assert client.get("/menu-uma-vez").status_code == 200
+            assert caplog.records == []
+            assert client.get("/menu-triplo").status_code == 200
+
+        (record,) = caplog.records
+        assert "GET /menu-triplo excedeu o orçamento de 5 consultas" in record.getMessage()
+        assert "3x SELECT" in record.getMessage()
+        assert "app/services/coffee_service.py:" in record.getMessage()
@@ -0,0 +1,175 @@
+"""
+Testes unitários do roteamento de leituras para a réplica
+"""
+import asyncio
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database, read_routing
+from app.config import settings
+from app.database import Base, get_read_async_db, get_read_db
+from app.main import app
+from app.models.coffee import Coffee
+from app.models.order import Order, OrderItem
+from app.read_routing import READ_YOUR_WRITES_COOKIE, ReplicaMonitor
+
+# Pedido que só existe na réplica: identifica de qual banco veio a leitura
+REPLICA_ONLY_ORDER_ID = 99
+
+
+class FakeClock:
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def pending_ids(client):
+    response = client.get("/orders/pending")
+    assert response.status_code == 200
+    return [order["id"] for order in response.json()]
+
+
+def use_replica(monkeypatch, path):
+    """Aponta as rotas de leitura para o SQLite em ``path``; retorna o monitor da réplica"""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    clock = FakeClock()
+    monitor = ReplicaMonitor(interval=5, max_lag=5, clock=clock)
+    monkeypatch.setattr(settings, "READ_DATABASE_URL", url)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    monkeypatch.delitem(app.dependency_overrides, get_read_db)
+    return engine, monitor, clock
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch, sample_coffees):
+    """Réplica em outro arquivo com o menu e um pedido pendente que o primário não tem"""
+    engine, monitor, clock = use_replica(monkeypatch, tmp_path / "replica.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        Coffee(id=coffee.id, name=coffee.name, price=coffee.price, water_ml=coffee.water_ml,
+               milk_ml=coffee.milk_ml, coffee_grounds_g=coffee.coffee_grounds_g)
+        for coffee in sample_coffees
+    )
+    db.add(Order(id=REPLICA_ONLY_ORDER_ID, total_price=200, status="pending"))
+    db.add(OrderItem(order_id=REPLICA_ONLY_ORDER_ID, coffee_id=11, quantity=1))
+    db.commit()
+    db.close()
+    yield monitor, clock
+    engine.dispose()
+
+
+class TestReadRouting:
+    """Testes das leituras na réplica, read-your-writes e fallback para o primário"""
+
+    def test_reads_go_to_replica(self, replica, sample_order):
+        """Testa que as rotas de leitura usam a réplica"""
+        assert pending_ids(TestClient(app)) == [REPLICA_ONLY_ORDER_ID]
+
+    def test_client_reads_own_write_from_primary(self, replica):
+        """Testa que o cliente que acabou de criar um pedido lê do primário"""
+        client = TestClient(app)
+        response = client.post("/orders/", json={"items": [{"coffee_id": 11, "quantity": 1}]})
+        assert response.status_code == 200
+        assert READ_YOUR_WRITES_COOKIE in response.cookies
+
+        assert pending_ids(client) == [response.json()["id"]]
+        # Outro cliente continua lendo da réplica
+        assert pending_ids(TestClient(app)) == [REPLICA_ONLY_ORDER_ID]
+
+    def test_failed_write_does_not_pin_client_to_primary(self, replica):
+        """Testa que uma escrita rejeitada não ativa o read-your-writes"""
+        client = TestClient(app)
+        response = client.post("/orders/", json={"items": [{"coffee_id": 999, "quantity": 1}]})
+        assert response.status_code == 400
+        assert READ_YOUR_WRITES_COOKIE not in response.cookies
+
+    def test_falls_back_when_replica_is_unavailable(self, tmp_path, monkeypatch, sample_order):
+        """Testa que a leitura vai ao primário quando a réplica não abre"""
+        _, monitor, _ = use_replica(monkeypatch, tmp_path / "missing" / "replica.db")
+
+        assert pending_ids(TestClient(app)) == [sample_order.id]
+        assert monitor.available is False
+
+    def test_falls_back_while_replica_is_lagging(self, replica, sample_order, monkeypatch):
+        """Testa o fallback com atraso acima do limite e a volta à réplica depois"""
+        monitor, clock = replica
+        monkeypatch.setattr(read_routing, "replication_lag", lambda db: 60.0)
+        client = TestClient(app)
+        assert pending_ids(client) == [sample_order.id]
+        assert monitor.lag == 60.0
+
+        monkeypatch.setattr(read_routing, "replication_lag", lambda db: 0.5)
+        # O resultado vale até a próxima verificação
+        assert pending_ids(client) == [sample_order.id]
+        clock.now += 5
+        assert pending_ids(client) == [REPLICA_ONLY_ORDER_ID]
+
+    def test_replica_error_between_checks_falls_back(self, replica, sample_order, tmp_path, monkeypatch):
+        """Testa que um erro da réplica entre verificações desvia as leituras seguintes para o primário"""
+        monitor, _ = replica
+        client = TestClient(app, raise_server_exceptions=False)
+        assert pending_ids(client) == [REPLICA_ONLY_ORDER_ID]
+
+        # A réplica cai depois da verificação, ainda dentro do intervalo
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=broken))
+        assert client.get("/orders/pending").status_code == 500
+        assert monitor.available is False
+
+        assert pending_ids(client) == [sample_order.id]
+
+    def test_async_replica_error_marks_replica_unavailable(self, tmp_path, monkeypatch):
+        """Testa o mesmo tratamento de erro na sessão assíncrona da réplica"""
+        monitor = ReplicaMonitor(interval=5, max_lag=5, clock=FakeClock())
+        monitor.claim_check()
+        monitor.report(0.0)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+        monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(engine))
+        monkeypatch.setattr(database, "replica_monitor", monitor)
+        request = Request({"type": "http", "headers": []})
+
+        async def scenario():
+            dependency = get_read_async_db(request, primary=None)
+            assert await dependency.__anext__() is not None
+            with pytest.raises(exc.OperationalError):
+                await dependency.athrow(exc.OperationalError("SELECT 1", {}, Exception("réplica fora do ar")))
+            await engine.dispose()
+
+        asyncio.run(scenario())
+        assert monitor.available is False
+
+
+class TestReplicaMonitor:
+    """Testes do intervalo de verificação da réplica"""
+
+    def test_single_check_per_interval(self):
+        """Testa que só uma requisição por intervalo verifica a réplica"""
+        clock = FakeClock()
+        monitor = ReplicaMonitor(interval=5, max_lag=1, clock=clock)
+
+        assert monitor.claim_check() is True
+        assert monitor.claim_check() is False
+        clock.now += 5
+        assert monitor.claim_check() is True
+
+    def test_report_marks_availability(self):
+        """Testa a disponibilidade conforme o atraso informado"""
+        monitor = ReplicaMonitor(interval=5, max_lag=1)
+
+        monitor.report(0.5)
+        assert monitor.available is True
+        monitor.report(2.0)
+        assert monitor.available is False
+        monitor.report(None)
+        assert monitor.available is False